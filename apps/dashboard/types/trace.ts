@@ -16,6 +16,8 @@ export type HierarchicalSpan = {
   status: string;
   latency_ms: number;
   cost_usd?: number;
+  sample_weight?: number;
+  sample_rate?: number | null;
   prompt_tokens?: number;
   completion_tokens?: number;
   prompt?: string;
@@ -537,4 +537,61 @@ describe.skip('Analytics Queries', () => {
       expect(summary.totalTokens).toBe(0);
     });
   });
+
+  describe('sample weights and rates', () => {
+    beforeEach(async () => {
+      // One expensive call kept as is, 2 of 10 cheap calls kept with weight 5, and
+      // one call from a trace the head sampler kept with rate 0.5
+      const traces = [
+        createSampleTrace({
+          customerId: 'customer-1',
+          serviceName: 'service-a',
+          costUsd: 0.5,
+          tokens: 5000,
+        }),
+        createSampleTrace({
+          customerId: 'customer-1',
+          serviceName: 'service-a',
+          costUsd: 0.1,
+          tokens: 1000,
+          sampleRate: 0.5,
+        }),
+        ...Array.from({ length: 2 }, () =>
+          createSampleTrace({
+            customerId: 'customer-1',
+            serviceName: 'service-a',
+            costUsd: 0.002,
+            tokens: 20,
+            sampleWeight: 5,
+          })
+        ),
+      ];
+
+      await insertTracesBatch(db, traces);
+    });
+
+    test('should weight cost and tokens in the breakdown', async () => {
+      const breakdown = await getCostBreakdown(db, {
+        customerId: 'customer-1',
+        groupBy: 'service_name',
+      });
+
+      const serviceA = breakdown.find((b) => b.dimension === 'service-a')!;
+      expect(serviceA.count).toBe(4);
+      expect(serviceA.totalCost).toBeCloseTo(0.72, 6);
+      expect(serviceA.totalTokens).toBe(7200);
+    });
+
+    test('should weight cost, tokens and the average in the summary', async () => {
+      const summary = await getAnalyticsSummary(db, {
+        customerId: 'customer-1',
+      });
+
+      expect(summary.totalRequests).toBe(4);
+      expect(summary.totalCost).toBeCloseTo(0.72, 6);
+      expect(summary.totalTokens).toBe(7200);
+      // Averaged over the 13 calls the rows stand for
+      expect(summary.avgCost).toBeCloseTo(0.72 / 13, 6);
+    });
+  });
 });
@@ -47,6 +47,7 @@ describe.skip('Schema Definitions', () => {
     expect(columnNames).toContain('span_id');
     expect(columnNames).toContain('customer_id');
     expect(columnNames).toContain('cost_usd');
+    expect(columnNames).toContain('sample_weight');
     expect(columnNames).toContain('latency_ms');
   });
 
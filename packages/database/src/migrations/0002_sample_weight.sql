@@ -0,0 +1 @@
+ALTER TABLE "traces" ADD COLUMN "sample_weight" double precision DEFAULT 1 NOT NULL;
@@ -0,0 +1 @@
+ALTER TABLE "traces" ADD COLUMN "sample_rate" double precision;
@@ -3,6 +3,12 @@ import type { Database } from '../db';
 import { traces } from '../schema';
 import type postgres from 'postgres';
 
+// Calls each row stands for: sample_weight from the SDK's cost sampler, divided by
+// sample_rate from its head sampler
+const callWeight = sql`${traces.sampleWeight} / COALESCE(${traces.sampleRate}, 1)`;
+const weightedCost = sql`${traces.costUsd} * ${callWeight}`;
+const weightedTokens = sql`${traces.tokens} * ${callWeight}`;
+
 /**
  * Timeline data point for cost/usage over time
  */
@@ -46,9 +52,9 @@ export async function getCostTimeline(
       SELECT
         date_trunc(${granularity}, timestamp) as "timeBucket",
         COUNT(*)::int as count,
-        COALESCE(SUM(cost_usd), 0)::float as "totalCost",
+        COALESCE(SUM(cost_usd * sample_weight / COALESCE(sample_rate, 1)), 0)::float as "totalCost",
         COALESCE(AVG(latency_ms), 0)::float as "avgLatency",
-        COALESCE(SUM(tokens), 0)::int as "totalTokens"
+        COALESCE(ROUND(SUM(tokens * sample_weight / COALESCE(sample_rate, 1))), 0)::int as "totalTokens"
       FROM traces
       WHERE customer_id = ${customerId}
         AND timestamp >= ${startTime}::timestamptz
@@ -61,9 +67,9 @@ export async function getCostTimeline(
       SELECT
         date_trunc(${granularity}, timestamp) as "timeBucket",
         COUNT(*)::int as count,
-        COALESCE(SUM(cost_usd), 0)::float as "totalCost",
+        COALESCE(SUM(cost_usd * sample_weight / COALESCE(sample_rate, 1)), 0)::float as "totalCost",
         COALESCE(AVG(latency_ms), 0)::float as "avgLatency",
-        COALESCE(SUM(tokens), 0)::int as "totalTokens"
+        COALESCE(ROUND(SUM(tokens * sample_weight / COALESCE(sample_rate, 1))), 0)::int as "totalTokens"
       FROM traces
       WHERE customer_id = ${customerId}
         AND timestamp >= ${startTime}::timestamptz
@@ -150,14 +156,14 @@ export async function getCostBreakdown(
     .select({
       dimension: groupByColumn,
       count: sql<number>`COUNT(*)::int`,
-      totalCost: sql<number>`COALESCE(SUM(${traces.costUsd}), 0)::float`,
+      totalCost: sql<number>`COALESCE(SUM(${weightedCost}), 0)::float`,
       avgLatency: sql<number>`COALESCE(AVG(${traces.latencyMs}), 0)::float`,
-      totalTokens: sql<number>`COALESCE(SUM(${traces.tokens}), 0)::int`,
+      totalTokens: sql<number>`COALESCE(ROUND(SUM(${weightedTokens})), 0)::int`,
     })
     .from(traces)
     .where(and(...conditions))
     .groupBy(groupByColumn)
-    .orderBy(desc(sql`COALESCE(SUM(${traces.costUsd}), 0)`))
+    .orderBy(desc(sql`COALESCE(SUM(${weightedCost}), 0)`))
     .limit(options.limit || 50);
 
   return result.map((row) => ({
@@ -316,8 +322,12 @@ export async function getEndpointTrends(
       service_name as "serviceName",
       model,
       COUNT(*)::int as "totalRequests",
-      COALESCE(SUM(cost_usd), 0)::float as "totalCost",
-      COALESCE(AVG(cost_usd), 0)::float as "avgCost",
+      COALESCE(SUM(cost_usd * sample_weight / COALESCE(sample_rate, 1)), 0)::float as "totalCost",
+      COALESCE(
+        SUM(cost_usd * sample_weight / COALESCE(sample_rate, 1))
+          / NULLIF(SUM(sample_weight / COALESCE(sample_rate, 1)), 0),
+        0
+      )::float as "avgCost",
       COALESCE(AVG(latency_ms), 0)::float as "avgLatency",
       COUNT(*) FILTER (WHERE status = 'error')::int as "errorCount"
     FROM traces
@@ -388,9 +398,9 @@ export async function getAnalyticsSummary(
   const result = await db
     .select({
       totalRequests: sql<number>`COUNT(*)::int`,
-      totalCost: sql<number>`COALESCE(SUM(${traces.costUsd}), 0)::float`,
-      avgCost: sql<number>`COALESCE(AVG(${traces.costUsd}), 0)::float`,
-      totalTokens: sql<number>`COALESCE(SUM(${traces.tokens}), 0)::int`,
+      totalCost: sql<number>`COALESCE(SUM(${weightedCost}), 0)::float`,
+      avgCost: sql<number>`COALESCE(SUM(${weightedCost}) / NULLIF(SUM(${callWeight}), 0), 0)::float`,
+      totalTokens: sql<number>`COALESCE(ROUND(SUM(${weightedTokens})), 0)::int`,
       avgLatency: sql<number>`COALESCE(AVG(${traces.latencyMs}), 0)::float`,
       errorCount: sql<number>`COUNT(*) FILTER (WHERE ${traces.status} = 'error')::int`,
       uniqueServices: sql<number>`COUNT(DISTINCT ${traces.serviceName})::int`,
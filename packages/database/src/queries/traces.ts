@@ -2,6 +2,9 @@ import { eq, and, gte, lte, desc, sql, inArray } from 'drizzle-orm';
 import type { Database } from '../db';
 import { traces, type Trace, type NewTrace } from '../schema';
 
+// Calls each row stands for after SDK cost and head sampling
+const callWeight = sql`${traces.sampleWeight} / COALESCE(${traces.sampleRate}, 1)`;
+
 /**
  * Trace query options for filtering
  */
@@ -192,8 +195,8 @@ export async function getTraceMetrics(
   const result = await db
     .select({
       totalTraces: sql<number>`COUNT(*)::int`,
-      totalTokens: sql<number>`COALESCE(SUM(${traces.tokens}), 0)::int`,
-      totalCost: sql<number>`COALESCE(SUM(${traces.costUsd}), 0)::float`,
+      totalTokens: sql<number>`COALESCE(ROUND(SUM(${traces.tokens} * ${callWeight})), 0)::int`,
+      totalCost: sql<number>`COALESCE(SUM(${traces.costUsd} * ${callWeight}), 0)::float`,
       avgLatency: sql<number>`COALESCE(AVG(${traces.latencyMs}), 0)::float`,
       successCount: sql<number>`COUNT(*) FILTER (WHERE ${traces.status} = 'success')::int`,
     })
@@ -48,6 +48,10 @@ export const traces = pgTable(
     completionTokens: integer('completion_tokens'),
     latencyMs: doublePrecision('latency_ms').notNull(),
     costUsd: doublePrecision('cost_usd').default(0),
+    // How many calls this row stands for after SDK cost sampling; weights cost/token totals
+    sampleWeight: doublePrecision('sample_weight').default(1).notNull(),
+    // Head-sampling keep probability of the trace (NULL when not sampled); divides the weight
+    sampleRate: doublePrecision('sample_rate'),
 
     // Metadata
     metadata: jsonb('metadata'),
@@ -34,6 +34,11 @@ export const TraceSchema = z.object({
   completion_tokens: z.number().int().nonnegative().optional(),
   latency_ms: z.number().nonnegative(),
   cost_usd: z.number().nonnegative(),
+  // Spans the SDK's cost sampler kept on behalf of the cheap calls it dropped carry
+  // 1 / keep-probability; cost and token totals are weighted by it (absent = 1)
+  sample_weight: z.number().positive().optional(),
+  // Probability the SDK's head sampler kept the span's trace with; totals are divided by it
+  sample_rate: z.number().positive().max(1).optional(),
 
   // Metadata
   metadata: z.record(z.unknown()).optional(),
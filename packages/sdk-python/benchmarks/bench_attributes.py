@@ -0,0 +1,82 @@
+"""
+Per-span cost of attribute handling in ``Lumina.trace``.
+
+Times ``lumina.trace`` with a few metadata entries two ways: as the SDK does
+it now (environment and service name on the resource, metadata set in one
+call) and the way it used to, replayed inside the traced function: one
+``set_attribute`` per metadata entry plus the two static attributes on
+every span.  The export queue is kept tiny so spans are dropped right after
+they end and only the tracing path is measured.
+
+Usage::
+
+    python benchmarks/bench_attributes.py [--spans 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+from typing import Any
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spans", type=int, default=50_000)
+    args = parser.parse_args()
+
+    from lumina import Lumina
+    from lumina import semantic_conventions as SC
+
+    lumina = Lumina(
+        {
+            "endpoint": "http://127.0.0.1:9/v1/traces",
+            "service_name": "bench",
+            "batch_interval_ms": 600_000,
+            "max_queue_size": 10,
+            "batch_size": 10,
+            "max_retries": 0,
+            "timeout_ms": 100,
+        }
+    )
+    metadata = {"user_id": "u-123", "feature": "summarize", "attempt": 1}
+
+    def handler(span: Any) -> None:
+        pass
+
+    def previous_attributes(span: Any) -> None:
+        for key, value in metadata.items():
+            span.set_attribute(key, json.dumps(value))
+        span.set_attribute(SC.LUMINA_ENVIRONMENT, "live")
+        span.set_attribute(SC.LUMINA_SERVICE_NAME, "bench")
+
+    namespace = {
+        "lumina": lumina,
+        "metadata": metadata,
+        "handler": handler,
+        "previous_attributes": previous_attributes,
+    }
+    timers = {
+        "per span (before)": timeit.Timer(
+            "lumina.trace('request', previous_attributes)", globals=namespace
+        ),
+        "resource (now)": timeit.Timer(
+            "lumina.trace('request', handler, metadata=metadata)", globals=namespace
+        ),
+    }
+    # Interleaved so drift on a busy machine hits both alike
+    results = {label: float("inf") for label in timers}
+    for _ in range(5):
+        for label, timer in timers.items():
+            results[label] = min(results[label], timer.timeit(args.spans) / args.spans * 1e9)
+
+    before = results["per span (before)"]
+    print(f"{args.spans:,} spans, {len(metadata)} metadata entries\n")
+    print(f"{'static attributes':<20} {'ns/span':>9} {'saved ns':>9} {'saved':>7}")
+    for label, ns in results.items():
+        print(f"{label:<20} {ns:>9.0f} {before - ns:>9.0f} {(before - ns) / before:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-call overhead of ``lumina.trace`` / ``trace_llm`` with ``LUMINA_ENABLED=false``.
+
+Times a bare call of a small function against the same call through a
+disabled SDK, and reports the added nanoseconds per call and the overhead
+relative to the bare call.  ``--work`` sets the loop iterations in the
+function, i.e. how much real work each call stands for.
+
+Usage::
+
+    python benchmarks/bench_disabled.py [--calls 1000000] [--work 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from typing import Any, Dict
+
+
+def best_ns(
+    stmts: Dict[str, str], namespace: Dict[str, Any], calls: int, repeat: int = 7
+) -> Dict[str, float]:
+    """Best time per call for each statement, interleaving runs so drift hits all alike."""
+    timers = {label: timeit.Timer(stmt, globals=namespace) for label, stmt in stmts.items()}
+    best = {label: float("inf") for label in stmts}
+    for _ in range(repeat):
+        for label, timer in timers.items():
+            best[label] = min(best[label], timer.timeit(calls) / calls * 1e9)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--work", type=int, default=100, help="loop iterations per call")
+    args = parser.parse_args()
+
+    from lumina import Lumina
+
+    lumina = Lumina({"enabled": False})
+    loaded = sorted(
+        m for m in sys.modules if m.startswith(("opentelemetry.sdk", "lumina.exporter"))
+    )
+    work = range(args.work)
+
+    def handler(span: object = None) -> int:
+        total = 0
+        for i in work:
+            total += i
+        return total
+
+    namespace = {"lumina": lumina, "handler": handler}
+    results = best_ns(
+        {
+            "bare call": "handler(None)",
+            "trace": "lumina.trace('request', handler)",
+            "trace_llm": "lumina.trace_llm(handler)",
+        },
+        namespace,
+        args.calls,
+    )
+    bare = results["bare call"]
+    print(
+        f"{args.calls:,} calls, {args.work} iterations each; SDK modules loaded: {loaded or 'none'}"
+    )
+    print(f"\n{'path':<10} {'ns/call':>9} {'added ns':>9} {'overhead':>9}")
+    for label, ns in results.items():
+        print(f"{label:<10} {ns:>9.1f} {ns - bare:>9.1f} {(ns - bare) / bare:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the OTLP/JSON exporter against the protobuf OTLP exporter.
+
+Measures encode throughput (spans/sec) and payload size (bytes/span) for a
+batch of synthetic LLM spans.  No network traffic is generated.
+
+Usage::
+
+    python benchmarks/bench_exporter.py [--spans 512] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List, Sequence
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from lumina import semantic_conventions as SC
+from lumina.exporter import OTLPJsonSpanExporter
+
+PROMPT = "Summarize the following support ticket in two sentences. " * 8
+COMPLETION = "The customer reports intermittent login failures after the update. " * 6
+
+
+def make_spans(count: int) -> List[ReadableSpan]:
+    memory = InMemorySpanExporter()
+    provider = TracerProvider(resource=Resource.create({"service.name": "bench"}))
+    provider.add_span_processor(SimpleSpanProcessor(memory))
+    tracer = provider.get_tracer("lumina-sdk", "0.1.0")
+    for i in range(count):
+        with tracer.start_as_current_span(SC.SPAN_NAME_LLM_REQUEST) as span:
+            span.set_attribute(SC.LLM_SYSTEM, "openai")
+            span.set_attribute(SC.LLM_RESPONSE_MODEL, "gpt-4o-mini")
+            span.set_attribute(SC.LLM_PROMPT, PROMPT)
+            span.set_attribute(SC.LLM_COMPLETION, COMPLETION)
+            span.set_attribute(SC.LLM_USAGE_PROMPT_TOKENS, 120 + i % 7)
+            span.set_attribute(SC.LLM_USAGE_COMPLETION_TOKENS, 80 + i % 5)
+            span.set_attribute(SC.LUMINA_COST_USD, 0.00042)
+            span.set_attribute("duration_ms", 250)
+    return list(memory.get_finished_spans())
+
+
+def bench(
+    label: str, encode: Callable[[Sequence[ReadableSpan]], bytes], spans, rounds: int
+) -> None:
+    size = len(encode(spans))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(spans)
+    elapsed = time.perf_counter() - start
+    throughput = len(spans) * rounds / elapsed
+    print(f"{label:<12} {throughput:>12,.0f} spans/s {size / len(spans):>10,.1f} bytes/span")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spans", type=int, default=512)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    spans = make_spans(args.spans)
+
+    json_exporter = OTLPJsonSpanExporter("http://localhost:9411/v1/traces")
+    bench("otlp_json", json_exporter.encode, spans, args.rounds)
+
+    try:
+        from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+    except ImportError:
+        print("otlp_proto   skipped (opentelemetry-exporter-otlp-proto-common not installed)")
+        return
+    bench("otlp_proto", lambda batch: encode_spans(batch).SerializeToString(), spans, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
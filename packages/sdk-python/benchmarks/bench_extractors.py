@@ -0,0 +1,88 @@
+"""
+Response extraction: attribute probing vs the per-type extractor registry.
+
+Builds chat-completion and Anthropic-message shaped responses from plain
+classes registered with the OpenAI and Anthropic extractors and times
+extracting model, id, completion and usage from each with the old
+``getattr`` probing and with ``extract_response``.  A raw JSON chat
+completion, which probing could not read at all, is timed on its own.
+
+Usage::
+
+    python benchmarks/bench_extractors.py [--calls 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Any
+
+from lumina import extractors
+from lumina.extractors import extract_response, register_extractor
+
+
+class _Object:
+    def __init__(self, **fields: Any) -> None:
+        self.__dict__.update(fields)
+
+
+class ChatCompletion(_Object):
+    pass
+
+
+class Message(_Object):
+    pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    register_extractor(ChatCompletion, extractors._openai_chat)
+    register_extractor(Message, extractors._anthropic_message)
+    responses = {
+        "openai chat": ChatCompletion(
+            model="gpt-4",
+            id="chatcmpl-1",
+            choices=[_Object(message=_Object(content="Hello!"))],
+            usage=_Object(prompt_tokens=12, completion_tokens=3, total_tokens=15),
+        ),
+        "anthropic message": Message(
+            model="claude-3-haiku",
+            id="msg_1",
+            content=[_Object(type="text", text="Hello!")],
+            usage=_Object(input_tokens=12, output_tokens=3),
+        ),
+        "chat JSON dict": {
+            "object": "chat.completion",
+            "model": "gpt-4",
+            "id": "chatcmpl-1",
+            "choices": [{"message": {"content": "Hello!"}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+        },
+    }
+
+    print(f"{args.calls:,} calls\n")
+    print(f"{'response':<20} {'probe ns':>9} {'registry ns':>12} {'speedup':>8}")
+    for label, response in responses.items():
+        namespace = {"probe": extractors._probe, "extract": extract_response, "r": response}
+        timers = {
+            "probe": timeit.Timer("probe(r)", globals=namespace),
+            "registry": timeit.Timer("extract(r)", globals=namespace),
+        }
+        # Interleaved so drift on a busy machine hits both alike
+        best = {name: float("inf") for name in timers}
+        for _ in range(5):
+            for name, timer in timers.items():
+                best[name] = min(best[name], timer.timeit(args.calls) / args.calls * 1e9)
+        probe, registry = best["probe"], best["registry"]
+        if isinstance(response, dict):
+            print(f"{label:<20} {'-':>9} {registry:>12.0f} {'-':>8}")
+        else:
+            print(f"{label:<20} {probe:>9.0f} {registry:>12.0f} {probe / registry:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
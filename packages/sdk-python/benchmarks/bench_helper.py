@@ -0,0 +1,151 @@
+"""
+Request-thread latency with the threaded exporter vs the export helper process.
+
+Runs a CPU-bound "request handler" on several threads, tracing every request
+with LLM-sized attributes, and reports p50/p99 request latency for each
+export mode.  Spans go to a throwaway collector in its own process, and each
+mode runs in a fresh interpreter.
+
+Usage::
+
+    python benchmarks/bench_helper.py [--threads 4] [--requests 2000] [--work 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import List
+
+_COLLECTOR = """
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+PROMPT = "Summarize the following support ticket in two sentences. " * 8
+COMPLETION = "The customer reports intermittent login failures after the update. " * 6
+
+
+def run_mode(args: argparse.Namespace) -> None:
+    from lumina import Lumina
+
+    lumina = Lumina(
+        {
+            "endpoint": args.endpoint,
+            "service_name": "bench",
+            "helper_process": args.mode == "helper",
+            "batch_size": 64,
+            "batch_interval_ms": 100,
+            "max_queue_size": 100_000,
+        }
+    )
+    metadata = {"prompt": PROMPT, "completion": COMPLETION, "model": "gpt-4o-mini"}
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def handler(span: object) -> int:
+        return sum(i * i for i in range(args.work))
+
+    def worker() -> None:
+        local: List[float] = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            lumina.trace("request", handler, metadata=metadata)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    asyncio.run(lumina.shutdown())
+
+    latencies.sort()
+    print(
+        json.dumps(
+            {
+                "p50": statistics.median(latencies),
+                "p99": latencies[int(len(latencies) * 0.99)],
+                "rps": len(latencies) / elapsed,
+                "dropped": sum(lumina.get_drop_counts().values()),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per thread")
+    parser.add_argument("--work", type=int, default=20000, help="loop iterations per request")
+    parser.add_argument("--mode", choices=["threaded", "helper"], help=argparse.SUPPRESS)
+    parser.add_argument("--endpoint", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args)
+        return
+
+    collector = subprocess.Popen(
+        [sys.executable, "-c", _COLLECTOR], stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert collector.stdout is not None
+        endpoint = f"http://127.0.0.1:{collector.stdout.readline().strip()}/v1/traces"
+        print(f"{args.threads} threads x {args.requests} requests, {args.work} iterations each\n")
+        print(f"{'mode':<10} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>9} {'dropped':>8}")
+        for mode in ("threaded", "helper"):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--mode",
+                    mode,
+                    "--endpoint",
+                    endpoint,
+                    "--threads",
+                    str(args.threads),
+                    "--requests",
+                    str(args.requests),
+                    "--work",
+                    str(args.work),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:<10} {result['p50']:>8.2f} {result['p99']:>8.2f} "
+                f"{result['rps']:>9,.0f} {result['dropped']:>8}"
+            )
+    finally:
+        collector.kill()
+
+
+if __name__ == "__main__":
+    main()
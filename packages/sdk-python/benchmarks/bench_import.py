@@ -0,0 +1,106 @@
+"""
+Import cost of the SDK, measured with ``python -X importtime`` in fresh interpreters.
+
+Reports the cumulative import time of each scenario (median of ``--runs``)
+and the slowest modules it pulls in, and fails if a scenario loads a module
+it should not (the export stack before ``init_lumina``, protobuf or
+requests at all) or, with ``--max-ms``, if ``import lumina`` gets slower.
+
+Usage::
+
+    python benchmarks/bench_import.py [--runs 5] [--top 8] [--max-ms 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+SCENARIOS: Dict[str, str] = {
+    "import lumina": "import lumina",
+    "from lumina import init_lumina": "from lumina import init_lumina",
+    "disabled init_lumina": "from lumina import init_lumina; init_lumina({'enabled': False})",
+    "init_lumina": (
+        "from lumina import init_lumina; "
+        "init_lumina({'endpoint': 'http://127.0.0.1:9/v1/traces'})"
+    ),
+}
+
+# Modules each scenario must not load
+FORBIDDEN: Dict[str, Tuple[str, ...]] = {
+    "import lumina": ("opentelemetry", "lumina.exporter", "lumina.processor"),
+    "from lumina import init_lumina": ("opentelemetry.sdk", "lumina.exporter"),
+    "disabled init_lumina": ("opentelemetry.sdk", "lumina.exporter", "lumina.processor"),
+    "init_lumina": ("google.protobuf", "requests"),
+}
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importtime(code: str) -> List[Tuple[float, str]]:
+    """(cumulative ms, module) for each top-level import made while running ``code``."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [_ROOT, env.get("PYTHONPATH")]))
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stderr
+    modules: List[Tuple[float, str]] = []
+    for line in stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        modules.append((int(fields[1]) / 1000, fields[2][1:]))
+    return modules
+
+
+def measure(code: str, startup: Set[str]) -> Tuple[float, List[Tuple[float, str]]]:
+    """Milliseconds spent on imports beyond interpreter startup, and the modules loaded."""
+    modules = [(ms, name) for ms, name in importtime(code) if name.strip() not in startup]
+    total = sum(ms for ms, name in modules if not name.startswith(" "))
+    return total, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="fail if `import lumina` is slower")
+    args = parser.parse_args()
+
+    startup = {name.strip() for _, name in importtime("pass")}
+    failures: List[str] = []
+    for label, code in SCENARIOS.items():
+        runs = [measure(code, startup) for _ in range(args.runs)]
+        total = statistics.median(total for total, _ in runs)
+        modules = runs[-1][1]
+        print(f"{label}: {total:.1f} ms")
+        top = sorted(
+            ((ms, name) for ms, name in modules if not name.startswith(" ")), reverse=True
+        )[: args.top]
+        for ms, name in top:
+            print(f"    {ms:8.1f} ms  {name}")
+
+        loaded = {name.strip() for _, name in modules}
+        for prefix in FORBIDDEN[label]:
+            bad = sorted(name for name in loaded if name == prefix or name.startswith(prefix + "."))
+            if bad:
+                failures.append(f"{label} loaded {bad[0]}")
+        if label == "import lumina" and args.max_ms is not None and total > args.max_ms:
+            failures.append(f"import lumina took {total:.1f} ms (limit {args.max_ms} ms)")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
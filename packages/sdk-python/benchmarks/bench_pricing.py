@@ -0,0 +1,76 @@
+"""
+Model-price lookup: linear substring scan vs ``PricingIndex``.
+
+Prices a rotating mix of dated, provider-prefixed and unknown model names
+with the old scan over the pricing table (first key that is a substring of
+the name) and with the trie index, and lists the names the two price
+differently.
+
+Usage::
+
+    python benchmarks/bench_pricing.py [--calls 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import logging
+import timeit
+from typing import Tuple
+
+from lumina.pricing import DEFAULT_PRICING, FALLBACK_PRICE, PricingIndex
+
+MODELS = [
+    "gpt-4",
+    "gpt-4-turbo-2024-04-09",
+    "gpt-4-0613",
+    "gpt-4o-mini",
+    "gpt-3.5-turbo-0125",
+    "openai/gpt-4-turbo",
+    "claude-3-haiku-20240307",
+    "us.anthropic.claude-3-haiku-20240307-v1:0",
+    "claude-sonnet-4-20250514",
+    "my-finetune-v2",
+]
+
+
+def scan(model: str) -> Tuple[float, float]:
+    key = next((k for k in DEFAULT_PRICING if k in model), None)
+    price = DEFAULT_PRICING.get(key or "", FALLBACK_PRICE)
+    return price.input, price.output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # Unknown models are reported, once
+    index = PricingIndex(DEFAULT_PRICING)
+    names = itertools.cycle(MODELS)
+    namespace = {"scan": scan, "lookup": index.lookup, "names": names, "next": next}
+    timers = {
+        "substring scan": timeit.Timer("scan(next(names))", globals=namespace),
+        "PricingIndex": timeit.Timer("lookup(next(names))", globals=namespace),
+    }
+    # Interleaved so drift on a busy machine hits both alike
+    best = {label: float("inf") for label in timers}
+    for _ in range(5):
+        for label, timer in timers.items():
+            best[label] = min(best[label], timer.timeit(args.calls) / args.calls * 1e9)
+
+    print(f"{args.calls:,} lookups over {len(MODELS)} model names\n")
+    print(f"{'lookup':<16} {'ns/call':>9} {'speedup':>8}")
+    for label, ns in best.items():
+        print(f"{label:<16} {ns:>9.0f} {best['substring scan'] / ns:>7.1f}x")
+
+    print("\nPriced differently (scan -> index):")
+    for model in MODELS:
+        price = index.lookup(model)
+        if scan(model) != (price.input, price.output):
+            print(f"  {model:<44} {scan(model)} -> {(price.input, price.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
-from .lumina import Lumina, init_lumina, get_lumina
+from typing import TYPE_CHECKING, Any
+
 from . import semantic_conventions as SemanticConventions
-from .types import SdkConfig
+from .extractors import LlmResponse, register_extractor
+from .types import FlushReport, SdkConfig
+
+if TYPE_CHECKING:
+    from .lumina import Lumina, get_lumina, init_lumina
 
 __all__ = [
     "Lumina",
@@ -8,4 +13,20 @@ __all__ = [
     "get_lumina",
     "SemanticConventions",
     "SdkConfig",
+    "FlushReport",
+    "register_extractor",
+    "LlmResponse",
 ]
+
+# Loaded on first access so `import lumina` does not pull in OpenTelemetry
+_LAZY = {"Lumina", "init_lumina", "get_lumina"}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        from . import lumina as _module
+
+        value = getattr(_module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,412 @@
+"""
+Per-host aggregation agent.
+
+Run one agent per host::
+
+    LUMINA_ENDPOINT=https://collector.example/v1/traces python -m lumina.agent
+
+and point every worker process at it with ``LUMINA_AGENT_SOCKET``.  Workers
+then encode their spans and write them to a Unix domain socket, while the
+agent merges the spans from all of them into large batches and owns the
+compression, retries, spool and connections to the collector.  The agent
+reads the same ``LUMINA_*`` settings as the SDK.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .config import load_sdk_config
+from .exporter import EncodedGroups, OTLPJsonEncoder, OTLPJsonSpanExporter, write_request
+from .pipeline import build_exporter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/lumina-agent.sock"
+
+# Wire format: every frame is a big-endian u32 length followed by that many
+# bytes.  A frame holds the spans of one resource and scope: a version byte,
+# the encoded resource and scope (u32-prefixed each), a u32 span count and
+# then each encoded span, u32-prefixed.
+_PROTOCOL_VERSION = 1
+_U32 = struct.Struct(">I")
+_MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def _pack_frame(resource: bytes, scope: bytes, spans: Sequence[bytes]) -> bytes:
+    parts = [
+        bytes((_PROTOCOL_VERSION,)),
+        _U32.pack(len(resource)),
+        resource,
+        _U32.pack(len(scope)),
+        scope,
+        _U32.pack(len(spans)),
+    ]
+    for span in spans:
+        parts.append(_U32.pack(len(span)))
+        parts.append(span)
+    payload = b"".join(parts)
+    return _U32.pack(len(payload)) + payload
+
+
+def _unpack_frame(payload: bytes) -> Tuple[bytes, bytes, List[bytes]]:
+    if not payload or payload[0] != _PROTOCOL_VERSION:
+        raise ValueError("Unsupported agent protocol version")
+    view = memoryview(payload)
+    offset = 1
+
+    def field() -> bytes:
+        nonlocal offset
+        (length,) = _U32.unpack_from(view, offset)
+        start = offset + _U32.size
+        offset = start + length
+        if offset > len(view):
+            raise ValueError("Truncated agent frame")
+        return bytes(view[start:offset])
+
+    resource = field()
+    scope = field()
+    (count,) = _U32.unpack_from(view, offset)
+    offset += _U32.size
+    return resource, scope, [field() for _ in range(count)]
+
+
+# ------------------------------------------------------------------
+# Client
+# ------------------------------------------------------------------
+
+
+class AgentSpanExporter(SpanExporter):
+    """
+    Hands finished spans to a local :mod:`lumina.agent` over a Unix socket.
+
+    Spans are encoded in the worker (resource and scope fragments are cached,
+    as in :class:`~lumina.exporter.OTLPJsonEncoder`) and written with a single
+    ``sendall``; there is no HTTP, compression or retry on this side.  If the
+    agent is not running the batch fails and the connection is retried on
+    the next export.  A slow agent fills the socket buffer, which blocks the
+    export thread and so backs up into the span processor's queue.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, *, timeout_ms: int = 30000) -> None:
+        self.socket_path = socket_path
+        self._timeout = timeout_ms / 1000
+        self._encoder = OTLPJsonEncoder()
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._connected = True
+        self._shutdown = False
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self._shutdown:
+            logger.warning("Exporter already shutdown, ignoring batch")
+            return SpanExportResult.FAILURE
+        if not spans:
+            return SpanExportResult.SUCCESS
+
+        data = b"".join(
+            _pack_frame(resource, scope, encoded)
+            for resource, scopes in self._encoder.encode_groups(spans).items()
+            for scope, encoded in scopes.items()
+        )
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(data)
+            except OSError as exc:
+                self._close_socket()
+                if self._connected:
+                    logger.warning("Lumina agent at %s unavailable: %s", self.socket_path, exc)
+                self._connected = False
+                return SpanExportResult.FAILURE
+            if not self._connected:
+                logger.info("Reconnected to Lumina agent at %s", self.socket_path)
+                self._connected = True
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self._shutdown = True
+        with self._lock:
+            self._close_socket()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _close_socket(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+# ------------------------------------------------------------------
+# Agent
+# ------------------------------------------------------------------
+
+
+class LuminaAgent:
+    """
+    Receives encoded spans from local workers and uploads them in large batches.
+
+    Spans from all connections are merged into one buffer, grouped by
+    resource and scope, and a batch is sent once it reaches
+    ``max_batch_bytes`` or ``batch_interval_ms`` has passed, on up to
+    ``max_concurrent_exports`` threads.  The buffer holds at most
+    ``max_queue_bytes``; beyond that the connection handlers stop reading,
+    and the workers' own queues and overflow policies take over.
+    """
+
+    def __init__(
+        self,
+        exporter: OTLPJsonSpanExporter,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        *,
+        max_batch_bytes: int = 4 * 1024 * 1024,
+        max_queue_bytes: int = 64 * 1024 * 1024,
+        batch_interval_ms: float = 1000,
+        max_concurrent_exports: int = 2,
+    ) -> None:
+        if max_queue_bytes < max_batch_bytes:
+            raise ValueError("max_queue_bytes must be at least max_batch_bytes")
+        self.socket_path = socket_path
+        self._exporter = exporter
+        self._max_batch_bytes = max_batch_bytes
+        self._max_queue_bytes = max_queue_bytes
+        self._batch_interval = batch_interval_ms / 1000
+
+        # (resource, scope, encoded span) triples, oldest first
+        self._queue: Deque[Tuple[bytes, bytes, bytes]] = deque()
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._stopping = False
+        self._spans_received = 0
+        self._batches_sent = 0
+
+        self._server = self._bind(socket_path)
+        self._threads = [
+            threading.Thread(name=f"LuminaAgentExport-{index}", target=self._run, daemon=True)
+            for index in range(max_concurrent_exports)
+        ]
+
+    def serve_forever(self) -> None:
+        """Accept worker connections until :meth:`stop` is called, then drain."""
+        for thread in self._threads:
+            thread.start()
+        logger.info("Lumina agent listening on %s", self.socket_path)
+        try:
+            while not self._stopping:
+                try:
+                    conn, _ = self._server.accept()
+                except OSError:
+                    if self._stopping:
+                        break
+                    raise
+                threading.Thread(
+                    name="LuminaAgentConnection", target=self._read, args=(conn,), daemon=True
+                ).start()
+        finally:
+            self._drain()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopping = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        try:
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "spans_received": self._spans_received,
+                "batches_sent": self._batches_sent,
+                "queued_bytes": self._queued_bytes,
+            }
+
+    # ------------------------------------------------------------------
+    # Receiving
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bind(path: str) -> socket.socket:
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                # Left behind by an agent that did not exit cleanly
+                os.unlink(path)
+            else:
+                raise RuntimeError(f"Another Lumina agent is already listening on {path}")
+            finally:
+                probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(128)
+        return server
+
+    def _read(self, conn: socket.socket) -> None:
+        reader = conn.makefile("rb")
+        try:
+            while not self._stopping:
+                header = reader.read(_U32.size)
+                if len(header) < _U32.size:
+                    return
+                (length,) = _U32.unpack(header)
+                if length > _MAX_FRAME_BYTES:
+                    raise ValueError(f"Agent frame of {length} bytes exceeds the limit")
+                payload = reader.read(length)
+                if len(payload) < length:
+                    return
+                self._enqueue(*_unpack_frame(payload))
+        except (OSError, ValueError, struct.error) as exc:
+            logger.warning("Dropping Lumina agent connection: %s", exc)
+        finally:
+            reader.close()
+            conn.close()
+
+    def _enqueue(self, resource: bytes, scope: bytes, spans: List[bytes]) -> None:
+        size = sum(len(span) for span in spans)
+        with self._lock:
+            # Stop reading (and so push back on the worker) while the buffer is full
+            while self._queued_bytes + size > self._max_queue_bytes and self._queue:
+                if self._stopping:
+                    return
+                self._not_full.wait()
+            self._queue.extend((resource, scope, span) for span in spans)
+            self._queued_bytes += size
+            self._spans_received += len(spans)
+            if self._queued_bytes >= self._max_batch_bytes:
+                self._not_empty.notify()
+
+    # ------------------------------------------------------------------
+    # Exporting
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._stopping and self._queued_bytes < self._max_batch_bytes:
+                    self._not_empty.wait(self._batch_interval)
+                if self._stopping:
+                    return
+            self._export_batch()
+
+    def _drain(self) -> None:
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join()
+        while self._export_batch():
+            pass
+        self._exporter.shutdown()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def _export_batch(self) -> bool:
+        groups: EncodedGroups = {}
+        count = 0
+        batch_bytes = 0
+        with self._lock:
+            while self._queue:
+                resource, scope, span = self._queue[0]
+                if count and batch_bytes + len(span) > self._max_batch_bytes:
+                    break
+                self._queue.popleft()
+                groups.setdefault(resource, {}).setdefault(scope, []).append(span)
+                count += 1
+                batch_bytes += len(span)
+            self._queued_bytes -= batch_bytes
+            self._not_full.notify_all()
+        if not count:
+            return False
+
+        buf = bytearray()
+        write_request(groups, buf)
+        try:
+            self._exporter.export_encoded(bytes(buf), count)
+        except Exception:
+            logger.exception("Exception while exporting spans")
+        with self._lock:
+            self._batches_sent += 1
+        return True
+
+
+# ------------------------------------------------------------------
+# Entry point
+# ------------------------------------------------------------------
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m lumina.agent",
+        description="Per-host agent that batches and uploads spans from local Lumina workers.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("LUMINA_AGENT_SOCKET", DEFAULT_SOCKET_PATH),
+        help="Unix socket to listen on (default: $LUMINA_AGENT_SOCKET or %(default)s)",
+    )
+    parser.add_argument(
+        "--max-batch-bytes",
+        type=int,
+        default=4 * 1024 * 1024,
+        help="Target upload size (default: %(default)s)",
+    )
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s"
+    )
+
+    config = load_sdk_config()
+    agent = LuminaAgent(
+        build_exporter(config),
+        args.socket,
+        max_batch_bytes=args.max_batch_bytes,
+        max_queue_bytes=max(16 * args.max_batch_bytes, 64 * 1024 * 1024),
+        batch_interval_ms=config.batch_interval_ms,
+        max_concurrent_exports=config.max_concurrent_exports,
+    )
+
+    def _stop(signum: int, frame: object) -> None:
+        logger.info("Lumina agent stopping (signal %d), flushing buffered spans", signum)
+        threading.Thread(target=agent.stop, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    started = time.monotonic()
+    agent.serve_forever()
+    logger.info("Lumina agent stopped after %.0f s: %s", time.monotonic() - started, agent.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import sys
+from collections import abc
+from typing import Any, Dict, Mapping, Sequence
+
+from . import semantic_conventions as SC
+
+try:
+    import orjson
+
+    def _to_json(value: Any) -> str:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+except ImportError:  # pragma: no cover - depends on the environment
+    _json_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def _to_json(value: Any) -> str:
+        return _json_encoder.encode(value)
+
+
+# Types OTel accepts as attribute values as they are
+_PRIMITIVES = (str, bool, int, float)
+_PRIMITIVE_TYPES = frozenset(_PRIMITIVES)
+# Exact types that need no depth check (None only appears inside JSON values)
+_SCALAR_TYPES = _PRIMITIVE_TYPES | {type(None)}
+# Placeholder for containers nested deeper than max_depth
+TRUNCATED = "..."
+
+
+class MetadataEncoder:
+    """
+    Turns ``metadata`` dicts into span attributes.
+
+    Strings, bools, ints and floats, and lists or tuples whose items all have
+    one of those types, are passed through unchanged since OTel stores them
+    natively.  Anything else is serialized to a JSON string (with ``orjson``
+    when installed, and ``str()`` for objects JSON cannot represent), after
+    replacing containers nested more than ``max_depth`` levels down with
+    ``"..."``.
+
+    Only the first ``max_keys`` entries are kept; the number dropped is
+    recorded as ``lumina.metadata.dropped_keys``.
+
+    Nothing is cached: checking that a reused dict is unchanged costs about
+    as much as encoding it again (see ``benchmarks/bench_metadata.py``).
+    """
+
+    def __init__(self, max_keys: int = 128, max_depth: int = 4) -> None:
+        self._max_keys = max_keys
+        self._max_depth = max_depth
+
+    def encode(self, metadata: Mapping[str, Any]) -> Dict[str, Any]:
+        """Attributes for ``metadata``."""
+        attributes: Dict[str, Any] = {}
+        for index, (key, value) in enumerate(metadata.items()):
+            if index == self._max_keys:
+                attributes[SC.LUMINA_METADATA_DROPPED_KEYS] = len(metadata) - index
+                break
+            if type(key) is str:
+                # Interned so queued spans share one copy of each key
+                key = sys.intern(key)
+            attributes[key] = self.encode_value(value)
+        return attributes
+
+    def encode_value(self, value: Any) -> Any:
+        """A single attribute value: passed through if OTel-native, JSON otherwise."""
+        if isinstance(value, _PRIMITIVES):
+            return value
+        if isinstance(value, (list, tuple)) and _homogeneous(value):
+            return tuple(value)
+        if not _fits(value, self._max_depth):
+            value = self._prune(value, 1)
+        return _to_json(value)
+
+    def _prune(self, value: Any, depth: int) -> Any:
+        """Copy of ``value`` with containers below ``max_depth`` replaced by ``TRUNCATED``."""
+        if isinstance(value, (dict, abc.Mapping)):
+            if depth > self._max_depth:
+                return TRUNCATED
+            return {k: self._prune(v, depth + 1) for k, v in value.items()}
+        if isinstance(value, (list, tuple, set, frozenset)):
+            if depth > self._max_depth:
+                return TRUNCATED
+            return [self._prune(v, depth + 1) for v in value]
+        return value
+
+
+def _fits(value: Any, depth: int) -> bool:
+    """Whether ``value`` nests containers at most ``depth`` levels deep."""
+    if isinstance(value, dict):
+        items: Any = value.values()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    elif isinstance(value, abc.Mapping):
+        items = value.values()
+    else:
+        return True
+    if depth == 0:
+        return False
+    for item in items:
+        if type(item) not in _SCALAR_TYPES and not _fits(item, depth - 1):
+            return False
+    return True
+
+
+def _homogeneous(values: Sequence[Any]) -> bool:
+    """True for an empty sequence or one whose items all have the same primitive type."""
+    if not values:
+        return True
+    types = set(map(type, values))
+    return len(types) == 1 and types.pop() in _PRIMITIVE_TYPES
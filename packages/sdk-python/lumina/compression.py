@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import gzip
+import logging
+import threading
+import time
+from typing import Any, Dict, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+# (min, default, max) levels the adaptive controller moves between
+_LEVELS: Dict[str, tuple[int, int, int]] = {
+    "gzip": (1, 6, 9),
+    "zstd": (1, 3, 12),
+}
+
+# Bodies smaller than this are sent uncompressed — the framing overhead wins
+MIN_COMPRESS_BYTES = 1024
+
+# Bodies larger than this never go above the default level
+LARGE_BATCH_BYTES = 4 * 1024 * 1024
+
+# Target share of the export thread's wall time spent compressing
+_DUTY_HIGH = 0.25
+_DUTY_LOW = 0.05
+
+# Raw-content zstd dictionary seeded with the strings that dominate Lumina
+# OTLP/JSON payloads, in the order the exporter writes them.  Neither the
+# agent nor the spool decompresses request bodies, so this only helps when the
+# collector that receives them is configured with the same dictionary.
+BUILTIN_DICTIONARY = (
+    b'{"resourceSpans":[{"resource":{"attributes":['
+    b'{"key":"telemetry.sdk.language","value":{"stringValue":"python"}},'
+    b'{"key":"telemetry.sdk.name","value":{"stringValue":"opentelemetry"}},'
+    b'{"key":"telemetry.sdk.version","value":{"stringValue":"1.'
+    b'"}},{"key":"service.instance.id","value":{"stringValue":"'
+    b'"}},{"key":"service.name","value":{"stringValue":"'
+    b'"}},{"key":"service.version","value":{"stringValue":"0.1.0"}},'
+    b'{"key":"lumina.environment","value":{"stringValue":"live"}},'
+    b'{"key":"lumina.service_name","value":{"stringValue":"'
+    b'"}}]},"scopeSpans":[{"scope":{"name":"lumina-sdk","version":"0.1.0"},"spans":['
+    b'{"traceId":"","spanId":"","parentSpanId":"","name":"llm.request","kind":1,'
+    b'"startTimeUnixNano":"","endTimeUnixNano":"","attributes":['
+    b'{"key":"lumina.tags","value":{"arrayValue":{"values":[{"stringValue":"'
+    b'"}]}}},{"key":"gen_ai.system","value":{"stringValue":"openai"}},'
+    b'{"key":"gen_ai.system","value":{"stringValue":"anthropic"}},'
+    b'{"key":"gen_ai.prompt","value":{"stringValue":"You are a helpful assistant. '
+    b"Answer the user's question based on the following context.\"}},"
+    b'{"key":"gen_ai.response.model","value":{"stringValue":"gpt-4o-mini"}},'
+    b'{"key":"gen_ai.response.model","value":{"stringValue":"claude-3-5-sonnet"}},'
+    b'{"key":"gen_ai.response.id","value":{"stringValue":"chatcmpl-"}},'
+    b'{"key":"gen_ai.completion","value":{"stringValue":"I\'m sorry, but I '
+    b"don't have enough information to answer that. Here is a summary of the "
+    b'key points:"}},'
+    b'{"key":"gen_ai.usage.prompt_tokens","value":{"intValue":"'
+    b'"}},{"key":"gen_ai.usage.completion_tokens","value":{"intValue":"'
+    b'"}},{"key":"gen_ai.usage.total_tokens","value":{"intValue":"'
+    b'"}},{"key":"gen_ai.usage.cache_read.input_tokens","value":{"intValue":"'
+    b'"}},{"key":"gen_ai.usage.cache_creation.input_tokens","value":{"intValue":"'
+    b'"}},{"key":"lumina.cost_usd","value":{"doubleValue":0.'
+    b'}},{"key":"duration_ms","value":{"intValue":"'
+    b'"}}],"status":{"code":1}}]}]}]}'
+)
+
+
+def _load_zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "zstd compression requires the 'zstandard' package: pip install 'lumina-sdk[zstd]'"
+        ) from exc
+    return zstandard
+
+
+def load_dictionary(spec: Optional[str]) -> Optional[bytes]:
+    """Resolve the ``compression_dictionary`` setting: ``"builtin"`` or a file path."""
+    if not spec:
+        return None
+    if spec == "builtin":
+        return BUILTIN_DICTIONARY
+    with open(spec, "rb") as fh:
+        return fh.read()
+
+
+class Compressor:
+    """
+    Compresses export request bodies with gzip or zstd.
+
+    With ``level=None`` the level is adaptive: the compressor tracks the share
+    of wall-clock time the export thread spends compressing (its duty cycle)
+    and steps the level down when that share exceeds 25% and back up when it
+    falls below 5%.  Very large batches are additionally capped at the
+    algorithm's default level, and bodies under ``MIN_COMPRESS_BYTES`` are
+    left uncompressed.
+
+    Each compressed batch logs its ratio and compression time at DEBUG level;
+    cumulative totals are available from :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        algorithm: Literal["gzip", "zstd"],
+        *,
+        level: Optional[int] = None,
+        dictionary: Optional[bytes] = None,
+    ) -> None:
+        if algorithm not in _LEVELS:
+            raise ValueError(f"Unknown compression algorithm: {algorithm!r}")
+        if dictionary is not None and algorithm != "zstd":
+            raise ValueError("A compression dictionary is only supported with zstd")
+
+        self.algorithm = algorithm
+        self._min_level, default_level, self._max_level = _LEVELS[algorithm]
+        self._default_level = default_level
+        self._adaptive = level is None
+        self._level = default_level if level is None else level
+
+        self._zstd: Any = _load_zstd() if algorithm == "zstd" else None
+        self._zstd_dict: Any = None
+        if dictionary is not None:
+            self._zstd_dict = self._zstd.ZstdCompressionDict(
+                dictionary, dict_type=self._zstd.DICT_TYPE_RAWCONTENT
+            )
+        self._zstd_local = threading.local()
+
+        self._lock = threading.Lock()
+        self._duty = 0.0
+        self._last_end: Optional[float] = None
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._seconds = 0.0
+        self._batches = 0
+
+    @property
+    def content_encoding(self) -> str:
+        return self.algorithm
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    def compress(self, body: bytes) -> Optional[bytes]:
+        """Compress ``body``, or return None if it is too small to be worth it."""
+        if len(body) < MIN_COMPRESS_BYTES:
+            return None
+
+        level = self._level
+        if len(body) > LARGE_BATCH_BYTES:
+            level = min(level, self._default_level)
+
+        start = time.perf_counter()
+        if self.algorithm == "gzip":
+            compressed = gzip.compress(body, compresslevel=level, mtime=0)
+        else:
+            compressed = self._zstd_compressor(level).compress(body)
+        end = time.perf_counter()
+        elapsed = end - start
+
+        with self._lock:
+            self._bytes_in += len(body)
+            self._bytes_out += len(compressed)
+            self._seconds += elapsed
+            self._batches += 1
+            if self._adaptive:
+                self._adapt(elapsed, end)
+
+        logger.debug(
+            "Compressed export batch with %s level %d: %d -> %d bytes (ratio %.2f) in %.2f ms",
+            self.algorithm,
+            level,
+            len(body),
+            len(compressed),
+            len(body) / max(len(compressed), 1),
+            elapsed * 1000,
+        )
+        return compressed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "algorithm": self.algorithm,
+                "level": self._level,
+                "batches": self._batches,
+                "bytes_in": self._bytes_in,
+                "bytes_out": self._bytes_out,
+                "ratio": self._bytes_in / self._bytes_out if self._bytes_out else 0.0,
+                "seconds": self._seconds,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _adapt(self, elapsed: float, end: float) -> None:
+        """Update the duty-cycle estimate and step the level. Must hold ``self._lock``."""
+        if self._last_end is not None:
+            window = max(end - self._last_end, elapsed)
+            self._duty = 0.8 * self._duty + 0.2 * (elapsed / window)
+            if self._duty > _DUTY_HIGH and self._level > self._min_level:
+                self._level -= 1
+            elif self._duty < _DUTY_LOW and self._level < self._max_level:
+                self._level += 1
+        self._last_end = end
+
+    def _zstd_compressor(self, level: int) -> Any:
+        # ZstdCompressor instances are not thread-safe; keep one per thread and level
+        cache: Optional[Dict[int, Any]] = getattr(self._zstd_local, "cache", None)
+        if cache is None:
+            cache = self._zstd_local.cache = {}
+        compressor = cache.get(level)
+        if compressor is None:
+            compressor = cache[level] = self._zstd.ZstdCompressor(
+                level=level, dict_data=self._zstd_dict
+            )
+        return compressor
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import json
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Union
 
 from .types import SdkConfig
 
@@ -10,20 +11,72 @@ def load_sdk_config(overrides: Dict[str, Any] | None = None) -> SdkConfig:
     """Load SDK configuration from environment variables, applying overrides last."""
     enabled_str = os.environ.get("LUMINA_ENABLED", "true").lower()
     enabled = enabled_str not in ("false", "0", "no")
+    helper_process_str = os.environ.get("LUMINA_HELPER_PROCESS", "false").lower()
+    helper_process = helper_process_str in ("true", "1", "yes")
+    tail_sampling_str = os.environ.get("LUMINA_TAIL_SAMPLING", "false").lower()
+    tail_sampling = tail_sampling_str in ("true", "1", "yes")
 
     batch_interval_ms = int(os.environ.get("LUMINA_BATCH_INTERVAL_MS", "5000"))
+    compression_level = os.environ.get("LUMINA_COMPRESSION_LEVEL")
+    retry_budget_ms = os.environ.get("LUMINA_RETRY_BUDGET_MS")
+    sampling_rules = os.environ.get("LUMINA_SAMPLING_RULES")
+    sampling_budget = os.environ.get("LUMINA_SAMPLING_BUDGET_PER_SEC")
+    cost_sampling_threshold_usd = os.environ.get("LUMINA_COST_SAMPLING_THRESHOLD_USD")
+    tail_min_cost_usd = os.environ.get("LUMINA_TAIL_MIN_COST_USD")
+    tail_min_duration_ms = os.environ.get("LUMINA_TAIL_MIN_DURATION_MS")
 
     config = SdkConfig(
         api_key=os.environ.get("LUMINA_API_KEY"),
-        endpoint=os.environ.get("LUMINA_ENDPOINT", "http://localhost:9411/v1/traces"),
+        endpoint=_parse_endpoint(
+            os.environ.get("LUMINA_ENDPOINT", "http://localhost:9411/v1/traces")
+        ),
+        exporter=os.environ.get("LUMINA_EXPORTER", "otlp_json").lower(),  # type: ignore[arg-type]
+        max_connections=int(os.environ.get("LUMINA_MAX_CONNECTIONS", "2")),
+        max_concurrent_exports=int(os.environ.get("LUMINA_MAX_CONCURRENT_EXPORTS", "2")),
+        agent_socket=os.environ.get("LUMINA_AGENT_SOCKET") or None,
+        helper_process=helper_process,
+        compression=os.environ.get("LUMINA_COMPRESSION", "none").lower(),  # type: ignore[arg-type]
+        compression_level=int(compression_level) if compression_level else None,
+        compression_dictionary=os.environ.get("LUMINA_COMPRESSION_DICTIONARY"),
         service_name=os.environ.get("LUMINA_SERVICE_NAME"),
         environment=os.environ.get("LUMINA_ENVIRONMENT", "live"),  # type: ignore[arg-type]
         customer_id=os.environ.get("LUMINA_CUSTOMER_ID"),
         enabled=enabled,
+        sample_ratio=float(os.environ.get("LUMINA_SAMPLE_RATIO", "1.0")),
+        sampling_rules=json.loads(sampling_rules) if sampling_rules else None,
+        sampling_budget_per_sec=float(sampling_budget) if sampling_budget else None,
+        cost_sampling_threshold_usd=(
+            float(cost_sampling_threshold_usd) if cost_sampling_threshold_usd else None
+        ),
+        cost_sampling_min_ratio=float(os.environ.get("LUMINA_COST_SAMPLING_MIN_RATIO", "0.01")),
+        tail_sampling=tail_sampling,
+        tail_sample_ratio=float(os.environ.get("LUMINA_TAIL_SAMPLE_RATIO", "0.0")),
+        tail_min_cost_usd=float(tail_min_cost_usd) if tail_min_cost_usd else None,
+        tail_min_duration_ms=int(tail_min_duration_ms) if tail_min_duration_ms else None,
+        tail_max_buffered_spans=int(os.environ.get("LUMINA_TAIL_MAX_BUFFERED_SPANS", "10000")),
+        tail_trace_timeout_ms=int(os.environ.get("LUMINA_TAIL_TRACE_TIMEOUT_MS", "30000")),
         batch_size=int(os.environ.get("LUMINA_BATCH_SIZE", "10")),
+        max_batch_bytes=int(os.environ.get("LUMINA_MAX_BATCH_BYTES", str(512 * 1024))),
+        metadata_max_keys=int(os.environ.get("LUMINA_METADATA_MAX_KEYS", "128")),
+        metadata_max_depth=int(os.environ.get("LUMINA_METADATA_MAX_DEPTH", "4")),
+        pricing_catalog=os.environ.get("LUMINA_PRICING_CATALOG") or None,
+        pricing_reload_interval_ms=int(
+            os.environ.get("LUMINA_PRICING_RELOAD_INTERVAL_MS", "30000")
+        ),
+        pricing_tier=os.environ.get(  # type: ignore[arg-type]
+            "LUMINA_PRICING_TIER", "standard"
+        ).lower(),
+        max_queue_size=int(os.environ.get("LUMINA_MAX_QUEUE_SIZE", "2048")),
+        queue_overflow_policy=os.environ.get(  # type: ignore[arg-type]
+            "LUMINA_QUEUE_OVERFLOW_POLICY", "drop_newest"
+        ).lower(),
+        queue_block_timeout_ms=int(os.environ.get("LUMINA_QUEUE_BLOCK_TIMEOUT_MS", "100")),
         batch_interval_ms=batch_interval_ms,
         flush_interval_ms=batch_interval_ms,
         max_retries=int(os.environ.get("LUMINA_MAX_RETRIES", "3")),
+        retry_budget_ms=int(retry_budget_ms) if retry_budget_ms else None,
+        spool_dir=os.environ.get("LUMINA_SPOOL_DIR"),
+        spool_max_bytes=int(os.environ.get("LUMINA_SPOOL_MAX_BYTES", str(256 * 1024 * 1024))),
         timeout_ms=int(os.environ.get("LUMINA_TIMEOUT_MS", "30000")),
     )
 
@@ -33,3 +86,9 @@ def load_sdk_config(overrides: Dict[str, Any] | None = None) -> SdkConfig:
                 setattr(config, key, value)
 
     return config
+
+
+def _parse_endpoint(value: str) -> Union[str, List[str]]:
+    """A comma-separated ``LUMINA_ENDPOINT`` lists several ingestion replicas."""
+    endpoints = [part.strip() for part in value.split(",") if part.strip()]
+    return endpoints if len(endpoints) > 1 else value.strip()
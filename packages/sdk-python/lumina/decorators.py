@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from opentelemetry import context as otel_context
+from opentelemetry.trace import StatusCode, set_span_in_context
+
+if TYPE_CHECKING:
+    from .lumina import Lumina
+
+_attach = otel_context.attach
+_detach = otel_context.detach
+_get_current = otel_context.get_current
+_monotonic = time.monotonic
+_time_ns = time.time_ns
+_OK = StatusCode.OK
+_ERROR = StatusCode.ERROR
+
+
+def build_traced(
+    lumina: "Lumina",
+    fn: Callable[..., Any],
+    name: str,
+    attributes: Dict[str, Any],
+    llm: bool = False,
+) -> Callable[..., Any]:
+    """
+    Wrap ``fn`` so each call runs in a span named ``name``.
+
+    Everything that does not change between calls is settled here, once:
+    whether ``fn`` is a plain function, a coroutine function, a generator or
+    an async generator, the span name, and the encoded ``attributes`` (passed
+    to the sampler and set on the span in one go).  The wrapper for each kind
+    only starts the span, makes it current, calls ``fn`` and records the
+    outcome.
+
+    With ``llm`` the result is read like :meth:`Lumina.trace_llm` does; only
+    plain and coroutine functions can be wrapped that way.
+    """
+    start_span = lumina._tracer.start_span
+    record_sampled_out = lumina._record_sampled_out_error
+    set_llm_attrs = lumina._set_llm_post_attrs if llm else None
+
+    if inspect.isasyncgenfunction(fn) or inspect.isgeneratorfunction(fn):
+        if llm:
+            raise TypeError(f"traced_llm cannot wrap generator function {fn.__qualname__!r}")
+        wrap = _wrap_async_gen if inspect.isasyncgenfunction(fn) else _wrap_gen
+    elif inspect.iscoroutinefunction(fn):
+        wrap = _wrap_async
+    else:
+        wrap = _wrap_sync
+    wrapper = wrap(fn, name, attributes, start_span, record_sampled_out, set_llm_attrs)
+    return functools.wraps(fn)(wrapper)
+
+
+# ------------------------------------------------------------------
+# Wrappers, one per kind of callable
+# ------------------------------------------------------------------
+
+
+def _wrap_sync(
+    fn: Callable[..., Any],
+    name: str,
+    attributes: Dict[str, Any],
+    start_span: Callable[..., Any],
+    record_sampled_out: Callable[..., None],
+    set_llm_attrs: Optional[Callable[[Any, Any], None]],
+) -> Callable[..., Any]:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        parent = _get_current()
+        span = start_span(name, parent, attributes=attributes)
+        token = _attach(set_span_in_context(span, parent))
+        try:
+            if not span.is_recording():
+                # Sampled out: no attribute work, but errors are still reported
+                start_ns = _time_ns()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as exc:
+                    record_sampled_out(name, span, parent, start_ns, exc, attributes)
+                    raise
+            start = _monotonic()
+            try:
+                result = fn(*args, **kwargs)
+                if set_llm_attrs is not None:
+                    set_llm_attrs(span, result)
+            except Exception as exc:
+                span.record_exception(exc)
+                span.set_status(_ERROR, str(exc))
+                raise
+            span.set_attribute("duration_ms", int((_monotonic() - start) * 1000))
+            span.set_status(_OK)
+            return result
+        finally:
+            _detach(token)
+            span.end()
+
+    return wrapper
+
+
+def _wrap_async(
+    fn: Callable[..., Any],
+    name: str,
+    attributes: Dict[str, Any],
+    start_span: Callable[..., Any],
+    record_sampled_out: Callable[..., None],
+    set_llm_attrs: Optional[Callable[[Any, Any], None]],
+) -> Callable[..., Any]:
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        parent = _get_current()
+        span = start_span(name, parent, attributes=attributes)
+        token = _attach(set_span_in_context(span, parent))
+        try:
+            if not span.is_recording():
+                start_ns = _time_ns()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as exc:
+                    record_sampled_out(name, span, parent, start_ns, exc, attributes)
+                    raise
+            start = _monotonic()
+            try:
+                result = await fn(*args, **kwargs)
+                if set_llm_attrs is not None:
+                    set_llm_attrs(span, result)
+            except Exception as exc:
+                span.record_exception(exc)
+                span.set_status(_ERROR, str(exc))
+                raise
+            span.set_attribute("duration_ms", int((_monotonic() - start) * 1000))
+            span.set_status(_OK)
+            return result
+        finally:
+            _detach(token)
+            span.end()
+
+    return wrapper
+
+
+def _wrap_gen(
+    fn: Callable[..., Iterator[Any]],
+    name: str,
+    attributes: Dict[str, Any],
+    start_span: Callable[..., Any],
+    record_sampled_out: Callable[..., None],
+    set_llm_attrs: Optional[Callable[[Any, Any], None]],
+) -> Callable[..., Iterator[Any]]:
+    # The span covers the whole iteration.  It is only made current while the
+    # generator body runs, never across a yield, so the consumer's own spans
+    # are not parented under it.
+    def wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        parent = _get_current()
+        span = start_span(name, parent, attributes=attributes)
+        context = set_span_in_context(span, parent)
+        start_ns = _time_ns()
+        start = _monotonic()
+        gen = fn(*args, **kwargs)
+        step: Callable[[Any], Any] = gen.send
+        arg: Any = None
+        try:
+            while True:
+                token = _attach(context)
+                try:
+                    value = step(arg)
+                finally:
+                    _detach(token)
+                try:
+                    arg = yield value
+                    step = gen.send
+                except GeneratorExit:
+                    token = _attach(context)
+                    try:
+                        gen.close()
+                    finally:
+                        _detach(token)
+                    raise
+                except BaseException as exc:
+                    step, arg = gen.throw, exc
+        except StopIteration as stop:
+            if span.is_recording():
+                span.set_attribute("duration_ms", int((_monotonic() - start) * 1000))
+                span.set_status(_OK)
+            return stop.value
+        except GeneratorExit:
+            if span.is_recording():
+                span.set_status(_OK)
+            raise
+        except Exception as exc:
+            if span.is_recording():
+                span.record_exception(exc)
+                span.set_status(_ERROR, str(exc))
+            else:
+                record_sampled_out(name, span, parent, start_ns, exc, attributes)
+            raise
+        finally:
+            span.end()
+
+    return wrapper
+
+
+def _wrap_async_gen(
+    fn: Callable[..., AsyncIterator[Any]],
+    name: str,
+    attributes: Dict[str, Any],
+    start_span: Callable[..., Any],
+    record_sampled_out: Callable[..., None],
+    set_llm_attrs: Optional[Callable[[Any, Any], None]],
+) -> Callable[..., AsyncIterator[Any]]:
+    async def wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        parent = _get_current()
+        span = start_span(name, parent, attributes=attributes)
+        context = set_span_in_context(span, parent)
+        start_ns = _time_ns()
+        start = _monotonic()
+        gen = fn(*args, **kwargs)
+        step: Callable[[Any], Any] = gen.asend
+        arg: Any = None
+        try:
+            while True:
+                token = _attach(context)
+                try:
+                    value = await step(arg)
+                finally:
+                    _detach(token)
+                try:
+                    arg = yield value
+                    step = gen.asend
+                except GeneratorExit:
+                    token = _attach(context)
+                    try:
+                        await gen.aclose()
+                    finally:
+                        _detach(token)
+                    raise
+                except BaseException as exc:
+                    step, arg = gen.athrow, exc
+        except StopAsyncIteration:
+            if span.is_recording():
+                span.set_attribute("duration_ms", int((_monotonic() - start) * 1000))
+                span.set_status(_OK)
+        except GeneratorExit:
+            if span.is_recording():
+                span.set_status(_OK)
+            raise
+        except Exception as exc:
+            if span.is_recording():
+                span.record_exception(exc)
+                span.set_status(_ERROR, str(exc))
+            else:
+                record_sampled_out(name, span, parent, start_ns, exc, attributes)
+            raise
+        finally:
+            span.end()
+
+    return wrapper
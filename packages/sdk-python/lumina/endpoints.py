@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from .retry import RETRYABLE_ERRORS, RETRYABLE_STATUSES
+from .transport import HttpTransport, RequestTiming, TransportResponse
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the per-endpoint latency average
+_LATENCY_ALPHA = 0.2
+
+
+class _Endpoint:
+    __slots__ = ("transport", "latency_ms", "failures", "down_until", "current_weight")
+
+    def __init__(self, transport: HttpTransport) -> None:
+        self.transport = transport
+        self.latency_ms: Optional[float] = None
+        self.failures = 0
+        self.down_until = 0.0
+        self.current_weight = 0.0
+
+    @property
+    def url(self) -> str:
+        return self.transport.endpoint
+
+
+class EndpointPool:
+    """
+    Spreads export requests over several ingestion replicas.
+
+    Endpoints are picked by smooth weighted round-robin, where an endpoint's
+    weight is the inverse of its average request latency (tracked passively
+    from real exports), so the fastest healthy replica receives most batches
+    while the others still see enough traffic to keep their latency current.
+
+    A network error, timeout or retryable status fails the request over to
+    the next endpoint within the same attempt, and puts the failing endpoint
+    in an exponentially growing cooldown.  Endpoints in cooldown are only
+    tried once every healthy one has failed.
+
+    Exposes the same ``post``/``warm_up``/``close`` interface as
+    :class:`~lumina.transport.HttpTransport`.  ``clock`` (seconds, monotonic)
+    times cooldowns and request deadlines.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[str],
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout_ms: int = 30000,
+        max_connections: int = 2,
+        cooldown_ms: float = 1000,
+        max_cooldown_ms: float = 60000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("At least one endpoint is required")
+        self._endpoints = [
+            _Endpoint(
+                HttpTransport(
+                    url, headers=headers, timeout_ms=timeout_ms, max_connections=max_connections
+                )
+            )
+            for url in endpoints
+        ]
+        self._timeout = timeout_ms / 1000
+        self._cooldown = cooldown_ms / 1000
+        self._max_cooldown = max_cooldown_ms / 1000
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.last_timing: Optional[RequestTiming] = None
+
+    @property
+    def endpoint(self) -> str:
+        return ",".join(ep.url for ep in self._endpoints)
+
+    def warm_up(self) -> None:
+        for ep in self._endpoints:
+            ep.transport.warm_up()
+
+    def close(self) -> None:
+        for ep in self._endpoints:
+            ep.transport.close()
+
+    def post(
+        self,
+        body: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        """POST ``body`` to the preferred endpoint, failing over to the others."""
+        deadline = self._clock() + (self._timeout if timeout is None else timeout)
+        last_response: Optional[TransportResponse] = None
+        last_error: Optional[BaseException] = None
+
+        for ep in self._candidates():
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+            try:
+                response = ep.transport.post(body, headers, timeout=remaining)
+            except RETRYABLE_ERRORS as exc:
+                self._record_failure(ep, str(exc))
+                last_error = exc
+                continue
+            if response.status in RETRYABLE_STATUSES:
+                self._record_failure(ep, f"HTTP {response.status}")
+                last_response = response
+                continue
+            self._record_success(ep, response.timing.total_ms)
+            self.last_timing = response.timing
+            return response
+
+        if last_response is not None:
+            return last_response
+        if last_error is not None:
+            raise last_error
+        raise TimeoutError("No endpoint could be tried before the deadline")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint health and latency, for diagnostics."""
+        now = self._clock()
+        with self._lock:
+            return [
+                {
+                    "endpoint": ep.url,
+                    "latency_ms": ep.latency_ms,
+                    "failures": ep.failures,
+                    "healthy": ep.down_until <= now,
+                }
+                for ep in self._endpoints
+            ]
+
+    # ------------------------------------------------------------------
+    # Selection and health
+    # ------------------------------------------------------------------
+
+    def _candidates(self) -> List[_Endpoint]:
+        """Endpoints in the order to try them for one request."""
+        now = self._clock()
+        with self._lock:
+            healthy = [ep for ep in self._endpoints if ep.down_until <= now]
+            down = sorted(
+                (ep for ep in self._endpoints if ep.down_until > now),
+                key=lambda ep: ep.down_until,
+            )
+            if not healthy:
+                return down
+
+            known = [ep.latency_ms for ep in healthy if ep.latency_ms is not None]
+            # Unmeasured endpoints get the best known latency so they are probed soon
+            default_latency = min(known) if known else 1.0
+            weights = [
+                1.0 / max(ep.latency_ms if ep.latency_ms is not None else default_latency, 0.1)
+                for ep in healthy
+            ]
+            # Shares rather than raw weights, so credit built up before the
+            # latencies were measured does not outweigh the measured shares
+            total = sum(weights)
+            for ep, weight in zip(healthy, weights):
+                ep.current_weight += weight / total
+            first = max(healthy, key=lambda ep: ep.current_weight)
+            first.current_weight -= 1.0
+
+            rest = sorted(
+                (ep for ep in healthy if ep is not first),
+                key=lambda ep: ep.latency_ms if ep.latency_ms is not None else default_latency,
+            )
+            return [first, *rest, *down]
+
+    def _record_success(self, ep: _Endpoint, latency_ms: float) -> None:
+        with self._lock:
+            if ep.latency_ms is None:
+                ep.latency_ms = latency_ms
+            else:
+                ep.latency_ms += _LATENCY_ALPHA * (latency_ms - ep.latency_ms)
+            ep.failures = 0
+            ep.down_until = 0.0
+
+    def _record_failure(self, ep: _Endpoint, reason: str) -> None:
+        with self._lock:
+            ep.failures += 1
+            cooldown = min(self._max_cooldown, self._cooldown * 2 ** (ep.failures - 1))
+            ep.down_until = self._clock() + cooldown
+            ep.current_weight = 0.0
+        logger.warning(
+            "Export to %s failed (%s); failing over, retrying it in %.1f s",
+            ep.url,
+            reason,
+            cooldown,
+        )
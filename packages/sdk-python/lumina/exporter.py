@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .compression import Compressor
+from .endpoints import EndpointPool
+from .retry import RETRYABLE_ERRORS, RETRYABLE_STATUSES, RetryPolicy
+from .spool import SpanSpool
+from .transport import HttpTransport
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:  # pragma: no cover - depends on the environment
+    _json_encoder = json.JSONEncoder(
+        separators=(",", ":"), ensure_ascii=False, check_circular=False
+    )
+
+    def _dumps(obj: Any) -> bytes:
+        return _json_encoder.encode(obj).encode("utf-8")
+
+
+# ------------------------------------------------------------------
+# OTLP/JSON encoding
+# ------------------------------------------------------------------
+
+
+def _encode_value(value: Any) -> Dict[str, Any]:
+    # bool must be checked before int — bool is a subclass of int
+    if isinstance(value, str):
+        return {"stringValue": value}
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_encode_value(v) for v in value]}}
+    if isinstance(value, bytes):
+        return {"bytesValue": base64.b64encode(value).decode("ascii")}
+    return {"stringValue": str(value)}
+
+
+def _encode_attributes(attributes: Any) -> List[Dict[str, Any]]:
+    if not attributes:
+        return []
+    return [{"key": key, "value": _encode_value(value)} for key, value in attributes.items()]
+
+
+def encode_span(span: ReadableSpan) -> Dict[str, Any]:
+    """Encode a finished span as an OTLP/JSON ``Span`` object."""
+    ctx = span.context
+    encoded: Dict[str, Any] = {
+        "traceId": format(ctx.trace_id, "032x"),
+        "spanId": format(ctx.span_id, "016x"),
+        "name": span.name,
+        # OTLP span kinds are offset by one from the OTel API enum (0 is UNSPECIFIED)
+        "kind": span.kind.value + 1,
+        "startTimeUnixNano": str(span.start_time or 0),
+        "endTimeUnixNano": str(span.end_time or 0),
+        "attributes": _encode_attributes(span.attributes),
+        "status": {"code": span.status.status_code.value},
+    }
+    if span.parent is not None:
+        encoded["parentSpanId"] = format(span.parent.span_id, "016x")
+    if span.status.description:
+        encoded["status"]["message"] = span.status.description
+    if span.events:
+        encoded["events"] = [
+            {
+                "timeUnixNano": str(event.timestamp),
+                "name": event.name,
+                "attributes": _encode_attributes(event.attributes),
+            }
+            for event in span.events
+        ]
+    if span.links:
+        encoded["links"] = [
+            {
+                "traceId": format(link.context.trace_id, "032x"),
+                "spanId": format(link.context.span_id, "016x"),
+                "attributes": _encode_attributes(link.attributes),
+            }
+            for link in span.links
+        ]
+    if span.dropped_attributes:
+        encoded["droppedAttributesCount"] = span.dropped_attributes
+    if span.dropped_events:
+        encoded["droppedEventsCount"] = span.dropped_events
+    if span.dropped_links:
+        encoded["droppedLinksCount"] = span.dropped_links
+    return encoded
+
+
+# Fixed OTLP/JSON cost of a span (ids, timestamps, kind, status, punctuation)
+# and of one attribute entry, used by estimate_span_size
+_SPAN_OVERHEAD = 210
+_ATTRIBUTE_OVERHEAD = 36
+_EVENT_OVERHEAD = 80
+
+
+def estimate_span_size(span: ReadableSpan) -> int:
+    """
+    Cheap estimate of a span's encoded OTLP/JSON size in bytes.
+
+    Counts characters rather than UTF-8 bytes and ignores JSON escaping, so it
+    is meant for batch sizing, not exact accounting.
+    """
+    size = _SPAN_OVERHEAD + len(span.name)
+    attributes = span.attributes
+    if attributes:
+        for key, value in attributes.items():
+            size += _ATTRIBUTE_OVERHEAD + len(key)
+            size += len(value) if isinstance(value, str) else 20
+    for event in span.events:
+        size += _EVENT_OVERHEAD + len(event.name)
+        if event.attributes:
+            for key, value in event.attributes.items():
+                size += _ATTRIBUTE_OVERHEAD + len(key)
+                size += len(value) if isinstance(value, str) else 20
+    return size
+
+
+# Encoded spans keyed by encoded resource, then encoded scope
+EncodedGroups = Dict[bytes, Dict[bytes, List[bytes]]]
+
+
+def write_request(groups: EncodedGroups, buf: bytearray) -> None:
+    """Assemble an ``ExportTraceServiceRequest`` from already encoded fragments."""
+    buf += b'{"resourceSpans":['
+    for r_index, (resource, scopes) in enumerate(groups.items()):
+        if r_index:
+            buf += b","
+        buf += b'{"resource":'
+        buf += resource
+        buf += b',"scopeSpans":['
+        for s_index, (scope, spans) in enumerate(scopes.items()):
+            if s_index:
+                buf += b","
+            buf += b'{"scope":'
+            buf += scope
+            buf += b',"spans":['
+            buf += b",".join(spans)
+            buf += b"]}"
+        buf += b"]}"
+    buf += b"]}"
+
+
+class OTLPJsonEncoder:
+    """
+    Streams an OTLP/JSON ``ExportTraceServiceRequest`` into a byte buffer.
+
+    Spans are grouped by resource and instrumentation scope, and each span is
+    serialized straight into the buffer, so no intermediate request tree is
+    built.  Resource and scope fragments are encoded once and cached, since a
+    process normally has a single resource and a handful of scopes.
+    """
+
+    def __init__(self) -> None:
+        self._resource_cache: Dict[int, Tuple[Resource, bytes]] = {}
+        self._scope_cache: Dict[Tuple[str, Optional[str]], bytes] = {}
+
+    def encode(self, spans: Sequence[ReadableSpan], buf: bytearray) -> None:
+        write_request(self.encode_groups(spans), buf)
+
+    def encode_groups(self, spans: Sequence[ReadableSpan]) -> EncodedGroups:
+        """Encode each span, grouped by encoded resource and then scope."""
+        groups: EncodedGroups = {}
+        for span in spans:
+            scope = span.instrumentation_scope
+            scope_key = (scope.name, scope.version) if scope else ("", None)
+            groups.setdefault(self._resource_bytes(span.resource), {}).setdefault(
+                self._scope_bytes(scope_key), []
+            ).append(_dumps(encode_span(span)))
+        return groups
+
+    def _resource_bytes(self, resource: Resource) -> bytes:
+        cached = self._resource_cache.get(id(resource))
+        # Keep a reference to the resource so its id() cannot be reused
+        if cached is not None and cached[0] is resource:
+            return cached[1]
+        encoded = _dumps({"attributes": _encode_attributes(resource.attributes)})
+        self._resource_cache[id(resource)] = (resource, encoded)
+        return encoded
+
+    def _scope_bytes(self, scope_key: Tuple[str, Optional[str]]) -> bytes:
+        encoded = self._scope_cache.get(scope_key)
+        if encoded is None:
+            name, version = scope_key
+            scope: Dict[str, str] = {"name": name}
+            if version:
+                scope["version"] = version
+            encoded = self._scope_cache[scope_key] = _dumps(scope)
+        return encoded
+
+
+# ------------------------------------------------------------------
+# Exporter
+# ------------------------------------------------------------------
+
+
+class OTLPJsonSpanExporter(SpanExporter):
+    """
+    Exports spans as OTLP/JSON over HTTP, the format the Lumina ingestion
+    service parses.
+
+    Unlike ``OTLPSpanExporter`` from ``opentelemetry-exporter-otlp-proto-http``
+    this never imports protobuf.  Each export thread reuses its own request
+    buffer, and ``orjson`` is used for encoding when it is installed.  Pass a
+    :class:`~lumina.compression.Compressor` to gzip/zstd the request bodies.
+
+    Requests go through a pooled keep-alive :class:`~lumina.transport.HttpTransport`,
+    or an :class:`~lumina.endpoints.EndpointPool` when several endpoints are
+    given; call :meth:`warm_up` to connect ahead of the first export.  Failed requests
+    are retried according to ``retry``, and every batch carries an
+    ``Idempotency-Key`` header, a hash of its uncompressed body, so retries
+    and spool replays of the same batch carry the same key.
+
+    With a :class:`~lumina.spool.SpanSpool`, batches that still fail are
+    written to disk instead of being dropped.  While the spool holds data,
+    new batches are appended behind it so delivery order is preserved, and a
+    background thread replays it every ``spool_interval_ms``.
+    """
+
+    def __init__(
+        self,
+        endpoint: Union[str, Sequence[str]],
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        timeout_ms: int = 30000,
+        compressor: Optional[Compressor] = None,
+        max_connections: int = 2,
+        retry: Optional[RetryPolicy] = None,
+        spool: Optional[SpanSpool] = None,
+        spool_interval_ms: int = 5000,
+    ) -> None:
+        request_headers = {"Content-Type": "application/json", **(headers or {})}
+        endpoints = [endpoint] if isinstance(endpoint, str) else list(endpoint)
+        self._transport: Union[HttpTransport, EndpointPool]
+        if len(endpoints) == 1:
+            self._transport = HttpTransport(
+                endpoints[0],
+                headers=request_headers,
+                timeout_ms=timeout_ms,
+                max_connections=max_connections,
+            )
+        else:
+            self._transport = EndpointPool(
+                endpoints,
+                headers=request_headers,
+                timeout_ms=timeout_ms,
+                max_connections=max_connections,
+            )
+        self._transport_timeout_ms = timeout_ms
+        self._encoder = OTLPJsonEncoder()
+        self._compressor = compressor
+        self._retry = retry or RetryPolicy(0, budget_ms=timeout_ms)
+        self._local = threading.local()
+        self._shutdown = False
+
+        self._spool = spool
+        self._spool_lock = threading.Lock()
+        self._spool_stop = threading.Event()
+        if spool is not None:
+            self._spool_thread = threading.Thread(
+                name="LuminaSpoolReplay",
+                target=self._replay_loop,
+                args=(spool_interval_ms / 1000,),
+                daemon=True,
+            )
+            self._spool_thread.start()
+
+    @property
+    def transport(self) -> Union[HttpTransport, EndpointPool]:
+        return self._transport
+
+    @property
+    def spool(self) -> Optional[SpanSpool]:
+        return self._spool
+
+    def warm_up(self) -> None:
+        """Open a connection to the endpoint in the background."""
+        self._transport.warm_up()
+
+    def encode(self, spans: Sequence[ReadableSpan]) -> bytes:
+        """Encode a batch into an OTLP/JSON request body."""
+        buf: Optional[bytearray] = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = bytearray()
+        try:
+            self._encoder.encode(spans, buf)
+            return bytes(buf)
+        finally:
+            del buf[:]
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self._shutdown:
+            logger.warning("Exporter already shutdown, ignoring batch")
+            return SpanExportResult.FAILURE
+        if not spans:
+            return SpanExportResult.SUCCESS
+        return self.export_encoded(self.encode(spans), len(spans))
+
+    def export_encoded(self, body: bytes, span_count: int) -> SpanExportResult:
+        """Deliver an already encoded OTLP/JSON request body holding ``span_count`` spans."""
+        if self._shutdown:
+            logger.warning("Exporter already shutdown, ignoring batch")
+            return SpanExportResult.FAILURE
+
+        spool = self._spool
+        if spool is None:
+            sent = self._post(body, self._retry)
+            return SpanExportResult.SUCCESS if sent else SpanExportResult.FAILURE
+
+        with self._spool_lock:
+            if spool.has_pending():
+                # Keep delivery order: queue behind the spooled batches
+                spool.append(body)
+                self._replay_spool()
+                return SpanExportResult.SUCCESS
+        sent = self._post(body, self._retry)
+        if sent is False:
+            with self._spool_lock:
+                spool.append(body)
+            logger.warning("Spooled %d spans to %s for later delivery", span_count, spool.directory)
+            return SpanExportResult.SUCCESS
+        return SpanExportResult.SUCCESS if sent else SpanExportResult.FAILURE
+
+    def shutdown(self) -> None:
+        self._shutdown = True
+        self._retry.cancel()
+        self._spool_stop.set()
+        self._transport.close()
+        if self._spool is not None:
+            self._spool.close()
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _post(self, body: bytes, retry: RetryPolicy) -> Optional[bool]:
+        """
+        Send one encoded batch.
+
+        Returns True on success, False on a failure worth trying again later
+        (network error or retryable status), and None when the server
+        rejected the batch outright.
+        """
+        # Derived from the body so a batch replayed from the spool keeps its key
+        headers = {"Idempotency-Key": hashlib.blake2b(body, digest_size=16).hexdigest()}
+        if self._compressor is not None:
+            compressed = self._compressor.compress(body)
+            if compressed is not None:
+                body = compressed
+                headers["Content-Encoding"] = self._compressor.content_encoding
+
+        try:
+            response = retry.call(
+                lambda timeout: self._transport.post(body, headers, timeout=timeout)
+            )
+        except RETRYABLE_ERRORS as exc:
+            logger.error("Failed to export spans: %s", exc)
+            return False
+        if response.status < 300:
+            return True
+        logger.error("Failed to export spans: HTTP %d", response.status)
+        return False if response.status in RETRYABLE_STATUSES else None
+
+    def _replay_spool(self) -> None:
+        """Deliver spooled batches oldest-first until one fails. Must hold ``_spool_lock``."""
+        assert self._spool is not None
+        # One attempt per batch: the spool itself is the retry mechanism
+        single_attempt = RetryPolicy(0, budget_ms=self._transport_timeout_ms)
+        while not self._shutdown:
+            body = self._spool.peek()
+            if body is None:
+                return
+            if self._post(body, single_attempt) is False:
+                return
+            self._spool.commit()
+
+    def _replay_loop(self, interval: float) -> None:
+        # Runs once right away so batches left by a previous process go out at startup
+        assert self._spool is not None
+        while True:
+            with self._spool_lock:
+                # Batches left by exited processes in worker slots nobody reopened
+                self._spool.adopt_orphans()
+                self._replay_spool()
+            if self._spool_stop.wait(interval):
+                return
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
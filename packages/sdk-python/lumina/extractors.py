@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Union
+
+
+class LlmResponse(NamedTuple):
+    """
+    What the SDK records from an LLM response.
+
+    Strings are empty when absent; the token counts are ``None`` when the
+    response reports no usage at all.  ``prompt_tokens`` counts every input
+    token, including the ``cache_read_tokens`` served from the provider's
+    prompt cache and the ``cache_write_tokens`` written to it (Anthropic
+    reports those separately; they are added in).
+    """
+
+    model: str
+    response_id: str
+    completion: str
+    prompt_tokens: Optional[int]
+    completion_tokens: Optional[int]
+    total_tokens: Optional[int]
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+Extractor = Callable[[Any], LlmResponse]
+
+_EMPTY = LlmResponse("", "", "", None, None, None)
+
+
+# ------------------------------------------------------------------
+# Provider SDK objects
+# ------------------------------------------------------------------
+
+
+def _openai_chat(result: Any) -> LlmResponse:
+    """``openai`` ChatCompletion: ``choices[0].message.content``."""
+    choices = result.choices
+    completion = (choices[0].message.content or "") if choices else ""
+    usage = result.usage
+    if usage is None:
+        return LlmResponse(result.model or "", result.id or "", completion, None, None, None)
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    return LlmResponse(
+        result.model or "",
+        result.id or "",
+        completion,
+        prompt_tokens,
+        completion_tokens,
+        usage.total_tokens or prompt_tokens + completion_tokens,
+        (details.cached_tokens or 0) if details is not None else 0,
+    )
+
+
+def _openai_response(result: Any) -> LlmResponse:
+    """``openai`` Responses API Response: ``output_text``."""
+    usage = result.usage
+    if usage is None:
+        return LlmResponse(
+            result.model or "", result.id or "", result.output_text or "", None, None, None
+        )
+    prompt_tokens = usage.input_tokens or 0
+    completion_tokens = usage.output_tokens or 0
+    details = usage.input_tokens_details
+    return LlmResponse(
+        result.model or "",
+        result.id or "",
+        result.output_text or "",
+        prompt_tokens,
+        completion_tokens,
+        usage.total_tokens or prompt_tokens + completion_tokens,
+        (details.cached_tokens or 0) if details is not None else 0,
+    )
+
+
+def _anthropic_message(result: Any) -> LlmResponse:
+    """``anthropic`` Message: the first text block of ``content``."""
+    completion = ""
+    for block in result.content:
+        if block.type == "text":
+            completion = block.text or ""
+            break
+    usage = result.usage
+    if usage is None:
+        return LlmResponse(result.model or "", result.id or "", completion, None, None, None)
+    # input_tokens leaves out the tokens read from or written to the cache
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+    prompt_tokens = (usage.input_tokens or 0) + cache_read + cache_write
+    completion_tokens = usage.output_tokens or 0
+    return LlmResponse(
+        result.model or "",
+        result.id or "",
+        completion,
+        prompt_tokens,
+        completion_tokens,
+        prompt_tokens + completion_tokens,
+        cache_read,
+        cache_write,
+    )
+
+
+def _probe(result: Any) -> LlmResponse:
+    """Any other object: try the OpenAI and Anthropic attribute names in turn."""
+    model: str = getattr(result, "model", "") or ""
+    response_id: str = getattr(result, "id", "") or ""
+
+    completion = ""
+    choices = getattr(result, "choices", None)
+    if choices and isinstance(choices, list):
+        msg = getattr(choices[0], "message", None)
+        completion = (getattr(msg, "content", None) or "") if msg else ""
+    else:
+        content = getattr(result, "content", None)
+        if isinstance(content, list) and content:
+            first = content[0]
+            if getattr(first, "type", None) == "text":
+                completion = getattr(first, "text", "") or ""
+        elif isinstance(content, str):
+            completion = content
+
+    usage = getattr(result, "usage", None)
+    if not usage:
+        return LlmResponse(model, response_id, completion, None, None, None)
+    prompt_tokens: int = (
+        getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None) or 0
+    )
+    completion_tokens: int = (
+        getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None) or 0
+    )
+    details = getattr(usage, "prompt_tokens_details", None) or getattr(
+        usage, "input_tokens_details", None
+    )
+    cache_read: int = getattr(details, "cached_tokens", None) or 0
+    cache_write: int = getattr(usage, "cache_creation_input_tokens", None) or 0
+    anthropic_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    if anthropic_read or cache_write:
+        # Anthropic style: cache tokens are not part of input_tokens
+        cache_read = anthropic_read
+        prompt_tokens += cache_read + cache_write
+    total_tokens: int = getattr(usage, "total_tokens", None) or prompt_tokens + completion_tokens
+    return LlmResponse(
+        model,
+        response_id,
+        completion,
+        prompt_tokens,
+        completion_tokens,
+        total_tokens,
+        cache_read,
+        cache_write,
+    )
+
+
+# ------------------------------------------------------------------
+# Raw JSON responses
+# ------------------------------------------------------------------
+
+
+def _from_usage_dict(
+    result: Mapping[str, Any], completion: str, prompt_key: str, completion_key: str
+) -> LlmResponse:
+    usage = result.get("usage")
+    if not usage:
+        return LlmResponse(
+            result.get("model") or "", result.get("id") or "", completion, None, None, None
+        )
+    prompt_tokens = usage.get(prompt_key) or 0
+    completion_tokens = usage.get(completion_key) or 0
+    details = usage.get("prompt_tokens_details") or usage.get("input_tokens_details") or {}
+    cache_read = details.get("cached_tokens") or 0
+    cache_write = usage.get("cache_creation_input_tokens") or 0
+    if "cache_read_input_tokens" in usage or cache_write:
+        # Anthropic style: cache tokens are not part of input_tokens
+        cache_read = usage.get("cache_read_input_tokens") or 0
+        prompt_tokens += cache_read + cache_write
+    return LlmResponse(
+        result.get("model") or "",
+        result.get("id") or "",
+        completion,
+        prompt_tokens,
+        completion_tokens,
+        usage.get("total_tokens") or prompt_tokens + completion_tokens,
+        cache_read,
+        cache_write,
+    )
+
+
+def _dict_chat(result: Mapping[str, Any]) -> LlmResponse:
+    choices = result.get("choices")
+    message = (choices[0].get("message") or {}) if choices else {}
+    return _from_usage_dict(
+        result, message.get("content") or "", "prompt_tokens", "completion_tokens"
+    )
+
+
+def _dict_response(result: Mapping[str, Any]) -> LlmResponse:
+    texts: List[str] = [
+        part.get("text") or ""
+        for item in result.get("output") or ()
+        if item.get("type") == "message"
+        for part in item.get("content") or ()
+        if part.get("type") == "output_text"
+    ]
+    return _from_usage_dict(result, "".join(texts), "input_tokens", "output_tokens")
+
+
+def _dict_message(result: Mapping[str, Any]) -> LlmResponse:
+    content = result.get("content")
+    completion = ""
+    if isinstance(content, list):
+        for block in content:
+            if block.get("type") == "text":
+                completion = block.get("text") or ""
+                break
+    elif isinstance(content, str):
+        completion = content
+    return _from_usage_dict(result, completion, "input_tokens", "output_tokens")
+
+
+# Keyed by the response's "object" (OpenAI) or "type" (Anthropic) field
+_DICT_EXTRACTORS: Dict[str, Extractor] = {
+    "chat.completion": _dict_chat,
+    "response": _dict_response,
+    "message": _dict_message,
+}
+
+
+def _extract_dict(result: Mapping[str, Any]) -> LlmResponse:
+    extractor = _DICT_EXTRACTORS.get(result.get("object") or result.get("type") or "")
+    if extractor is None:
+        extractor = _dict_chat if "choices" in result else _dict_message
+    return extractor(result)
+
+
+# ------------------------------------------------------------------
+# Registry
+# ------------------------------------------------------------------
+
+# Provider classes by "module.QualName", so neither SDK has to be imported
+_KNOWN: Dict[str, Extractor] = {
+    "openai.types.chat.chat_completion.ChatCompletion": _openai_chat,
+    "openai.types.responses.response.Response": _openai_response,
+    "anthropic.types.message.Message": _anthropic_message,
+    "anthropic.types.beta.beta_message.BetaMessage": _anthropic_message,
+}
+_REGISTERED: Dict[type, Extractor] = {}
+# Extractor picked for each response type seen so far
+_BY_TYPE: Dict[type, Extractor] = {}
+
+
+def register_extractor(key: Union[type, str], extractor: Extractor) -> None:
+    """
+    Use ``extractor`` for responses of class ``key`` (and its subclasses), or,
+    when ``key`` is a string, for dict responses whose ``"object"`` or
+    ``"type"`` field equals it.
+    """
+    if isinstance(key, str):
+        _DICT_EXTRACTORS[key] = extractor
+    else:
+        _REGISTERED[key] = extractor
+        _BY_TYPE.clear()
+
+
+def extract_response(result: Any) -> LlmResponse:
+    """Model, id, completion text and token usage of an LLM response."""
+    if result is None:
+        return _EMPTY
+    cls = type(result)
+    extractor = _BY_TYPE.get(cls)
+    if extractor is None:
+        extractor = _BY_TYPE[cls] = _resolve(cls)
+    return extractor(result)
+
+
+def _resolve(cls: type) -> Extractor:
+    for base in cls.__mro__:
+        extractor = _REGISTERED.get(base) or _KNOWN.get(f"{base.__module__}.{base.__qualname__}")
+        if extractor is not None:
+            return extractor
+    if issubclass(cls, Mapping):
+        return _extract_dict
+    return _probe
@@ -0,0 +1,470 @@
+"""
+Export helper process.
+
+With ``LUMINA_HELPER_PROCESS=true`` the SDK starts ``python -m lumina.helper``
+as a child process and hands it finished spans through a ring buffer in
+shared memory.  The app process only flattens each span into a tuple and
+``marshal``-s the batch; rebuilding spans, OTLP encoding, compression, retries
+and HTTP all run in the helper, so none of it competes with request threads
+for the app's GIL.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import logging
+import marshal
+import mmap
+import os
+import select
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import Event, ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from opentelemetry.trace import Link, SpanContext, SpanKind, Status, StatusCode, TraceFlags
+
+from .pipeline import build_exporter, build_processor
+from .types import SdkConfig
+
+logger = logging.getLogger(__name__)
+
+# Doorbell commands, app -> helper
+_DATA = b"d"
+_FLUSH = b"f"
+_STOP = b"x"
+# Acknowledgement of a flush, helper -> app
+_ACK = b"a"
+
+
+# ------------------------------------------------------------------
+# Shared-memory ring
+# ------------------------------------------------------------------
+
+# Write and read positions (total bytes ever written/read), on separate cache lines
+_POSITION = struct.Struct("<Q")
+_WRITE_POS = 0
+_READ_POS = 64
+_HEADER_BYTES = 128
+_LENGTH = struct.Struct("<I")
+# Length value marking "skip to the start of the ring"
+_WRAP = 0xFFFFFFFF
+
+
+class ShmRing:
+    """
+    Single-consumer ring of length-prefixed records over a shared memory map.
+
+    The producer writes a record and then advances the write position; the
+    consumer reads records up to that position and advances the read
+    position.  A record never straddles the end of the ring: when it does not
+    fit, the rest of the ring is skipped.  Producers in one process must
+    serialize their calls to :meth:`put`.
+    """
+
+    def __init__(self, fd: int, size: int) -> None:
+        self.size = size
+        self._map = mmap.mmap(fd, _HEADER_BYTES + size)
+        self._data = memoryview(self._map)[_HEADER_BYTES:]
+
+    @classmethod
+    def create(cls, size: int) -> Tuple["ShmRing", int]:
+        """Create a ring in a new anonymous shared memory file; returns it and the file's fd."""
+        if hasattr(os, "memfd_create"):
+            fd = os.memfd_create("lumina-ring", 0)
+        else:
+            fd, path = tempfile.mkstemp(prefix="lumina-ring-")
+            os.unlink(path)
+        os.ftruncate(fd, _HEADER_BYTES + size)
+        return cls(fd, size), fd
+
+    def put(self, payload: bytes) -> bool:
+        """Append one record. Returns False if the ring does not have room for it."""
+        needed = _LENGTH.size + len(payload)
+        if needed > self.size // 2:
+            raise ValueError(f"Record of {len(payload)} bytes does not fit the ring")
+        write = self._position(_WRITE_POS)
+        free = self.size - (write - self._position(_READ_POS))
+        offset = write % self.size
+        tail_room = self.size - offset
+        skip = tail_room if tail_room < needed else 0
+        if skip + needed > free:
+            return False
+        if skip:
+            if tail_room >= _LENGTH.size:
+                _LENGTH.pack_into(self._data, offset, _WRAP)
+            write += skip
+            offset = 0
+        _LENGTH.pack_into(self._data, offset, len(payload))
+        self._data[offset + _LENGTH.size : offset + needed] = payload
+        # Publish only once the record is complete
+        _POSITION.pack_into(self._map, _WRITE_POS, write + needed)
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """Pop the oldest record, or return None if the ring is empty."""
+        read = self._position(_READ_POS)
+        write = self._position(_WRITE_POS)
+        while read < write:
+            offset = read % self.size
+            tail_room = self.size - offset
+            if tail_room < _LENGTH.size:
+                read += tail_room
+                continue
+            (length,) = _LENGTH.unpack_from(self._data, offset)
+            if length == _WRAP:
+                read += tail_room
+                continue
+            start = offset + _LENGTH.size
+            payload = bytes(self._data[start : start + length])
+            _POSITION.pack_into(self._map, _READ_POS, read + _LENGTH.size + length)
+            return payload
+        _POSITION.pack_into(self._map, _READ_POS, read)
+        return None
+
+    def close(self) -> None:
+        self._data.release()
+        self._map.close()
+
+    def _position(self, at: int) -> int:
+        return _POSITION.unpack_from(self._map, at)[0]
+
+
+# ------------------------------------------------------------------
+# Span flattening
+# ------------------------------------------------------------------
+
+
+def pack_spans(spans: Sequence[ReadableSpan]) -> bytes:
+    """Flatten a batch into plain tuples and ``marshal`` it."""
+    resource_index: Dict[int, int] = {}
+    resources: List[Dict[str, Any]] = []
+    scope_index: Dict[Tuple[str, Optional[str]], int] = {}
+    scopes: List[Tuple[str, Optional[str]]] = []
+    records = []
+    for span in spans:
+        resource = span.resource
+        r_index = resource_index.get(id(resource))
+        if r_index is None:
+            r_index = resource_index[id(resource)] = len(resources)
+            resources.append(dict(resource.attributes))
+        scope = span.instrumentation_scope
+        scope_key = (scope.name, scope.version) if scope else ("", None)
+        s_index = scope_index.get(scope_key)
+        if s_index is None:
+            s_index = scope_index[scope_key] = len(scopes)
+            scopes.append(scope_key)
+
+        ctx = span.context
+        parent = span.parent
+        status = span.status
+        records.append(
+            (
+                ctx.trace_id,
+                ctx.span_id,
+                int(ctx.trace_flags),
+                parent.span_id if parent is not None else None,
+                span.name,
+                span.kind.value,
+                span.start_time,
+                span.end_time,
+                dict(span.attributes) if span.attributes else None,
+                [
+                    (event.name, event.timestamp, dict(event.attributes or {}))
+                    for event in span.events
+                ],
+                [
+                    (link.context.trace_id, link.context.span_id, dict(link.attributes or {}))
+                    for link in span.links
+                ],
+                status.status_code.value,
+                status.description,
+                r_index,
+                s_index,
+            )
+        )
+    return marshal.dumps((resources, scopes, records))
+
+
+class _SpanRebuilder:
+    """Turns flattened batches back into ``ReadableSpan`` objects in the helper."""
+
+    def __init__(self) -> None:
+        # Reusing Resource objects keeps the encoder's per-resource cache effective
+        self._resources: Dict[bytes, Resource] = {}
+        self._scopes: Dict[Tuple[str, Optional[str]], InstrumentationScope] = {}
+
+    def unpack(self, payload: bytes) -> Iterator[ReadableSpan]:
+        resource_attrs, scope_keys, records = marshal.loads(payload)
+        resources = [self._resource(attrs) for attrs in resource_attrs]
+        scopes = [self._scope(tuple(key)) for key in scope_keys]
+        for (
+            trace_id,
+            span_id,
+            flags,
+            parent_id,
+            name,
+            kind,
+            start,
+            end,
+            attributes,
+            events,
+            links,
+            status_code,
+            description,
+            r_index,
+            s_index,
+        ) in records:
+            yield ReadableSpan(
+                name=name,
+                context=SpanContext(trace_id, span_id, False, TraceFlags(flags)),
+                parent=(SpanContext(trace_id, parent_id, False) if parent_id is not None else None),
+                resource=resources[r_index],
+                attributes=attributes,
+                events=tuple(Event(e_name, e_attrs, e_time) for e_name, e_time, e_attrs in events),
+                links=tuple(
+                    Link(SpanContext(l_trace, l_span, False), l_attrs)
+                    for l_trace, l_span, l_attrs in links
+                ),
+                kind=SpanKind(kind),
+                status=Status(StatusCode(status_code), description),
+                start_time=start,
+                end_time=end,
+                instrumentation_scope=scopes[s_index],
+            )
+
+    def _resource(self, attributes: Dict[str, Any]) -> Resource:
+        key = marshal.dumps(attributes)
+        resource = self._resources.get(key)
+        if resource is None:
+            resource = self._resources[key] = Resource(attributes)
+        return resource
+
+    def _scope(self, key: Tuple[str, Optional[str]]) -> InstrumentationScope:
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = self._scopes[key] = InstrumentationScope(key[0], key[1])
+        return scope
+
+
+# ------------------------------------------------------------------
+# App side
+# ------------------------------------------------------------------
+
+
+class HelperSpanExporter(SpanExporter):
+    """
+    Hands span batches to a ``lumina.helper`` child process.
+
+    The helper is started by the first export, not on construction (which may
+    run in an ``os.register_at_fork`` hook), and restarted by the next export
+    if it dies.  A batch that finds the ring full waits up to ``timeout_ms`` for
+    the helper to make room and then fails, which backs up into the span
+    processor's queue and overflow policy.  :meth:`force_flush` waits until
+    the helper has exported everything handed to it so far.
+    """
+
+    def __init__(
+        self,
+        config: SdkConfig,
+        *,
+        ring_bytes: int = 32 * 1024 * 1024,
+        timeout_ms: int = 30000,
+    ) -> None:
+        self._config = config
+        self._ring_bytes = ring_bytes
+        self._timeout = timeout_ms / 1000
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._shutdown = False
+        self._process: Optional[subprocess.Popen] = None
+        self._ring: Optional[ShmRing] = None
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self._shutdown:
+            logger.warning("Exporter already shutdown, ignoring batch")
+            return SpanExportResult.FAILURE
+        if not spans:
+            return SpanExportResult.SUCCESS
+
+        payload = pack_spans(spans)
+        deadline = time.monotonic() + self._timeout
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                if self._process is not None:
+                    logger.warning("Lumina export helper exited, restarting it")
+                self._stop_process()
+                self._start()
+            assert self._ring is not None
+            try:
+                while not self._ring.put(payload):
+                    if time.monotonic() >= deadline:
+                        logger.warning("Lumina export helper is not keeping up, dropping batch")
+                        return SpanExportResult.FAILURE
+                    time.sleep(0.001)
+            except ValueError as exc:
+                logger.error("Failed to hand spans to the export helper: %s", exc)
+                return SpanExportResult.FAILURE
+            self._ring_doorbell(_DATA)
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        with self._flush_lock:
+            with self._lock:
+                if self._process is None:
+                    # Not started yet, so nothing was handed to it
+                    return True
+                if self._process.poll() is not None:
+                    return False
+                # Discard acks for earlier flushes that timed out
+                try:
+                    os.read(self._ack_read, 4096)
+                except BlockingIOError:
+                    pass
+                self._ring_doorbell(_FLUSH)
+            ready, _, _ = select.select([self._ack_read], [], [], timeout_millis / 1000)
+            if not ready:
+                return False
+            return os.read(self._ack_read, 1) == _ACK
+
+    def shutdown(self) -> None:
+        self._shutdown = True
+        with self._lock:
+            self._stop_process()
+
+    # ------------------------------------------------------------------
+    # Process management
+    # ------------------------------------------------------------------
+
+    def _start(self) -> None:
+        self._ring, shm_fd = ShmRing.create(self._ring_bytes)
+        doorbell_read, self._doorbell = os.pipe()
+        self._ack_read, ack_write = os.pipe()
+        os.set_blocking(self._doorbell, False)
+        os.set_blocking(self._ack_read, False)
+        fds = (shm_fd, doorbell_read, ack_write)
+        try:
+            self._process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "lumina.helper",
+                    "--ring-fd",
+                    str(shm_fd),
+                    "--ring-bytes",
+                    str(self._ring_bytes),
+                    "--doorbell-fd",
+                    str(doorbell_read),
+                    "--ack-fd",
+                    str(ack_write),
+                ],
+                stdin=subprocess.PIPE,
+                pass_fds=fds,
+            )
+            # Passed on stdin rather than argv so the API key never shows up in ps
+            assert self._process.stdin is not None
+            self._process.stdin.write(json.dumps(dataclasses.asdict(self._config)).encode())
+            self._process.stdin.close()
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def _stop_process(self) -> None:
+        if self._ring is None:
+            return
+        process = self._process
+        if process is not None:
+            if process.poll() is None:
+                self._ring_doorbell(_STOP)
+                try:
+                    process.wait(self._timeout)
+                except subprocess.TimeoutExpired:
+                    logger.warning("Lumina export helper did not stop in time, killing it")
+                    process.kill()
+                    process.wait()
+            self._process = None
+        for fd in (self._doorbell, self._ack_read):
+            os.close(fd)
+        self._ring.close()
+        self._ring = None
+
+    def _ring_doorbell(self, command: bytes) -> None:
+        try:
+            os.write(self._doorbell, command)
+        except BlockingIOError:
+            # The pipe already holds unread commands; a data command is implied
+            if command != _DATA:
+                os.set_blocking(self._doorbell, True)
+                try:
+                    os.write(self._doorbell, command)
+                finally:
+                    os.set_blocking(self._doorbell, False)
+        except BrokenPipeError:
+            pass
+
+
+# ------------------------------------------------------------------
+# Helper side
+# ------------------------------------------------------------------
+
+
+def _serve(ring: ShmRing, doorbell: int, ack: int, config: SdkConfig) -> None:
+    processor = build_processor(
+        config,
+        build_exporter(config),
+        # Block rather than drop: a full queue here stops the ring from being
+        # drained, and the app's own queue and overflow policy take over
+        overflow_policy="block",
+        block_timeout_millis=config.timeout_ms,
+    )
+    rebuilder = _SpanRebuilder()
+    parent = os.getppid()
+    running = True
+    while running:
+        ready, _, _ = select.select([doorbell], [], [], 1.0)
+        commands = os.read(doorbell, 4096) if ready else b""
+        # EOF on the doorbell or a new parent pid both mean the app is gone
+        if (ready and not commands) or os.getppid() != parent:
+            running = False
+        # Always drain before acting on a flush or stop: the records they
+        # cover were published before the command was written
+        while (payload := ring.get()) is not None:
+            for span in rebuilder.unpack(payload):
+                processor.on_end(span)
+        if _FLUSH in commands:
+            processor.force_flush(config.timeout_ms)
+            os.write(ack, _ACK * commands.count(_FLUSH))
+        if _STOP in commands:
+            running = False
+    processor.shutdown()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m lumina.helper")
+    parser.add_argument("--ring-fd", type=int, required=True)
+    parser.add_argument("--ring-bytes", type=int, required=True)
+    parser.add_argument("--doorbell-fd", type=int, required=True)
+    parser.add_argument("--ack-fd", type=int, required=True)
+    args = parser.parse_args(argv)
+    # Ctrl-C reaches the whole process group; the app decides when the helper stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(format="%(asctime)s lumina.helper %(levelname)s %(message)s")
+
+    config = SdkConfig(**json.loads(sys.stdin.buffer.read()))
+    ring = ShmRing(args.ring_fd, args.ring_bytes)
+    os.close(args.ring_fd)
+    _serve(ring, args.doorbell_fd, args.ack_fd, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,35 +2,38 @@ from __future__ import annotations
 
 import asyncio
 import inspect
-import json
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+import os
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypeVar, Union
 
+from opentelemetry import context as otel_context
 from opentelemetry import trace as otel_trace
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.trace import Span, StatusCode
+from opentelemetry.trace import INVALID_SPAN, Span, StatusCode
 
 from . import semantic_conventions as SC
+from .attributes import MetadataEncoder
 from .config import load_sdk_config
-from .types import SdkConfig
+from .extractors import extract_response
+from .pricing import PricingCatalog
+from .types import FlushReport, SdkConfig
+
+if TYPE_CHECKING:
+    # The SDK and export stack are imported where the pipeline is built, so a
+    # disabled SDK never loads them
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
+
+    from .processor import LuminaSpanProcessor
+    from .sampling import AdaptiveSampler, CostWeightedSampler
+    from .spool import SpanSpool
+    from .tail_sampling import TailSamplingProcessor
 
 T = TypeVar("T")
 
 _instance: Optional["Lumina"] = None
 
-# Pricing per 1M tokens: {model_key: (input_usd, output_usd)}
-_PRICING: Dict[str, tuple[float, float]] = {
-    "gpt-4": (30.0, 60.0),
-    "gpt-4-turbo": (10.0, 30.0),
-    "gpt-3.5-turbo": (0.5, 1.5),
-    "claude-sonnet-4": (3.0, 15.0),
-    "claude-3-opus": (15.0, 75.0),
-    "claude-3-sonnet": (3.0, 15.0),
-    "claude-3-haiku": (0.25, 1.25),
-}
-
 
 class Lumina:
     """
@@ -48,50 +51,165 @@ class Lumina:
         )
     """
 
+    def __new__(cls, config: Optional[Dict[str, Any]] = None) -> "Lumina":
+        if cls is Lumina and not load_sdk_config(config).enabled:
+            cls = _DisabledLumina
+        return super().__new__(cls)
+
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         global _instance
         self.config: SdkConfig = load_sdk_config(config)
+        self._spool: Optional[SpanSpool] = None
+        self._cost_sampler: Optional[CostWeightedSampler] = None
+        if self.config.cost_sampling_threshold_usd is not None:
+            from .sampling import CostWeightedSampler
+
+            self._cost_sampler = CostWeightedSampler(
+                self.config.cost_sampling_threshold_usd, self.config.cost_sampling_min_ratio
+            )
+        self._metadata_encoder = MetadataEncoder(
+            self.config.metadata_max_keys, self.config.metadata_max_depth
+        )
+        self._pricing = PricingCatalog(
+            self.config.pricing_catalog,
+            batch=self.config.pricing_tier == "batch",
+            reload_interval_ms=self.config.pricing_reload_interval_ms,
+        )
+        self._init_flush_state()
         self._provider: TracerProvider = self._init_provider()
         self._tracer = self._provider.get_tracer("lumina-sdk", "0.1.0")
         _instance = self
+        if hasattr(os, "register_at_fork"):
+            # Bound through a weak reference so the hook never keeps an instance alive
+            after_fork = weakref.WeakMethod(self._after_fork_in_child)
+            os.register_at_fork(after_in_child=lambda: _call_weak(after_fork))
 
     # ------------------------------------------------------------------
     # Initialization
     # ------------------------------------------------------------------
 
     def _init_provider(self) -> TracerProvider:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+
+        from .pipeline import build_processor
+        from .sampling import AdaptiveSampler, LuminaSampler, ReusedIdGenerator
+        from .tail_sampling import TailSamplingProcessor
+
         resource_attrs: Dict[str, Any] = {
             "service.name": self.config.service_name or "unknown-service",
             "service.version": "0.1.0",
             SC.LUMINA_ENVIRONMENT: self.config.environment,
         }
+        if self.config.service_name:
+            resource_attrs[SC.LUMINA_SERVICE_NAME] = self.config.service_name
         if self.config.customer_id:
             resource_attrs[SC.LUMINA_CUSTOMER_ID] = self.config.customer_id
 
         resource = Resource.create(resource_attrs)
 
-        headers: Dict[str, str] = {}
-        if self.config.api_key:
-            headers["Authorization"] = f"Bearer {self.config.api_key}"
-
-        exporter = OTLPSpanExporter(
-            endpoint=self.config.endpoint,
-            headers=headers,
-        )
-
-        processor = BatchSpanProcessor(
+        exporter = self._init_exporter()
+        # With a helper process the helper does the real batching; just hand spans over
+        self._processor: LuminaSpanProcessor = build_processor(
+            self.config,
             exporter,
-            max_queue_size=self.config.batch_size,
-            schedule_delay_millis=self.config.batch_interval_ms,
-            export_timeout_millis=self.config.timeout_ms,
-            max_export_batch_size=self.config.batch_size,
+            schedule_delay_millis=(
+                min(self.config.batch_interval_ms, 100)
+                if self.config.helper_process
+                else self.config.batch_interval_ms
+            ),
         )
 
-        provider = TracerProvider(resource=resource)
-        provider.add_span_processor(processor)
+        sampler: LuminaSampler
+        self._adaptive_sampler: Optional[AdaptiveSampler] = None
+        if self.config.sampling_budget_per_sec is not None:
+            sampler = self._adaptive_sampler = AdaptiveSampler(
+                self.config.sampling_budget_per_sec,
+                self.config.sample_ratio,
+                self.config.sampling_rules or (),
+            )
+        else:
+            sampler = LuminaSampler(self.config.sample_ratio, self.config.sampling_rules or ())
+        self._id_generator = ReusedIdGenerator()
+        provider = TracerProvider(
+            resource=resource, sampler=sampler, id_generator=self._id_generator
+        )
+        self._tail_sampler: Optional[TailSamplingProcessor] = None
+        if self.config.tail_sampling:
+            self._tail_sampler = TailSamplingProcessor(
+                self._processor,
+                sample_ratio=self.config.tail_sample_ratio,
+                min_cost_usd=self.config.tail_min_cost_usd,
+                min_duration_ms=self.config.tail_min_duration_ms,
+                max_buffered_spans=self.config.tail_max_buffered_spans,
+                trace_timeout_millis=self.config.tail_trace_timeout_ms,
+            )
+            provider.add_span_processor(self._tail_sampler)
+        else:
+            provider.add_span_processor(self._processor)
         otel_trace.set_tracer_provider(provider)
         return provider
 
+    def _init_exporter(self) -> SpanExporter:
+        self._spool = None
+        if self.config.agent_socket:
+            # The per-host agent owns batching, compression and upload
+            from .agent import AgentSpanExporter
+
+            return AgentSpanExporter(self.config.agent_socket, timeout_ms=self.config.timeout_ms)
+        if self.config.helper_process:
+            # Encoding and upload run in a child process, off this process's GIL
+            from .helper import HelperSpanExporter
+
+            return HelperSpanExporter(self.config, timeout_ms=self.config.timeout_ms)
+        if self.config.exporter == "otlp_proto":
+            # Imported lazily so the default JSON path never loads protobuf
+            from opentelemetry.exporter.otlp.proto.http import Compression
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            from .pipeline import auth_headers
+
+            if self.config.compression == "zstd":
+                raise ValueError("zstd compression requires the otlp_json exporter")
+            if not isinstance(self.config.endpoint, str):
+                raise ValueError("Multiple endpoints require the otlp_json exporter")
+            return OTLPSpanExporter(
+                endpoint=self.config.endpoint,
+                headers=auth_headers(self.config),
+                compression=(
+                    Compression.Gzip
+                    if self.config.compression == "gzip"
+                    else Compression.NoCompression
+                ),
+            )
+        if self.config.exporter != "otlp_json":
+            raise ValueError(f"Unknown Lumina exporter: {self.config.exporter!r}")
+        from .pipeline import build_exporter
+
+        exporter = build_exporter(self.config)
+        self._spool = exporter.spool
+        return exporter
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Rebuild the export pipeline in a forked child.
+
+        The child inherits the parent's processor queue and locks, pooled
+        sockets and spool handles, but none of the threads that service them.
+        Spans queued in the parent are left to the parent; the child gets a
+        fresh exporter (new connection pool, its own spool slot) and an empty
+        processor with new worker threads.
+        """
+        self._init_flush_state()
+        if self._spool is not None:
+            self._spool.release_after_fork()
+        if self._tail_sampler is not None:
+            self._tail_sampler.reset_after_fork()
+        if self._adaptive_sampler is not None:
+            self._adaptive_sampler.reset_after_fork()
+        self._pricing.reset_after_fork()
+        self._processor.reset_after_fork(self._init_exporter())
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -131,8 +249,10 @@ class Lumina:
         """
         Trace a single LLM call with automatic attribute extraction.
 
-        Handles both OpenAI and Anthropic response shapes.  Like
-        :meth:`trace`, this works for sync and async callables.
+        Handles OpenAI chat completion and Responses API objects, Anthropic
+        messages and their raw JSON dicts; other types can be taught with
+        :func:`lumina.register_extractor`.  Like :meth:`trace`, this works
+        for sync and async callables.
         """
         if inspect.iscoroutinefunction(fn):
             return self._trace_llm_async(
@@ -142,13 +262,97 @@ class Lumina:
             fn, name=name, system=system, prompt=prompt, metadata=metadata, tags=tags
         )
 
-    async def flush(self) -> None:
-        """Flush all pending spans immediately."""
-        self._provider.force_flush()
+    def traced(
+        self,
+        fn: Optional[Callable[..., Any]] = None,
+        *,
+        name: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        """
+        Decorator form of :meth:`trace` for functions called often.
+
+        Usage::
+
+            @lumina.traced
+            def retrieve(query): ...
+
+            @lumina.traced(name="rerank", metadata={"model": "bge"}, tags=["rag"])
+            async def rerank(docs): ...
 
-    async def shutdown(self) -> None:
-        """Shutdown the SDK and flush remaining spans."""
-        self._provider.shutdown()
+        Whether the function is sync, async or a (sync or async) generator,
+        the span name (``fn.__qualname__`` by default) and the encoded
+        metadata and tags are all worked out once, when decorating, so a call
+        only pays for the span itself.  A generator's span covers the whole
+        iteration.  The function does not receive the span; use
+        :func:`opentelemetry.trace.get_current_span` to add attributes.
+        """
+
+        def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+            from .decorators import build_traced
+
+            attributes = dict(self._common_attrs(metadata, tags))
+            return build_traced(self, fn, name or fn.__qualname__, attributes)
+
+        return decorate(fn) if fn is not None else decorate
+
+    def traced_llm(
+        self,
+        fn: Optional[Callable[..., Any]] = None,
+        *,
+        name: str = SC.SPAN_NAME_LLM_REQUEST,
+        system: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        """
+        Decorator form of :meth:`trace_llm` for a function that calls an LLM.
+
+        Usage::
+
+            @lumina.traced_llm(name="summarize", system="openai")
+            def summarize(text):
+                return client.chat.completions.create(...)
+
+        The returned response is read for model, usage and cost as in
+        :meth:`trace_llm`.  Like :meth:`traced`, all static work happens at
+        decoration time.  Generator functions are rejected with
+        :class:`TypeError`.
+        """
+
+        def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+            from .decorators import build_traced
+
+            attributes = dict(self._common_attrs(metadata, tags))
+            if system:
+                attributes[SC.LLM_SYSTEM] = system
+            return build_traced(self, fn, name, attributes, llm=True)
+
+        return decorate(fn) if fn is not None else decorate
+
+    async def flush(self, timeout: Optional[float] = None) -> FlushReport:
+        """
+        Export all pending spans, waiting at most ``timeout`` seconds.
+
+        The blocking work runs on a background thread, so the event loop
+        keeps running meanwhile.  A call made while another flush is in
+        progress joins that flush and gets its report.  ``timeout`` defaults
+        to ``timeout_ms`` from the config.
+        """
+        return await asyncio.wrap_future(self._start_flush(timeout))
+
+    async def shutdown(self, timeout: Optional[float] = None) -> FlushReport:
+        """Flush remaining spans and shut the SDK down, without blocking the event loop."""
+        return await asyncio.wrap_future(self._start_shutdown(timeout))
+
+    def flush_sync(self, timeout: Optional[float] = None) -> FlushReport:
+        """Blocking variant of :meth:`flush` for code without an event loop."""
+        return self._start_flush(timeout).result()
+
+    def shutdown_sync(self, timeout: Optional[float] = None) -> FlushReport:
+        """Blocking variant of :meth:`shutdown` for code without an event loop."""
+        return self._start_shutdown(timeout).result()
 
     def is_enabled(self) -> bool:
         return self.config.enabled
@@ -156,6 +360,79 @@ class Lumina:
     def get_config(self) -> SdkConfig:
         return self.config
 
+    def get_drop_counts(self) -> Dict[str, int]:
+        """Spans dropped by the export queue so far, keyed by overflow policy."""
+        return self._processor.drop_counts()
+
+    # ------------------------------------------------------------------
+    # Flush and shutdown internals
+    # ------------------------------------------------------------------
+
+    def _init_flush_state(self) -> None:
+        self._flush_lock = threading.Lock()
+        self._flush_future: Optional[Future[FlushReport]] = None
+        self._shutdown_future: Optional[Future[FlushReport]] = None
+
+    def _start_flush(self, timeout: Optional[float]) -> Future[FlushReport]:
+        with self._flush_lock:
+            if self._shutdown_future is not None:
+                return self._shutdown_future
+            if self._flush_future is not None:
+                return self._flush_future
+            future = self._flush_future = Future()
+        threading.Thread(
+            name="LuminaFlush", target=self._run_flush, args=(future, timeout), daemon=True
+        ).start()
+        return future
+
+    def _start_shutdown(self, timeout: Optional[float]) -> Future[FlushReport]:
+        with self._flush_lock:
+            if self._shutdown_future is not None:
+                return self._shutdown_future
+            future = self._shutdown_future = Future()
+        threading.Thread(
+            name="LuminaShutdown", target=self._run_shutdown, args=(future, timeout), daemon=True
+        ).start()
+        return future
+
+    def _run_flush(self, future: Future[FlushReport], timeout: Optional[float]) -> None:
+        try:
+            report = self._flush_with_report(timeout)
+        except Exception as exc:
+            self._detach_flush(future)
+            future.set_exception(exc)
+        else:
+            self._detach_flush(future)
+            future.set_result(report)
+
+    def _detach_flush(self, future: Future[FlushReport]) -> None:
+        # Detach before resolving, so a new call never joins a finished flush
+        with self._flush_lock:
+            if self._flush_future is future:
+                self._flush_future = None
+
+    def _run_shutdown(self, future: Future[FlushReport], timeout: Optional[float]) -> None:
+        try:
+            report = self._flush_with_report(timeout)
+            self._provider.shutdown()
+            self._pricing.close()
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(report)
+
+    def _flush_with_report(self, timeout: Optional[float]) -> FlushReport:
+        timeout_ms = self.config.timeout_ms if timeout is None else timeout * 1000
+        before = self._processor.stats()
+        completed = self._provider.force_flush(int(timeout_ms))
+        after = self._processor.stats()
+        return FlushReport(
+            completed=completed,
+            exported=after["exported"] - before["exported"],
+            dropped=(after["dropped"] + after["failed"]) - (before["dropped"] + before["failed"]),
+            pending=after["queued"] + after["in_flight"],
+        )
+
     # ------------------------------------------------------------------
     # Sync internals
     # ------------------------------------------------------------------
@@ -170,7 +447,23 @@ class Lumina:
     ) -> Any:
         import time
 
+        parent_context = otel_context.get_current()
         with self._tracer.start_as_current_span(name) as span:
+            if not span.is_recording():
+                # Sampled out: no attribute work, but errors are still reported
+                start_ns = time.time_ns()
+                try:
+                    return fn(span)
+                except Exception as exc:
+                    self._record_sampled_out_error(
+                        name,
+                        span,
+                        parent_context,
+                        start_ns,
+                        exc,
+                        self._common_attrs(metadata, tags),
+                    )
+                    raise
             start = time.monotonic()
             try:
                 self._set_common_attrs(span, metadata, tags)
@@ -194,6 +487,8 @@ class Lumina:
         tags: Optional[List[str]],
     ) -> Any:
         def _inner(span: Span) -> Any:
+            if not span.is_recording():
+                return fn()
             self._set_llm_pre_attrs(span, system, prompt)
             result = fn()
             self._set_llm_post_attrs(span, result)
@@ -215,7 +510,23 @@ class Lumina:
     ) -> Any:
         import time
 
+        parent_context = otel_context.get_current()
         with self._tracer.start_as_current_span(name) as span:
+            if not span.is_recording():
+                # Sampled out: no attribute work, but errors are still reported
+                start_ns = time.time_ns()
+                try:
+                    return await fn(span)
+                except Exception as exc:
+                    self._record_sampled_out_error(
+                        name,
+                        span,
+                        parent_context,
+                        start_ns,
+                        exc,
+                        self._common_attrs(metadata, tags),
+                    )
+                    raise
             start = time.monotonic()
             try:
                 self._set_common_attrs(span, metadata, tags)
@@ -239,6 +550,8 @@ class Lumina:
         tags: Optional[List[str]],
     ) -> Any:
         async def _inner(span: Span) -> Any:
+            if not span.is_recording():
+                return await fn()
             self._set_llm_pre_attrs(span, system, prompt)
             result = await fn()
             self._set_llm_post_attrs(span, result)
@@ -246,6 +559,33 @@ class Lumina:
 
         return await self._trace_async(name, _inner, metadata=metadata, tags=tags)
 
+    def _record_sampled_out_error(
+        self,
+        name: str,
+        sampled_out: Span,
+        parent_context: otel_context.Context,
+        start_ns: int,
+        exc: Exception,
+        attributes: Dict[str, Any],
+    ) -> None:
+        """
+        Export a failed call the sampler dropped, as a span with the ids of its
+        non-recording span ``sampled_out``, under the same parent.
+        """
+        self._id_generator.reuse(sampled_out.get_span_context())
+        try:
+            span = self._tracer.start_span(
+                name,
+                context=parent_context,
+                attributes={**attributes, SC.LUMINA_SAMPLING_FORCE: True},
+                start_time=start_ns,
+            )
+        finally:
+            self._id_generator.reuse(None)
+        span.record_exception(exc)
+        span.set_status(StatusCode.ERROR, str(exc))
+        span.end()
+
     # ------------------------------------------------------------------
     # Attribute helpers
     # ------------------------------------------------------------------
@@ -256,87 +596,145 @@ class Lumina:
         metadata: Optional[Dict[str, Any]],
         tags: Optional[List[str]],
     ) -> None:
-        if metadata:
-            for key, value in metadata.items():
-                span.set_attribute(key, json.dumps(value))
+        # Environment and service name are on the resource, not repeated per span
+        if metadata or tags:
+            span.set_attributes(self._common_attrs(metadata, tags))
+
+    def _common_attrs(
+        self, metadata: Optional[Dict[str, Any]], tags: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """Span attributes for ``metadata`` and ``tags``."""
+        attributes = self._metadata_encoder.encode(metadata) if metadata else {}
         if tags:
-            span.set_attribute(SC.LUMINA_TAGS, json.dumps(tags))
-        span.set_attribute(SC.LUMINA_ENVIRONMENT, self.config.environment)
-        if self.config.service_name:
-            span.set_attribute(SC.LUMINA_SERVICE_NAME, self.config.service_name)
+            attributes = {**attributes, SC.LUMINA_TAGS: tuple(map(str, tags))}
+        return attributes
 
-    def _set_llm_pre_attrs(
-        self, span: Span, system: Optional[str], prompt: Optional[str]
-    ) -> None:
+    def _set_llm_pre_attrs(self, span: Span, system: Optional[str], prompt: Optional[str]) -> None:
         if system:
             span.set_attribute(SC.LLM_SYSTEM, system)
         if prompt:
             span.set_attribute(SC.LLM_PROMPT, prompt)
 
     def _set_llm_post_attrs(self, span: Span, result: Any) -> None:
-        model: str = getattr(result, "model", "") or ""
-        if model:
-            span.set_attribute(SC.LLM_RESPONSE_MODEL, model)
-
-        response_id: str = getattr(result, "id", "") or ""
-        if response_id:
-            span.set_attribute(SC.LLM_RESPONSE_ID, response_id)
-
-        # Extract completion text — OpenAI or Anthropic format
-        completion = ""
-        choices = getattr(result, "choices", None)
-        if choices and isinstance(choices, list):
-            # OpenAI: result.choices[0].message.content
-            msg = getattr(choices[0], "message", None)
-            completion = (getattr(msg, "content", None) or "") if msg else ""
-        else:
-            content = getattr(result, "content", None)
-            if isinstance(content, list) and content:
-                # Anthropic: result.content[0].text
-                first = content[0]
-                if getattr(first, "type", None) == "text":
-                    completion = getattr(first, "text", "") or ""
-            elif isinstance(content, str):
-                completion = content
-
-        if completion:
-            span.set_attribute(SC.LLM_COMPLETION, completion)
-
-        usage = getattr(result, "usage", None)
-        if usage:
-            prompt_tokens: int = (
-                getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None) or 0
-            )
-            completion_tokens: int = (
-                getattr(usage, "completion_tokens", None)
-                or getattr(usage, "output_tokens", None)
-                or 0
-            )
-            total_tokens: int = (
-                getattr(usage, "total_tokens", None) or prompt_tokens + completion_tokens
+        response = extract_response(result)
+        attributes: Dict[str, Any] = {}
+        if response.model:
+            attributes[SC.LLM_RESPONSE_MODEL] = response.model
+        if response.response_id:
+            attributes[SC.LLM_RESPONSE_ID] = response.response_id
+        if response.completion:
+            attributes[SC.LLM_COMPLETION] = response.completion
+
+        if response.prompt_tokens is not None:
+            if response.prompt_tokens:
+                attributes[SC.LLM_USAGE_PROMPT_TOKENS] = response.prompt_tokens
+            if response.completion_tokens:
+                attributes[SC.LLM_USAGE_COMPLETION_TOKENS] = response.completion_tokens
+            if response.total_tokens:
+                attributes[SC.LLM_USAGE_TOTAL_TOKENS] = response.total_tokens
+            if response.cache_read_tokens:
+                attributes[SC.LLM_USAGE_CACHE_READ_TOKENS] = response.cache_read_tokens
+            if response.cache_write_tokens:
+                attributes[SC.LLM_USAGE_CACHE_CREATION_TOKENS] = response.cache_write_tokens
+
+            cost = self._pricing.cost(
+                response.model,
+                response.prompt_tokens,
+                response.completion_tokens or 0,
+                response.cache_read_tokens,
+                response.cache_write_tokens,
             )
+            if cost > 0:
+                attributes[SC.LUMINA_COST_USD] = cost
 
-            if prompt_tokens:
-                span.set_attribute(SC.LLM_USAGE_PROMPT_TOKENS, prompt_tokens)
-            if completion_tokens:
-                span.set_attribute(SC.LLM_USAGE_COMPLETION_TOKENS, completion_tokens)
-            if total_tokens:
-                span.set_attribute(SC.LLM_USAGE_TOTAL_TOKENS, total_tokens)
+            if self._cost_sampler is not None:
+                weight = self._cost_sampler.weight(span.get_span_context().span_id, cost)
+                if weight is None:
+                    attributes[SC.LUMINA_SAMPLING_DROP] = True
+                elif weight > 1.0:
+                    attributes[SC.LUMINA_SAMPLE_WEIGHT] = weight
 
-            cost = _calculate_cost(model, prompt_tokens, completion_tokens)
-            if cost > 0:
-                span.set_attribute(SC.LUMINA_COST_USD, cost)
+        if attributes:
+            span.set_attributes(attributes)
 
-    # ------------------------------------------------------------------
-    # Cost calculation
-    # ------------------------------------------------------------------
 
+# ------------------------------------------------------------------
+# Disabled mode
+# ------------------------------------------------------------------
 
-def _calculate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
-    """Calculate cost in USD based on model and token counts."""
-    model_key = next((k for k in _PRICING if k in model), None)
-    input_price, output_price = _PRICING.get(model_key or "", (1.0, 2.0))
-    return (prompt_tokens / 1_000_000) * input_price + (completion_tokens / 1_000_000) * output_price
+
+class _DisabledLumina(Lumina):
+    """
+    What ``Lumina(...)`` returns when ``enabled`` is false.
+
+    No tracer provider, exporter or worker threads are created and the
+    OpenTelemetry SDK is never imported; traced functions are called
+    directly, with a non-recording span where :meth:`Lumina.trace` passes one,
+    and the decorators hand back the function unwrapped.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        global _instance
+        self.config = load_sdk_config(config)
+        _instance = self
+
+    def trace(
+        self,
+        name: str,
+        fn: Callable[[Span], Any],
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        return fn(INVALID_SPAN)
+
+    def trace_llm(
+        self,
+        fn: Callable[[], Any],
+        *,
+        name: str = SC.SPAN_NAME_LLM_REQUEST,
+        system: Optional[str] = None,
+        prompt: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        return fn()
+
+    def traced(
+        self,
+        fn: Optional[Callable[..., Any]] = None,
+        *,
+        name: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        return fn if fn is not None else _identity
+
+    def traced_llm(
+        self,
+        fn: Optional[Callable[..., Any]] = None,
+        *,
+        name: str = SC.SPAN_NAME_LLM_REQUEST,
+        system: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Any:
+        return fn if fn is not None else _identity
+
+    async def flush(self, timeout: Optional[float] = None) -> FlushReport:
+        return FlushReport(completed=True)
+
+    async def shutdown(self, timeout: Optional[float] = None) -> FlushReport:
+        return FlushReport(completed=True)
+
+    def flush_sync(self, timeout: Optional[float] = None) -> FlushReport:
+        return FlushReport(completed=True)
+
+    def shutdown_sync(self, timeout: Optional[float] = None) -> FlushReport:
+        return FlushReport(completed=True)
+
+    def get_drop_counts(self) -> Dict[str, int]:
+        return {}
 
 
 # ------------------------------------------------------------------
@@ -344,6 +742,16 @@ def _calculate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> f
 # ------------------------------------------------------------------
 
 
+def _identity(fn: T) -> T:
+    return fn
+
+
+def _call_weak(method: "weakref.WeakMethod[Callable[[], None]]") -> None:
+    bound = method()
+    if bound is not None:
+        bound()
+
+
 def init_lumina(config: Optional[Dict[str, Any]] = None) -> "Lumina":
     """Create and store a module-level Lumina singleton."""
     return Lumina(config)
@@ -0,0 +1,91 @@
+"""
+Export pipeline construction.
+
+:class:`~lumina.Lumina`, the per-host agent (``python -m lumina.agent``) and
+the export helper process all upload through an OTLP/JSON exporter and a
+:class:`~lumina.processor.LuminaSpanProcessor` configured from the same
+``LUMINA_*`` settings; they are built here so the three cannot drift apart.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from opentelemetry.sdk.trace.export import SpanExporter
+
+from .compression import Compressor, load_dictionary
+from .exporter import OTLPJsonSpanExporter
+from .processor import LuminaSpanProcessor, OverflowPolicy
+from .retry import RetryPolicy
+from .spool import SpanSpool, open_spool
+from .types import SdkConfig
+
+
+def auth_headers(config: SdkConfig) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {config.api_key}"} if config.api_key else {}
+
+
+def build_compressor(config: SdkConfig) -> Optional[Compressor]:
+    if config.compression == "none":
+        return None
+    return Compressor(
+        config.compression,
+        level=config.compression_level,
+        dictionary=load_dictionary(config.compression_dictionary),
+    )
+
+
+def build_spool(config: SdkConfig) -> Optional[SpanSpool]:
+    """The spool in ``spool_dir``, or a free ``worker-N`` slot of it; None without one."""
+    if not config.spool_dir:
+        return None
+    # Opening the spool recovers batches left behind by a previous process
+    return open_spool(config.spool_dir, max_bytes=config.spool_max_bytes)
+
+
+def build_exporter(config: SdkConfig) -> OTLPJsonSpanExporter:
+    """An OTLP/JSON exporter with the configured compression, retries and spool."""
+    exporter = OTLPJsonSpanExporter(
+        config.endpoint,
+        headers=auth_headers(config),
+        timeout_ms=config.timeout_ms,
+        compressor=build_compressor(config),
+        # Each concurrent export needs its own connection
+        max_connections=max(config.max_connections, config.max_concurrent_exports),
+        retry=RetryPolicy(
+            config.max_retries, budget_ms=config.retry_budget_ms or config.timeout_ms
+        ),
+        spool=build_spool(config),
+        spool_interval_ms=config.batch_interval_ms,
+    )
+    # Connect in the background so the first flush skips TCP/TLS setup
+    exporter.warm_up()
+    return exporter
+
+
+def build_processor(
+    config: SdkConfig,
+    exporter: SpanExporter,
+    *,
+    schedule_delay_millis: Optional[float] = None,
+    overflow_policy: Optional[OverflowPolicy] = None,
+    block_timeout_millis: Optional[float] = None,
+) -> LuminaSpanProcessor:
+    """A batching processor for ``exporter``; the keyword arguments override the config."""
+    return LuminaSpanProcessor(
+        exporter,
+        max_queue_size=max(config.max_queue_size, config.batch_size),
+        max_export_batch_size=config.batch_size,
+        max_export_batch_bytes=config.max_batch_bytes,
+        schedule_delay_millis=(
+            config.batch_interval_ms if schedule_delay_millis is None else schedule_delay_millis
+        ),
+        export_timeout_millis=config.timeout_ms,
+        overflow_policy=(
+            config.queue_overflow_policy if overflow_policy is None else overflow_policy
+        ),
+        block_timeout_millis=(
+            config.queue_block_timeout_ms if block_timeout_millis is None else block_timeout_millis
+        ),
+        max_concurrent_exports=config.max_concurrent_exports,
+    )
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Price = Tuple[float, float]
+
+
+class ModelPrice(NamedTuple):
+    """USD per 1M tokens for each kind of token a model bills."""
+
+    input: float
+    output: float
+    cached_input: float
+    cache_write: float
+    batch_input: float
+    batch_output: float
+
+    def cost(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        batch: bool = False,
+    ) -> float:
+        """
+        Cost in USD.  ``prompt_tokens`` includes the cache reads and writes,
+        which are billed at their own rates.
+        """
+        uncached = max(prompt_tokens - cache_read_tokens - cache_write_tokens, 0)
+        input_rate, output_rate = (
+            (self.batch_input, self.batch_output) if batch else (self.input, self.output)
+        )
+        return (
+            uncached * input_rate
+            + cache_read_tokens * self.cached_input
+            + cache_write_tokens * self.cache_write
+            + completion_tokens * output_rate
+        ) / 1_000_000
+
+
+def model_price(
+    input: float,
+    output: float,
+    cached_input: Optional[float] = None,
+    cache_write: Optional[float] = None,
+    batch_input: Optional[float] = None,
+    batch_output: Optional[float] = None,
+) -> ModelPrice:
+    """A :class:`ModelPrice` whose missing cache and batch rates are the standard ones."""
+    input, output = float(input), float(output)
+    return ModelPrice(
+        input,
+        output,
+        input if cached_input is None else float(cached_input),
+        input if cache_write is None else float(cache_write),
+        input if batch_input is None else float(batch_input),
+        output if batch_output is None else float(batch_output),
+    )
+
+
+# Pricing per 1M tokens: input, output, cached input, cache write, batch input, batch output.
+# OpenAI bills cache writes at the input rate; Anthropic at 1.25x it (5-minute cache).
+DEFAULT_PRICING: Dict[str, ModelPrice] = {
+    "gpt-4": model_price(30.0, 60.0, 30.0, 30.0, 15.0, 30.0),
+    "gpt-4-turbo": model_price(10.0, 30.0, 10.0, 10.0, 5.0, 15.0),
+    "gpt-4o": model_price(2.5, 10.0, 1.25, 2.5, 1.25, 5.0),
+    "gpt-4o-mini": model_price(0.15, 0.6, 0.075, 0.15, 0.075, 0.3),
+    "gpt-3.5-turbo": model_price(0.5, 1.5, 0.5, 0.5, 0.25, 0.75),
+    "claude-sonnet-4": model_price(3.0, 15.0, 0.3, 3.75, 1.5, 7.5),
+    "claude-3-opus": model_price(15.0, 75.0, 1.5, 18.75, 7.5, 37.5),
+    "claude-3-sonnet": model_price(3.0, 15.0, 0.3, 3.75, 1.5, 7.5),
+    "claude-3-haiku": model_price(0.25, 1.25, 0.03, 0.3, 0.125, 0.625),
+}
+# Charged for models no key matches
+FALLBACK_PRICE = model_price(1.0, 2.0)
+
+# A key only matches a whole name or one followed by a version or date suffix,
+# so "gpt-4" prices "gpt-4-0613" but not "gpt-4o"
+_SUFFIX_SEPARATORS = frozenset("-@:")
+# Provider prefixes ("openai/gpt-4", "us.anthropic.claude-3-haiku-...") end at these
+_PREFIX_SEPARATORS = frozenset("/.")
+_MAX_REPORTED = 1024
+_PRICE = ""  # Trie key holding the price of the key that ends at a node
+
+
+class PricingIndex:
+    """
+    Longest-prefix model-price lookup.
+
+    Keys are lowercased into a character trie; a model name is priced by the
+    longest key that is a prefix of it, ending at the end of the name or at a
+    ``-``, ``@`` or ``:`` (``gpt-4-turbo-2024-04-09`` is ``gpt-4-turbo``,
+    never ``gpt-4``).  If nothing matches from the start, matching is retried
+    after each ``/`` or ``.`` so provider-prefixed names still resolve.
+
+    Results are kept in an LRU cache of ``cache_size`` model names, so a
+    repeated lookup is a dict hit.  A model no key matches is priced at
+    ``fallback`` and logged once.
+    """
+
+    def __init__(
+        self,
+        prices: Mapping[str, Union[Price, ModelPrice]],
+        *,
+        fallback: ModelPrice = FALLBACK_PRICE,
+        cache_size: int = 1024,
+    ) -> None:
+        self._root: Dict[str, Any] = {}
+        for key, price in prices.items():
+            node = self._root
+            for char in key.strip().lower():
+                node = node.setdefault(char, {})
+            node[_PRICE] = price if isinstance(price, ModelPrice) else model_price(*price)
+        self._fallback = fallback
+        # Insertion-ordered set of the names reported so far
+        self._unknown: Dict[str, None] = {}
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._resolve)
+
+    def lookup(self, model: str) -> ModelPrice:
+        """The :class:`ModelPrice` (USD per 1M tokens) for ``model``."""
+        return self._cached(model)
+
+    def unknown_models(self) -> List[str]:
+        """Model names that matched no key, in the order they were first seen."""
+        return list(self._unknown)
+
+    def _resolve(self, model: str) -> ModelPrice:
+        name = model.strip().lower()
+        price = self._match(name, 0)
+        if price is None:
+            for start, char in enumerate(name, 1):
+                if char in _PREFIX_SEPARATORS:
+                    price = self._match(name, start)
+                    if price is not None:
+                        break
+        if price is not None:
+            return price
+        if name and name not in self._unknown and len(self._unknown) < _MAX_REPORTED:
+            self._unknown[name] = None
+            logger.warning(
+                "No price for model %r; costing it at $%s/$%s per 1M input/output tokens",
+                model,
+                self._fallback.input,
+                self._fallback.output,
+            )
+        return self._fallback
+
+    def _match(self, name: str, start: int) -> Optional[ModelPrice]:
+        """Price of the longest key matching ``name[start:]`` at a boundary."""
+        best: Optional[ModelPrice] = None
+        node = self._root
+        end = len(name)
+        for index in range(start, end):
+            node = node.get(name[index])
+            if node is None:
+                return best
+            if _PRICE in node and (index + 1 == end or name[index + 1] in _SUFFIX_SEPARATORS):
+                best = node[_PRICE]
+        return best
+
+
+# ------------------------------------------------------------------
+# Catalog file
+# ------------------------------------------------------------------
+
+
+class PricingCatalog:
+    """
+    Model prices for cost calculation, optionally read from a catalog file.
+
+    The catalog is JSON::
+
+        {
+          "version": "2025-06-01",
+          "models": {
+            "gpt-4o": {"input": 2.5, "output": 10.0, "cached_input": 1.25,
+                       "batch_input": 1.25, "batch_output": 5.0},
+            "claude-3-5-sonnet": [
+              {"effective_from": "2024-06-20", "input": 3.0, "output": 15.0,
+               "cached_input": 0.3, "cache_write": 3.75}
+            ]
+          }
+        }
+
+    A model maps to one price or a list of prices with ``effective_from``
+    dates (UTC); the latest one in effect is used, and a price dated in the
+    future takes over when its day starts.  Catalog entries are added to the
+    built-in table, replacing keys it already has.
+
+    The file is read once when the catalog is created.  After that a
+    background thread checks its size and modification time every
+    ``reload_interval_ms`` and, if either changed or a dated price came into
+    effect, loads it into a new :class:`PricingIndex` and swaps it in with
+    one assignment; lookups only read the current index and never touch the
+    file.  A catalog that fails to load is logged and the previous prices
+    stay in use.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        batch: bool = False,
+        reload_interval_ms: int = 30000,
+        cache_size: int = 1024,
+    ) -> None:
+        self._path = path
+        self._batch = batch
+        self._interval = reload_interval_ms / 1000
+        self._cache_size = cache_size
+        self._stamp: Optional[Tuple[int, int]] = None
+        # Wall-clock time at which a dated price in the catalog takes effect
+        self._expires = float("inf")
+        self._stop = threading.Event()
+        self.version = "builtin"
+        self._index = PricingIndex(DEFAULT_PRICING, cache_size=cache_size)
+        if path is not None:
+            self._check()
+            self._start_reloader()
+
+    def lookup(self, model: str) -> ModelPrice:
+        return self._index.lookup(model)
+
+    def cost(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+    ) -> float:
+        """Cost in USD of a call, at batch rates when the catalog was created with ``batch``."""
+        return self._index.lookup(model).cost(
+            prompt_tokens, completion_tokens, cache_read_tokens, cache_write_tokens, self._batch
+        )
+
+    def unknown_models(self) -> List[str]:
+        return self._index.unknown_models()
+
+    def close(self) -> None:
+        """Stop the reload thread."""
+        self._stop.set()
+
+    def reset_after_fork(self) -> None:
+        """Start a reload thread in a forked child, which inherits none of the parent's."""
+        if self._path is not None and not self._stop.is_set():
+            self._stop = threading.Event()
+            self._start_reloader()
+
+    def _start_reloader(self) -> None:
+        thread = threading.Thread(name="LuminaPricingReload", target=self._reload_loop, daemon=True)
+        thread.start()
+
+    def _reload_loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._check()
+
+    def _check(self) -> None:
+        try:
+            stat = os.stat(self._path)  # type: ignore[arg-type]
+        except OSError as exc:
+            if self._stamp is None:
+                logger.warning("Pricing catalog %s unavailable: %s", self._path, exc)
+                self._stamp = (-1, -1)
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp or time.time() >= self._expires:
+            self._stamp = stamp
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self._path, "rb") as fh:  # type: ignore[arg-type]
+                version, prices, expires = parse_catalog(json.load(fh), time.time())
+        except (OSError, ValueError, TypeError, KeyError) as exc:
+            logger.warning(
+                "Could not load pricing catalog %s, keeping version %s: %s",
+                self._path,
+                self.version,
+                exc,
+            )
+            return
+        index = PricingIndex({**DEFAULT_PRICING, **prices}, cache_size=self._cache_size)
+        self._index = index
+        self.version = version
+        self._expires = expires
+        logger.info("Loaded pricing catalog %s version %s", self._path, version)
+
+
+def parse_catalog(
+    catalog: Mapping[str, Any], now: float
+) -> Tuple[str, Dict[str, ModelPrice], float]:
+    """
+    The version, the prices in effect at ``now`` (a Unix time) and the Unix
+    time at which the next dated price takes effect (``inf`` if none).
+    """
+    prices: Dict[str, ModelPrice] = {}
+    expires = float("inf")
+    for model, entries in catalog["models"].items():
+        if isinstance(entries, Mapping):
+            entries = [entries]
+        effective: Optional[Tuple[float, Mapping[str, Any]]] = None
+        for entry in entries:
+            start = _day_start(entry["effective_from"]) if "effective_from" in entry else 0.0
+            if start > now:
+                expires = min(expires, start)
+            elif effective is None or start >= effective[0]:
+                effective = (start, entry)
+        if effective is not None:
+            entry = effective[1]
+            prices[model] = model_price(
+                entry["input"],
+                entry["output"],
+                entry.get("cached_input"),
+                entry.get("cache_write"),
+                entry.get("batch_input"),
+                entry.get("batch_output"),
+            )
+    return str(catalog.get("version", "unversioned")), prices, expires
+
+
+def _day_start(day: str) -> float:
+    return datetime.combine(date.fromisoformat(day), datetime.min.time(), timezone.utc).timestamp()
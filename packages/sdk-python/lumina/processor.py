@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Literal, Optional, Tuple
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .exporter import estimate_span_size
+from .sampling import DROP_ATTRIBUTE
+
+logger = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["drop_newest", "drop_oldest", "block"]
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+
+class LuminaSpanProcessor(SpanProcessor):
+    """
+    Batching span processor with a bounded queue and an explicit overflow policy.
+
+    Unlike the stock ``BatchSpanProcessor``, the queue capacity is independent
+    of the export batch size, and what happens when the queue is full is
+    chosen by ``overflow_policy``:
+
+    * ``drop_newest`` — reject the span being ended (cheapest, the default).
+    * ``drop_oldest`` — evict the oldest queued span to make room.
+    * ``block`` — make the ending thread wait up to ``block_timeout_millis``
+      for room, dropping the span only if the wait times out.
+
+    Every dropped span is counted per policy; see :meth:`drop_counts`.
+
+    A batch is closed when it reaches ``max_export_batch_size`` spans or
+    ``max_export_batch_bytes`` of estimated encoded size, whichever comes
+    first.  Each span's size is estimated once, when it ends, with
+    ``size_estimator``.  A single span larger than the byte target is still
+    exported, alone in its batch.
+
+    Up to ``max_concurrent_exports`` batches are exported at once, each on
+    its own worker thread, so throughput scales with concurrency rather than
+    with the collector's round-trip time.  A span stays in the queue until a
+    worker is free to take it, which bounds the pipeline to one batch per
+    worker and means a slow collector fills the queue and trips the
+    overflow policy instead of piling up work out of its reach.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        *,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        max_export_batch_bytes: int = 512 * 1024,
+        schedule_delay_millis: float = 5000,
+        export_timeout_millis: float = 30000,
+        overflow_policy: OverflowPolicy = "drop_newest",
+        block_timeout_millis: float = 100,
+        size_estimator: Callable[[ReadableSpan], int] = estimate_span_size,
+        max_concurrent_exports: int = 1,
+    ) -> None:
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be positive")
+        if max_export_batch_size <= 0:
+            raise ValueError("max_export_batch_size must be positive")
+        if max_export_batch_bytes <= 0:
+            raise ValueError("max_export_batch_bytes must be positive")
+        if max_concurrent_exports <= 0:
+            raise ValueError("max_concurrent_exports must be positive")
+        if max_export_batch_size > max_queue_size:
+            raise ValueError("max_export_batch_size must not exceed max_queue_size")
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy!r}")
+
+        self._exporter = exporter
+        self._max_queue_size = max_queue_size
+        self._max_export_batch_size = max_export_batch_size
+        self._max_export_batch_bytes = max_export_batch_bytes
+        self._size_estimator = size_estimator
+        self._schedule_delay = schedule_delay_millis / 1000
+        self._export_timeout_millis = export_timeout_millis
+        self._overflow_policy: OverflowPolicy = overflow_policy
+        self._block_timeout = block_timeout_millis / 1000
+        self._max_concurrent_exports = max_concurrent_exports
+        self._shutdown = False
+        self._init_state()
+
+    # ------------------------------------------------------------------
+    # SpanProcessor interface
+    # ------------------------------------------------------------------
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context.trace_flags.sampled:
+            return
+        if span.attributes and span.attributes.get(DROP_ATTRIBUTE):
+            return
+        size = self._size_estimator(span)
+        with self._lock:
+            if self._shutdown:
+                self._drops["shutdown"] += 1
+                return
+            if len(self._queue) >= self._max_queue_size and not self._make_room():
+                return
+            self._queue.append((span, size))
+            self._queued_bytes += size
+            if self._batch_ready():
+                self._not_empty.notify()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        deadline = time.monotonic() + self._export_timeout_millis / 1000
+        for worker in self._workers:
+            worker.join(max(deadline - time.monotonic(), 0))
+        self._exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1000
+        with self._lock:
+            # Workers drain the queue regardless of batch thresholds while a flush waits
+            self._flushing += 1
+            self._not_empty.notify_all()
+            try:
+                while self._queue or self._in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._idle.wait(remaining)
+            finally:
+                self._flushing -= 1
+        # Exporters that hand spans on (e.g. to a helper process) flush that stage too
+        remaining_millis = max((deadline - time.monotonic()) * 1000, 0)
+        return self._exporter.force_flush(int(remaining_millis))
+
+    def reset_after_fork(self, exporter: SpanExporter) -> None:
+        """
+        Make the processor usable in a freshly forked child process.
+
+        The child inherits the parent's queue and locks but none of its
+        worker threads, so the locks may be held forever and nothing drains
+        the queue.  This discards all of that state, including the spans
+        queued in the parent (the parent still exports those), and starts new
+        workers exporting to ``exporter``.  Must be called in the child before
+        any other thread touches the processor.
+        """
+        self._exporter = exporter
+        self._init_state()
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def drop_counts(self) -> Dict[str, int]:
+        """Number of spans dropped so far, keyed by the policy that dropped them."""
+        with self._lock:
+            return dict(self._drops)
+
+    def queue_size(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Span counters since the processor started.
+
+        ``exported`` and ``failed`` count spans by export result, ``dropped``
+        all spans dropped by the queue, and ``queued`` / ``in_flight`` the
+        spans waiting for and currently in an export.
+        """
+        with self._lock:
+            return {
+                "exported": self._exported,
+                "failed": self._failed,
+                "dropped": sum(self._drops.values()),
+                "queued": len(self._queue),
+                "in_flight": self._in_flight_spans,
+            }
+
+    def in_flight(self) -> int:
+        """Number of batches currently being exported."""
+        with self._lock:
+            return self._in_flight
+
+    def queued_bytes(self) -> int:
+        """Estimated encoded size of the spans currently queued."""
+        with self._lock:
+            return self._queued_bytes
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _init_state(self) -> None:
+        # (span, estimated encoded size) pairs, oldest first
+        self._queue: Deque[Tuple[ReadableSpan, int]] = deque()
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._in_flight_spans = 0
+        self._flushing = 0
+        self._exported = 0
+        self._failed = 0
+        self._drops: Dict[str, int] = {policy: 0 for policy in OVERFLOW_POLICIES}
+        self._drops["shutdown"] = 0
+
+        self._workers = [
+            threading.Thread(name=f"LuminaSpanProcessor-{index}", target=self._run, daemon=True)
+            for index in range(self._max_concurrent_exports)
+        ]
+        if not self._shutdown:
+            for worker in self._workers:
+                worker.start()
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full queue. Must hold ``self._lock``."""
+        policy = self._overflow_policy
+        if policy == "drop_oldest":
+            _, size = self._queue.popleft()
+            self._queued_bytes -= size
+            self._drops[policy] += 1
+            return True
+        if policy == "block":
+            self._not_empty.notify()
+            deadline = time.monotonic() + self._block_timeout
+            while len(self._queue) >= self._max_queue_size and not self._shutdown:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._not_full.wait(remaining)
+            if len(self._queue) < self._max_queue_size and not self._shutdown:
+                return True
+        self._drops[policy] += 1
+        logger.debug("Lumina span queue full, dropping span (policy=%s)", policy)
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._shutdown and not self._batch_ready():
+                    self._not_empty.wait(self._schedule_delay)
+                if self._shutdown:
+                    break
+            self._export_batch()
+
+        while self._export_batch():
+            pass
+
+    def _batch_ready(self) -> bool:
+        """Whether a batch should be taken right away. Must hold ``self._lock``."""
+        return (
+            len(self._queue) >= self._max_export_batch_size
+            or self._queued_bytes >= self._max_export_batch_bytes
+            or (self._flushing > 0 and len(self._queue) > 0)
+        )
+
+    def _take_batch(self) -> List[ReadableSpan]:
+        """Pop the next batch off the queue. Must hold ``self._lock``."""
+        batch: List[ReadableSpan] = []
+        batch_bytes = 0
+        queue = self._queue
+        while queue and len(batch) < self._max_export_batch_size:
+            span, size = queue[0]
+            if batch and batch_bytes + size > self._max_export_batch_bytes:
+                break
+            queue.popleft()
+            batch.append(span)
+            batch_bytes += size
+        self._queued_bytes -= batch_bytes
+        return batch
+
+    def _export_batch(self) -> bool:
+        """Export up to one batch from the head of the queue. Returns False if it was empty."""
+        with self._lock:
+            batch = self._take_batch()
+            if not batch:
+                return False
+            self._in_flight += 1
+            self._in_flight_spans += len(batch)
+            self._not_full.notify_all()
+            if self._batch_ready():
+                # More than one batch was waiting; hand the rest to an idle worker
+                self._not_empty.notify()
+        ok = False
+        try:
+            ok = self._exporter.export(batch) is SpanExportResult.SUCCESS
+        except Exception:
+            logger.exception("Exception while exporting spans")
+        finally:
+            with self._lock:
+                if ok:
+                    self._exported += len(batch)
+                else:
+                    self._failed += len(batch)
+                self._in_flight -= 1
+                self._in_flight_spans -= len(batch)
+                if not self._queue and not self._in_flight:
+                    self._idle.notify_all()
+        return True
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from http.client import HTTPException
+from typing import Callable, Mapping, Optional
+
+from .transport import TransportResponse
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying; everything else in 4xx means the batch itself is bad
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+RETRYABLE_ERRORS = (OSError, HTTPException)
+
+
+def parse_retry_after(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date) into seconds."""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - (time.time() if now is None else now))
+
+
+class RetryPolicy:
+    """
+    Retries export requests with exponential backoff and full jitter.
+
+    Attempt ``n`` (0-based) waits a random time in ``[0, min(max_delay,
+    base_delay * 2**n)]``.  A ``Retry-After`` header on a retryable response
+    replaces the computed delay.  All attempts and waits share one time
+    budget: each attempt's timeout is capped by what is left of it, and the
+    policy gives up as soon as the next wait would overrun it, rather than
+    holding the export thread for ``timeout × attempts``.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        *,
+        budget_ms: float = 30000,
+        base_delay_ms: float = 100,
+        max_delay_ms: float = 10000,
+    ) -> None:
+        self.max_retries = max(0, max_retries)
+        self._budget = budget_ms / 1000
+        self._base_delay = base_delay_ms / 1000
+        self._max_delay = max_delay_ms / 1000
+        self._cancelled = threading.Event()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt + 1``."""
+        return random.uniform(0, min(self._max_delay, self._base_delay * (2**attempt)))
+
+    def cancel(self) -> None:
+        """Abort pending waits, e.g. at shutdown. In-flight attempts still finish."""
+        self._cancelled.set()
+
+    def reset(self) -> None:
+        self._cancelled.clear()
+
+    def call(self, attempt_fn: Callable[[float], TransportResponse]) -> TransportResponse:
+        """
+        Run ``attempt_fn(timeout_seconds)`` until it succeeds or retrying stops.
+
+        Returns the last response, which may be a failure status.  If the
+        last attempt raised a network error, that error is re-raised.
+        """
+        deadline = time.monotonic() + self._budget
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            error: Optional[BaseException] = None
+            response: Optional[TransportResponse] = None
+            try:
+                response = attempt_fn(max(remaining, 0.001))
+            except RETRYABLE_ERRORS as exc:
+                error = exc
+
+            if response is not None:
+                if response.status < 300 or response.status not in RETRYABLE_STATUSES:
+                    return response
+                delay = parse_retry_after(response.headers)
+                if delay is None:
+                    delay = self.backoff(attempt)
+            else:
+                delay = self.backoff(attempt)
+
+            remaining = deadline - time.monotonic()
+            if attempt >= self.max_retries or delay >= remaining or self._cancelled.is_set():
+                if error is not None:
+                    raise error
+                assert response is not None
+                return response
+
+            logger.debug(
+                "Export attempt %d failed (%s), retrying in %.2f s",
+                attempt + 1,
+                f"HTTP {response.status}" if response is not None else error,
+                delay,
+            )
+            if self._cancelled.wait(delay):
+                if error is not None:
+                    raise error
+                assert response is not None
+                return response
+            attempt += 1
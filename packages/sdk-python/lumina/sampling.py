@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import fnmatch
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace.id_generator import RandomIdGenerator
+from opentelemetry.sdk.trace.sampling import Decision, Sampler, SamplingResult
+from opentelemetry.trace import Link, SpanContext, SpanKind, get_current_span
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+
+from . import semantic_conventions as SC
+
+# Set by the SDK on spans that must be kept whatever the sampling decision
+# (errors in sampled-out calls); the sampler strips it from the span
+FORCE_SAMPLE_ATTRIBUTE = SC.LUMINA_SAMPLING_FORCE
+# Set by the SDK on recording spans that a decision made after the call
+# (cost-weighted sampling) dropped; the span processor discards them
+DROP_ATTRIBUTE = SC.LUMINA_SAMPLING_DROP
+
+# Trace-id ratio sampling looks at the low 64 bits, like TraceIdRatioBased
+_TRACE_ID_MASK = (1 << 64) - 1
+_MAX_CACHED_NAMES = 1024
+# Weight of the latest interval in the adaptive sampler's arrival-rate average
+_SMOOTHING = 0.5
+# Names arriving slower than this (per second) are forgotten
+_IDLE_RATE = 0.01
+# Tracestate entry carrying a kept trace's sample rate to its child spans, as "r:<rate>"
+_TRACE_STATE_KEY = "lumina"
+_RATE_PREFIX = "r:"
+
+
+def _bound(ratio: float) -> int:
+    if not 0.0 <= ratio <= 1.0:
+        raise ValueError(f"Sampling ratio must be between 0 and 1, got {ratio!r}")
+    return round(ratio * (1 << 64))
+
+
+def _with_rate(trace_state: Optional[TraceState], rate: float) -> TraceState:
+    value = f"{_RATE_PREFIX}{rate:.6g}"
+    if trace_state is None:
+        return TraceState([(_TRACE_STATE_KEY, value)])
+    if _TRACE_STATE_KEY in trace_state:
+        return trace_state.update(_TRACE_STATE_KEY, value)
+    return trace_state.add(_TRACE_STATE_KEY, value)
+
+
+def _rate_of(trace_state: Optional[TraceState]) -> Optional[float]:
+    """The sample rate a parent recorded in ``trace_state``, if it is well formed."""
+    value = trace_state.get(_TRACE_STATE_KEY) if trace_state else None
+    if value is None or not value.startswith(_RATE_PREFIX):
+        return None
+    try:
+        rate = float(value[len(_RATE_PREFIX) :])
+    except ValueError:
+        return None
+    return rate if 0.0 < rate <= 1.0 else None
+
+
+class LuminaSampler(Sampler):
+    """
+    Head sampler with per-name ratios and whole-trace decisions.
+
+    A root span is kept when the low 64 bits of its trace id fall below its
+    ratio, so the decision is a pure function of the trace id.  Child spans
+    (local or remote parent) follow their parent's decision, which keeps
+    or drops a trace as a whole.
+
+    ``rules`` override ``ratio`` for matching root span names; the first
+    match wins.  Each rule is a mapping with a ``ratio`` and either a
+    ``name`` or an ``endpoint`` glob; both match the span name, which is what
+    Lumina shows as the endpoint::
+
+        LuminaSampler(0.1, [{"endpoint": "/health*", "ratio": 0},
+                            {"name": "llm.*", "ratio": 0.5}])
+
+    Spans created with :data:`FORCE_SAMPLE_ATTRIBUTE` set are always kept.
+    Children of a trace whose rate is in the tracestate (see
+    :class:`AdaptiveSampler`) record it in ``lumina.sample_rate`` too.
+    """
+
+    def __init__(self, ratio: float = 1.0, rules: Sequence[Mapping[str, Any]] = ()) -> None:
+        self._ratio = ratio
+        self._default_bound = _bound(ratio)
+        self._rules: List[Tuple[str, int]] = []
+        for rule in rules:
+            pattern = rule.get("name", rule.get("endpoint"))
+            if pattern is None or "ratio" not in rule:
+                raise ValueError(f"Sampling rule needs a name or endpoint and a ratio: {rule!r}")
+            self._rules.append((str(pattern), _bound(float(rule["ratio"]))))
+        self._bounds: Dict[str, int] = {}
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        parent = get_current_span(parent_context).get_span_context()
+        if parent.is_valid:
+            trace_state = parent.trace_state
+
+        if attributes and attributes.get(FORCE_SAMPLE_ATTRIBUTE):
+            kept = {k: v for k, v in attributes.items() if k != FORCE_SAMPLE_ATTRIBUTE}
+            return SamplingResult(Decision.RECORD_AND_SAMPLE, kept, trace_state)
+
+        if not parent.is_valid:
+            return self._sample_root(trace_id, name, attributes, trace_state)
+        if parent.trace_flags.sampled:
+            rate = _rate_of(trace_state)
+            if rate is not None:
+                attributes = {**(attributes or {}), SC.LUMINA_SAMPLE_RATE: rate}
+            return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes, trace_state)
+        return SamplingResult(Decision.DROP, None, trace_state)
+
+    def get_description(self) -> str:
+        return f"LuminaSampler{{ratio={self._ratio}, rules={len(self._rules)}}}"
+
+    def _sample_root(
+        self,
+        trace_id: int,
+        name: str,
+        attributes: Attributes,
+        trace_state: Optional[TraceState],
+    ) -> SamplingResult:
+        if (trace_id & _TRACE_ID_MASK) < self._bound_for(name):
+            return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes, trace_state)
+        return SamplingResult(Decision.DROP, None, trace_state)
+
+    def _bound_for(self, name: str) -> int:
+        bound = self._bounds.get(name)
+        if bound is None:
+            bound = next(
+                (
+                    rule_bound
+                    for pattern, rule_bound in self._rules
+                    if fnmatch.fnmatchcase(name, pattern)
+                ),
+                self._default_bound,
+            )
+            if len(self._bounds) >= _MAX_CACHED_NAMES:
+                self._bounds.clear()
+            self._bounds[name] = bound
+        return bound
+
+
+class _NameRate:
+    __slots__ = ("arrivals", "rate", "ratio", "probability")
+
+    def __init__(self, ratio: float) -> None:
+        self.arrivals = 0
+        self.rate: Optional[float] = None
+        self.ratio = ratio
+        self.probability = 1.0
+
+
+class AdaptiveSampler(LuminaSampler):
+    """
+    Head sampler that holds kept traces to a ``budget`` of root spans per second.
+
+    Every ``adjust_interval`` seconds the budget is split between the root
+    span names seen recently: each name gets an equal share, and whatever a
+    quiet name does not use goes to the busier ones.  A name's keep
+    probability is its share over its smoothed arrival rate, applied on top
+    of the ratio from ``rules``/``ratio`` (see :class:`LuminaSampler`).  A
+    token bucket holding one second of budget caps bursts between
+    adjustments.
+
+    Kept root spans record the probability they were kept with in
+    ``lumina.sample_rate``, and in the tracestate, so that child spans (in
+    this process or downstream) record it as well; ingestion counts each
+    span as ``1 / rate`` calls.  Child spans follow their parent and are not
+    counted against the budget.
+    """
+
+    def __init__(
+        self,
+        budget: float,
+        ratio: float = 1.0,
+        rules: Sequence[Mapping[str, Any]] = (),
+        adjust_interval: float = 1.0,
+    ) -> None:
+        if budget <= 0:
+            raise ValueError(f"Sampling budget must be positive, got {budget!r}")
+        super().__init__(ratio, rules)
+        self._budget = budget
+        self._adjust_interval = adjust_interval
+        self._lock = threading.Lock()
+        self._names: Dict[str, _NameRate] = {}
+        now = time.monotonic()
+        self._last_adjust = now
+        self._last_refill = now
+        self._tokens = max(budget, 1.0)
+
+    def get_description(self) -> str:
+        return f"AdaptiveSampler{{budget={self._budget}, ratio={self._ratio}}}"
+
+    def reset_after_fork(self) -> None:
+        """Replace the rate lock, which a forked child may inherit held."""
+        self._lock = threading.Lock()
+
+    def _sample_root(
+        self,
+        trace_id: int,
+        name: str,
+        attributes: Attributes,
+        trace_state: Optional[TraceState],
+    ) -> SamplingResult:
+        bound = self._bound_for(name)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_adjust >= self._adjust_interval:
+                self._adjust(now)
+            stats = self._names.get(name)
+            if stats is None:
+                # Past the cap, unseen names share one entry
+                key = name if len(self._names) < _MAX_CACHED_NAMES else ""
+                stats = self._names.setdefault(key, _NameRate(bound / (1 << 64)))
+            stats.arrivals += 1
+            probability = stats.probability
+
+            self._tokens = min(
+                self._tokens + (now - self._last_refill) * self._budget, max(self._budget, 1.0)
+            )
+            self._last_refill = now
+            sampled = (trace_id & _TRACE_ID_MASK) < round(bound * probability)
+            if sampled:
+                if self._tokens < 1.0:
+                    sampled = False
+                else:
+                    self._tokens -= 1.0
+
+        if not sampled:
+            return SamplingResult(Decision.DROP, None, trace_state)
+        rate = bound / (1 << 64) * probability
+        kept = dict(attributes or {})
+        kept[SC.LUMINA_SAMPLE_RATE] = rate
+        return SamplingResult(Decision.RECORD_AND_SAMPLE, kept, _with_rate(trace_state, rate))
+
+    def _adjust(self, now: float) -> None:
+        """Re-split the budget by recent demand. Must hold ``self._lock``."""
+        elapsed = now - self._last_adjust
+        self._last_adjust = now
+        demands: Dict[str, float] = {}
+        for name, stats in list(self._names.items()):
+            observed = stats.arrivals / elapsed
+            stats.arrivals = 0
+            if stats.rate is None:
+                stats.rate = observed
+            else:
+                stats.rate += _SMOOTHING * (observed - stats.rate)
+            if stats.rate < _IDLE_RATE:
+                del self._names[name]
+                continue
+            demands[name] = stats.rate * stats.ratio
+
+        # Water-filling: the least demanding names are served in full first
+        remaining = self._budget
+        ordered = sorted(demands, key=demands.__getitem__)
+        for index, name in enumerate(ordered):
+            share = remaining / (len(ordered) - index)
+            allocated = min(demands[name], share)
+            remaining -= allocated
+            demand = demands[name]
+            self._names[name].probability = allocated / demand if demand > 0 else 1.0
+
+
+class CostWeightedSampler:
+    """
+    Keeps LLM spans with a probability proportional to their cost.
+
+    Spans costing ``keep_all_cost_usd`` or more are always kept; cheaper
+    ones are kept with probability ``cost / keep_all_cost_usd``, but never
+    less than ``min_ratio``.  A kept span's weight is the inverse of that
+    probability, so summing ``cost * weight`` (or tokens times weight) over
+    kept spans estimates the unsampled total without bias.  The decision is
+    a pure function of the span id.
+    """
+
+    def __init__(self, keep_all_cost_usd: float, min_ratio: float = 0.01) -> None:
+        if keep_all_cost_usd <= 0:
+            raise ValueError(f"keep_all_cost_usd must be positive, got {keep_all_cost_usd!r}")
+        if not 0.0 < min_ratio <= 1.0:
+            raise ValueError(f"min_ratio must be in (0, 1], got {min_ratio!r}")
+        self._keep_all_cost_usd = keep_all_cost_usd
+        self._min_ratio = min_ratio
+
+    def probability(self, cost_usd: float) -> float:
+        if cost_usd >= self._keep_all_cost_usd:
+            return 1.0
+        return max(cost_usd / self._keep_all_cost_usd, self._min_ratio)
+
+    def weight(self, span_id: int, cost_usd: float) -> Optional[float]:
+        """The kept span's weight (1 / probability), or None to drop it."""
+        probability = self.probability(cost_usd)
+        if probability >= 1.0:
+            return 1.0
+        if (span_id & _TRACE_ID_MASK) < round(probability * (1 << 64)):
+            return 1.0 / probability
+        return None
+
+
+class ReusedIdGenerator(RandomIdGenerator):
+    """
+    Random ids, except that after :meth:`reuse` the next span started on
+    this thread takes the trace and span id of an existing span context.
+
+    A call the head sampler dropped ran under a non-recording span whose ids
+    its children already saw.  When the call fails, the error span exported
+    for it reuses those ids, so it keeps its place in the trace: nested
+    errors share one trace id and point at their parents.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def reuse(self, span_context: Optional[SpanContext]) -> None:
+        self._local.reused = span_context
+
+    def generate_trace_id(self) -> int:
+        reused: Optional[SpanContext] = getattr(self._local, "reused", None)
+        return reused.trace_id if reused is not None else super().generate_trace_id()
+
+    def generate_span_id(self) -> int:
+        # Called once per span, after generate_trace_id, so this ends the reuse
+        reused: Optional[SpanContext] = getattr(self._local, "reused", None)
+        if reused is None:
+            return super().generate_span_id()
+        self._local.reused = None
+        return reused.span_id
@@ -18,6 +18,8 @@ LLM_RESPONSE_FINISH_REASON = "gen_ai.response.finish_reason"
 LLM_USAGE_PROMPT_TOKENS = "gen_ai.usage.prompt_tokens"
 LLM_USAGE_COMPLETION_TOKENS = "gen_ai.usage.completion_tokens"
 LLM_USAGE_TOTAL_TOKENS = "gen_ai.usage.total_tokens"
+LLM_USAGE_CACHE_READ_TOKENS = "gen_ai.usage.cache_read.input_tokens"
+LLM_USAGE_CACHE_CREATION_TOKENS = "gen_ai.usage.cache_creation.input_tokens"
 
 # GenAI content attributes
 LLM_PROMPT = "gen_ai.prompt"
@@ -29,8 +31,13 @@ LUMINA_ENVIRONMENT = "lumina.environment"
 LUMINA_SERVICE_NAME = "lumina.service_name"
 LUMINA_ENDPOINT = "lumina.endpoint"
 LUMINA_COST_USD = "lumina.cost_usd"
+LUMINA_SAMPLE_WEIGHT = "lumina.sample_weight"
+LUMINA_SAMPLE_RATE = "lumina.sample_rate"
+LUMINA_SAMPLING_FORCE = "lumina.sampling.force"
+LUMINA_SAMPLING_DROP = "lumina.sampling.drop"
 LUMINA_RESPONSE_HASH = "lumina.response_hash"
 LUMINA_TAGS = "lumina.tags"
+LUMINA_METADATA_DROPPED_KEYS = "lumina.metadata.dropped_keys"
 
 # Span names
 SPAN_NAME_LLM_REQUEST = "llm.request"
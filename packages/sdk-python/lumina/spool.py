@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Record framing: payload length and CRC32 of the payload, big-endian
+_HEADER = struct.Struct(">II")
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_FILE = "cursor"
+_LOCK_FILE = "lock"
+_WORKER_PREFIX = "worker-"
+
+
+class SpoolLockedError(RuntimeError):
+    """Raised when another process already has the spool directory open."""
+
+
+class SpanSpool:
+    """
+    Append-only, disk-backed queue of encoded export batches.
+
+    Batches are appended as length- and CRC-framed records to numbered
+    segment files in ``directory``; a new segment is started once the active
+    one reaches ``segment_bytes``.  Delivered records are tracked by a cursor
+    file (segment number and offset) that is replaced atomically, and fully
+    delivered segments are deleted.  When the spool grows past ``max_bytes``
+    the oldest segments are discarded and counted in :attr:`dropped_batches`.
+
+    Opening a spool recovers whatever a previous process left behind: a torn
+    record at the end of the last segment (from a crash mid-write) is cut
+    off, and reading resumes from the saved cursor.  A damaged record found
+    while reading is skipped and counted in :attr:`dropped_batches`; data that
+    cannot be framed as records at all ends its segment early.
+
+    A spool directory belongs to one process at a time: opening it takes an
+    exclusive lock on a ``lock`` file inside it, and opening a directory that
+    another process holds raises :class:`SpoolLockedError`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        segment_bytes: int = 8 * 1024 * 1024,
+        fsync: bool = True,
+    ) -> None:
+        if segment_bytes <= 0 or max_bytes < segment_bytes:
+            raise ValueError("max_bytes must be at least segment_bytes, both positive")
+
+        self.directory = directory
+        self._max_bytes = max_bytes
+        self._segment_bytes = segment_bytes
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self.dropped_batches = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = _lock_directory(directory)
+        self._segments: List[int] = []
+        self._sizes: Dict[int, int] = {}
+        self._read_seq = 0
+        self._read_offset = 0
+        self._peeked_end: Optional[Tuple[int, int]] = None
+        self._writer: Optional[BinaryIO] = None
+        self._recover()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def append(self, payload: bytes) -> None:
+        """Durably append one encoded batch."""
+        record = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if self._writer is None or self._sizes[self._segments[-1]] >= self._segment_bytes:
+                self._rotate()
+            assert self._writer is not None
+            self._writer.write(record)
+            if self._fsync:
+                os.fsync(self._writer.fileno())
+            self._sizes[self._segments[-1]] += len(record)
+            self._enforce_cap()
+
+    def peek(self) -> Optional[bytes]:
+        """Return the oldest undelivered batch without consuming it."""
+        with self._lock:
+            while self._segments:
+                seq = self._read_seq
+                record = self._read_record(seq, self._read_offset)
+                if record is not None:
+                    payload, end = record
+                    if payload is not None:
+                        self._peeked_end = (seq, end)
+                        return payload
+                    # Its framing is intact, so only this record is lost
+                    logger.warning(
+                        "Lumina spool: skipping corrupt batch at offset %d of segment %d",
+                        self._read_offset,
+                        seq,
+                    )
+                    self.dropped_batches += 1
+                    self._read_offset = end
+                    self._save_cursor()
+                    continue
+                if self._read_offset < self._sizes[seq]:
+                    # No record boundary can be found past unframed bytes
+                    logger.warning(
+                        "Lumina spool: discarding unreadable data at offset %d of segment %d",
+                        self._read_offset,
+                        seq,
+                    )
+                    self.dropped_batches += 1
+                    if seq == self._segments[-1] and self._writer is not None:
+                        # New batches go to a fresh segment
+                        self._writer.close()
+                        self._writer = None
+                elif seq == self._segments[-1]:
+                    return None
+                # Reached the end of a finished segment — it is fully delivered
+                self._remove_segment(seq)
+                if not self._segments:
+                    return None
+                self._read_seq, self._read_offset = self._segments[0], 0
+                self._save_cursor()
+            return None
+
+    def commit(self) -> None:
+        """Mark the batch returned by the last :meth:`peek` as delivered."""
+        with self._lock:
+            if self._peeked_end is None:
+                return
+            seq, end = self._peeked_end
+            self._peeked_end = None
+            if seq != self._read_seq:
+                # The segment was dropped by the size cap in the meantime
+                return
+            self._read_offset = end
+            self._save_cursor()
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            if not self._segments:
+                return False
+            return len(self._segments) > 1 or self._read_offset < self._sizes[self._segments[-1]]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def adopt_orphans(self) -> int:
+        """
+        Move the batches left in unused ``worker-N`` slots into this spool.
+
+        :func:`open_spool` gives each process that finds the directory taken
+        a ``worker-N`` slot of it, and a slot's batches are otherwise only
+        replayed once another process opens that slot again, which may never
+        happen after the worker pool shrinks.  Slots held by a running
+        process are skipped.  Returns the number of batches moved.
+        """
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return 0
+        moved = 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not (name.startswith(_WORKER_PREFIX) and name[len(_WORKER_PREFIX) :].isdigit()):
+                continue
+            if not os.path.isdir(path):
+                continue
+            try:
+                orphan = SpanSpool(
+                    path,
+                    max_bytes=self._max_bytes,
+                    segment_bytes=self._segment_bytes,
+                    fsync=self._fsync,
+                )
+            except SpoolLockedError:
+                continue
+            try:
+                # Appended before it is committed there, so a crash only duplicates
+                while (payload := orphan.peek()) is not None:
+                    self.append(payload)
+                    orphan.commit()
+                    moved += 1
+                self.dropped_batches += orphan.dropped_batches
+            finally:
+                orphan.close()
+        if moved:
+            logger.info("Lumina spool: took over %d batches from unused worker slots", moved)
+        return moved
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def release_after_fork(self) -> None:
+        """
+        Drop this process's handles on a spool inherited across ``fork()``.
+
+        The parent keeps using the spool (and its directory lock); the child
+        only closes its copies of the file descriptors.  Takes no locks, since
+        a thread in the parent may have held them at the time of the fork.
+        """
+        for handle in (self._writer, self._lock_file):
+            if handle is not None:
+                handle.close()
+        self._writer = None
+        self._lock_file = None
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:020d}{_SEGMENT_SUFFIX}")
+
+    def _rotate(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        seq = self._segments[-1] + 1 if self._segments else 1
+        # Unbuffered: each record is one write(), and a forked child never
+        # holds a half-written record it could flush on close
+        self._writer = open(self._path(seq), "ab", buffering=0)
+        self._segments.append(seq)
+        self._sizes[seq] = 0
+        if len(self._segments) == 1:
+            self._read_seq, self._read_offset = seq, 0
+            self._save_cursor()
+
+    def _remove_segment(self, seq: int) -> None:
+        self._segments.remove(seq)
+        self._sizes.pop(seq, None)
+        try:
+            os.remove(self._path(seq))
+        except FileNotFoundError:
+            pass
+
+    def _enforce_cap(self) -> None:
+        while len(self._segments) > 1 and sum(self._sizes.values()) > self._max_bytes:
+            oldest = self._segments[0]
+            dropped = self._count_records(
+                oldest, self._read_offset if oldest == self._read_seq else 0
+            )
+            self.dropped_batches += dropped
+            logger.warning(
+                "Lumina spool over %d bytes, discarding %d batches", self._max_bytes, dropped
+            )
+            self._remove_segment(oldest)
+            self._read_seq, self._read_offset = self._segments[0], 0
+            self._save_cursor()
+
+    def _read_record(self, seq: int, offset: int) -> Optional[Tuple[Optional[bytes], int]]:
+        """
+        The record at ``offset`` of segment ``seq`` as ``(payload, end offset)``.
+
+        The payload is None when it fails its CRC check.  Returns None if no
+        whole record starts at ``offset``: at the end of the segment, or where
+        the data is torn or not framed as records.
+        """
+        try:
+            with open(self._path(seq), "rb") as fh:
+                fh.seek(offset)
+                header = fh.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return None
+                length, crc = _HEADER.unpack(header)
+                payload = fh.read(length)
+        except FileNotFoundError:
+            return None
+        if len(payload) < length:
+            return None
+        end = offset + _HEADER.size + length
+        return (payload if zlib.crc32(payload) == crc else None), end
+
+    def _count_records(self, seq: int, offset: int) -> int:
+        count = 0
+        while True:
+            record = self._read_record(seq, offset)
+            if record is None:
+                return count
+            offset = record[1]
+            count += 1
+
+    # ------------------------------------------------------------------
+    # Cursor and recovery
+    # ------------------------------------------------------------------
+
+    def _save_cursor(self) -> None:
+        path = os.path.join(self.directory, _CURSOR_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as fh:
+            fh.write(f"{self._read_seq} {self._read_offset}")
+            fh.flush()
+            if self._fsync:
+                os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.directory, _CURSOR_FILE)) as fh:
+                seq, offset = fh.read().split()
+            return int(seq), int(offset)
+        except (FileNotFoundError, ValueError):
+            return 0, 0
+
+    def _recover(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith(_SEGMENT_SUFFIX) and name[: -len(_SEGMENT_SUFFIX)].isdigit():
+                seq = int(name[: -len(_SEGMENT_SUFFIX)])
+                self._segments.append(seq)
+                self._sizes[seq] = os.path.getsize(self._path(seq))
+        self._segments.sort()
+        if not self._segments:
+            return
+
+        # Only the last segment can end in a torn write; cut it at the last good record
+        last = self._segments[-1]
+        offset = 0
+        while (record := self._read_record(last, offset)) is not None:
+            payload, end = record
+            if payload is None and end == self._sizes[last]:
+                # A final record with a bad checksum is a torn write too
+                break
+            offset = end
+        if offset < self._sizes[last]:
+            logger.warning("Lumina spool: truncating torn record in segment %d", last)
+            with open(self._path(last), "r+b") as fh:
+                fh.truncate(offset)
+            self._sizes[last] = offset
+
+        seq, offset = self._load_cursor()
+        if seq in self._sizes:
+            self._read_seq, self._read_offset = seq, min(offset, self._sizes[seq])
+        else:
+            self._read_seq, self._read_offset = self._segments[0], 0
+        for stale in [s for s in self._segments if s < self._read_seq]:
+            self._remove_segment(stale)
+        # New batches always go to a fresh segment
+        self._writer = None
+
+
+def open_spool(directory: str, *, max_bytes: int = 256 * 1024 * 1024) -> SpanSpool:
+    """
+    Open the spool in ``directory``, or in its first free ``worker-N``
+    subdirectory if another process holds it.
+
+    Forked workers, their export helpers and sibling processes sharing a
+    config each end up with a slot of their own, and after a restart the
+    same slots, and the batches left in them, are picked up again.  Slots
+    nobody reopens are drained by :meth:`SpanSpool.adopt_orphans` of the
+    process holding ``directory`` itself.
+    """
+    path = directory
+    slot = 0
+    while True:
+        try:
+            return SpanSpool(
+                path, max_bytes=max_bytes, segment_bytes=min(8 * 1024 * 1024, max_bytes)
+            )
+        except SpoolLockedError:
+            slot += 1
+            path = os.path.join(directory, f"{_WORKER_PREFIX}{slot}")
+
+
+def _lock_directory(directory: str) -> Optional[BinaryIO]:
+    """Take an exclusive, non-blocking lock on ``directory`` for this process."""
+    if fcntl is None:
+        return None
+    handle = open(os.path.join(directory, _LOCK_FILE), "ab")
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        raise SpoolLockedError(f"Spool directory {directory!r} is in use by another process")
+    return handle
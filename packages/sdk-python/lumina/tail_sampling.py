@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.trace import StatusCode
+
+from . import semantic_conventions as SC
+
+# The random fraction uses the high 64 trace-id bits, independent of the
+# low bits the head sampler looks at
+_HIGH_BITS_SHIFT = 64
+# How many recent decisions to remember for spans that end after their root
+_MAX_DECIDED = 10000
+
+
+class _TraceBuffer:
+    __slots__ = ("spans", "first_seen", "error", "cost_usd")
+
+    def __init__(self, now: float) -> None:
+        self.spans: List[ReadableSpan] = []
+        self.first_seen = now
+        self.error = False
+        self.cost_usd = 0.0
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """
+    Buffers each trace until its local root span ends, then keeps or drops it whole.
+
+    A trace is kept, and its spans handed to ``downstream``, if any of these
+    hold:
+
+    * ``keep_errors`` and any span has status ``ERROR``;
+    * the spans' ``lumina.cost_usd`` adds up to at least ``min_cost_usd``;
+    * the root span lasted at least ``min_duration_ms``;
+    * the trace falls in the random ``sample_ratio`` (decided from its id).
+
+    At most ``max_buffered_spans`` are held; beyond that, and for traces
+    whose root has not ended after ``trace_timeout_millis``, the oldest
+    traces are decided early on the spans seen so far (the duration rule
+    cannot apply).  A background thread checks for timed-out traces every
+    ``sweep_interval_millis``, so they go out even when no more spans end.
+    Spans that end after their trace was decided follow that decision.
+    """
+
+    def __init__(
+        self,
+        downstream: SpanProcessor,
+        *,
+        sample_ratio: float = 0.0,
+        keep_errors: bool = True,
+        min_cost_usd: Optional[float] = None,
+        min_duration_ms: Optional[float] = None,
+        max_buffered_spans: int = 10000,
+        trace_timeout_millis: float = 30000,
+        sweep_interval_millis: float = 1000,
+    ) -> None:
+        if not 0.0 <= sample_ratio <= 1.0:
+            raise ValueError(f"sample_ratio must be between 0 and 1, got {sample_ratio!r}")
+        if max_buffered_spans <= 0:
+            raise ValueError("max_buffered_spans must be positive")
+
+        self._downstream = downstream
+        self._ratio_bound = round(sample_ratio * (1 << 64))
+        self._keep_errors = keep_errors
+        self._min_cost_usd = min_cost_usd
+        self._min_duration_ns = None if min_duration_ms is None else min_duration_ms * 1e6
+        self._max_buffered_spans = max_buffered_spans
+        self._trace_timeout = trace_timeout_millis / 1000
+        self._sweep_interval = sweep_interval_millis / 1000
+        self._stop = threading.Event()
+        self._init_state()
+        self._start_sweeper()
+
+    def _init_state(self) -> None:
+        self._lock = threading.Lock()
+        self._traces: "OrderedDict[int, _TraceBuffer]" = OrderedDict()
+        self._decided: "OrderedDict[int, bool]" = OrderedDict()
+        self._buffered_spans = 0
+        self._counts: Dict[str, int] = {"kept": 0, "dropped": 0, "evicted": 0}
+
+    # ------------------------------------------------------------------
+    # SpanProcessor interface
+    # ------------------------------------------------------------------
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self._downstream.on_start(span, parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        parent = span.parent
+        is_root = parent is None or parent.is_remote
+        now = time.monotonic()
+        ready: List[List[ReadableSpan]] = []
+
+        with self._lock:
+            decided = self._decided.get(trace_id)
+            if decided is not None:
+                if decided:
+                    ready.append([span])
+            else:
+                buffer = self._traces.get(trace_id)
+                if buffer is None:
+                    buffer = self._traces[trace_id] = _TraceBuffer(now)
+                buffer.spans.append(span)
+                self._buffered_spans += 1
+                if span.status.status_code is StatusCode.ERROR:
+                    buffer.error = True
+                cost = span.attributes.get(SC.LUMINA_COST_USD) if span.attributes else None
+                if isinstance(cost, (int, float)):
+                    buffer.cost_usd += cost
+
+                if is_root:
+                    del self._traces[trace_id]
+                    self._buffered_spans -= len(buffer.spans)
+                    if self._decide(trace_id, buffer, span):
+                        ready.append(buffer.spans)
+            ready.extend(self._evict(now))
+
+        self._emit(ready)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        with self._lock:
+            ready = self._evict(time.monotonic(), everything=True)
+        self._emit(ready)
+        self._downstream.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        # Unfinished traces stay buffered; only timed-out ones are decided here
+        self._sweep()
+        return self._downstream.force_flush(timeout_millis)
+
+    def reset_after_fork(self) -> None:
+        """
+        Drop traces buffered by the parent process and start a sweep thread,
+        which the child does not inherit; see ``LuminaSpanProcessor``.
+        """
+        self._init_state()
+        if not self._stop.is_set():
+            self._stop = threading.Event()
+            self._start_sweeper()
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, int]:
+        """Traces kept, dropped and evicted before their root ended, and spans buffered."""
+        with self._lock:
+            return {**self._counts, "buffered_spans": self._buffered_spans}
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _start_sweeper(self) -> None:
+        thread = threading.Thread(name="LuminaTailSampling", target=self._sweep_loop, daemon=True)
+        thread.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self._sweep_interval):
+            self._sweep()
+
+    def _sweep(self) -> None:
+        """Decide and hand on the traces that timed out."""
+        with self._lock:
+            ready = self._evict(time.monotonic())
+        self._emit(ready)
+
+    def _emit(self, ready: List[List[ReadableSpan]]) -> None:
+        for spans in ready:
+            for buffered in spans:
+                self._downstream.on_end(buffered)
+
+    def _decide(self, trace_id: int, buffer: _TraceBuffer, root: Optional[ReadableSpan]) -> bool:
+        """Apply the rules and remember the decision. Must hold ``self._lock``."""
+        keep = (
+            (self._keep_errors and buffer.error)
+            or (self._min_cost_usd is not None and buffer.cost_usd >= self._min_cost_usd)
+            or (
+                root is not None
+                and self._min_duration_ns is not None
+                and (root.end_time or 0) - (root.start_time or 0) >= self._min_duration_ns
+            )
+            or (trace_id >> _HIGH_BITS_SHIFT) < self._ratio_bound
+        )
+        self._counts["kept" if keep else "dropped"] += 1
+        self._decided[trace_id] = keep
+        if len(self._decided) > _MAX_DECIDED:
+            self._decided.popitem(last=False)
+        return keep
+
+    def _evict(self, now: float, everything: bool = False) -> List[List[ReadableSpan]]:
+        """Decide traces over the size cap or past the timeout. Must hold ``self._lock``."""
+        ready: List[List[ReadableSpan]] = []
+        deadline = now - self._trace_timeout
+        while self._traces:
+            trace_id, buffer = next(iter(self._traces.items()))
+            if not (
+                everything
+                or self._buffered_spans > self._max_buffered_spans
+                or buffer.first_seen <= deadline
+            ):
+                break
+            del self._traces[trace_id]
+            self._buffered_spans -= len(buffer.spans)
+            self._counts["evicted"] += 1
+            if self._decide(trace_id, buffer, None):
+                ready.append(buffer.spans)
+        return ready
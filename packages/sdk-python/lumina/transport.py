@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import http.client
+import logging
+import select
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Union
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+_Connection = Union[http.client.HTTPConnection, http.client.HTTPSConnection]
+
+# Errors that mean a pooled keep-alive connection was closed by the server
+# before our request reached it; the request is safe to resend once.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+@dataclass
+class RequestTiming:
+    """Wall-clock breakdown of a single export request, in milliseconds."""
+
+    connect_ms: float = 0.0
+    send_ms: float = 0.0
+    server_ms: float = 0.0
+    total_ms: float = 0.0
+    reused_connection: bool = False
+
+
+@dataclass
+class TransportResponse:
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    timing: RequestTiming = field(default_factory=RequestTiming)
+
+
+class HttpTransport:
+    """
+    Keep-alive HTTP/1.1 transport for span export.
+
+    Holds at most ``max_connections`` persistent connections to the endpoint's
+    host.  Connections are reused across exports (most recently used first)
+    and silently replaced when the server has closed them while idle.
+    :meth:`warm_up` opens a connection in the background so the first export
+    does not pay for TCP/TLS setup.
+
+    Every response carries a :class:`RequestTiming` with connect, send and
+    server (time to response) durations; the latest is also kept on
+    :attr:`last_timing`.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout_ms: int = 30000,
+        max_connections: int = 2,
+    ) -> None:
+        if max_connections <= 0:
+            raise ValueError("max_connections must be positive")
+
+        parts = urlsplit(endpoint)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported endpoint scheme: {endpoint!r}")
+
+        self.endpoint = endpoint
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port
+        self._path = parts.path or "/"
+        if parts.query:
+            self._path += "?" + parts.query
+        self._headers = dict(headers or {})
+        self._timeout = timeout_ms / 1000
+
+        self._idle: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._closed = False
+        self.last_timing: Optional[RequestTiming] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def warm_up(self) -> threading.Thread:
+        """Open one connection in a background thread and park it in the pool."""
+        thread = threading.Thread(name="LuminaTransportWarmUp", target=self._warm_up, daemon=True)
+        thread.start()
+        return thread
+
+    def post(
+        self,
+        body: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        """
+        POST ``body`` to the endpoint, reusing a pooled connection when possible.
+
+        ``timeout`` (seconds) can only shorten the transport's own timeout.
+        """
+        if self._closed:
+            raise RuntimeError("Transport is closed")
+
+        request_headers = {**self._headers, **(headers or {})}
+        request_headers["Content-Length"] = str(len(body))
+        if timeout is None or timeout > self._timeout:
+            timeout = self._timeout
+
+        start = time.perf_counter()
+        with self._slots:
+            conn = self._checkout()
+            reused = conn is not None
+            try:
+                if conn is None:
+                    conn, connect_ms = self._connect(timeout)
+                else:
+                    connect_ms = 0.0
+                try:
+                    response, data, timing = self._send(conn, body, request_headers, timeout)
+                except _STALE_ERRORS:
+                    if not reused:
+                        raise
+                    # The server closed the idle connection — reconnect and resend once
+                    conn.close()
+                    conn, connect_ms = self._connect(timeout)
+                    reused = False
+                    response, data, timing = self._send(conn, body, request_headers, timeout)
+            except BaseException:
+                if conn is not None:
+                    conn.close()
+                raise
+
+            timing.connect_ms = connect_ms
+            timing.reused_connection = reused
+            timing.total_ms = (time.perf_counter() - start) * 1000
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+
+        self.last_timing = timing
+        logger.debug(
+            "Export request: HTTP %d, connect %.1f ms, send %.1f ms, server %.1f ms%s",
+            response.status,
+            timing.connect_ms,
+            timing.send_ms,
+            timing.server_ms,
+            " (reused connection)" if reused else "",
+        )
+        return TransportResponse(
+            status=response.status,
+            body=data,
+            headers={k.lower(): v for k, v in response.getheaders()},
+            timing=timing,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Connection pool
+    # ------------------------------------------------------------------
+
+    def _new_connection(self, timeout: float) -> _Connection:
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+
+    def _connect(self, timeout: float) -> tuple[_Connection, float]:
+        conn = self._new_connection(timeout)
+        start = time.perf_counter()
+        conn.connect()
+        # Requests are written in one go; don't let Nagle hold back the tail
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn, (time.perf_counter() - start) * 1000
+
+    def _checkout(self) -> Optional[_Connection]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn = self._idle.pop()
+            if _is_alive(conn):
+                return conn
+            conn.close()
+
+    def _checkin(self, conn: _Connection) -> None:
+        with self._lock:
+            if not self._closed:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _warm_up(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            return
+        try:
+            conn, connect_ms = self._connect(self._timeout)
+        except OSError as exc:
+            logger.debug("Transport warm-up to %s failed: %s", self.endpoint, exc)
+            return
+        finally:
+            self._slots.release()
+        logger.debug("Transport warm-up to %s connected in %.1f ms", self.endpoint, connect_ms)
+        self._checkin(conn)
+
+    # ------------------------------------------------------------------
+    # Request
+    # ------------------------------------------------------------------
+
+    def _send(
+        self, conn: _Connection, body: bytes, headers: Dict[str, str], timeout: float
+    ) -> tuple[http.client.HTTPResponse, bytes, RequestTiming]:
+        timing = RequestTiming()
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        start = time.perf_counter()
+        conn.request("POST", self._path, body=body, headers=headers)
+        sent = time.perf_counter()
+        response = conn.getresponse()
+        # The body must be drained before the connection can be reused
+        data = response.read()
+        timing.send_ms = (sent - start) * 1000
+        timing.server_ms = (time.perf_counter() - sent) * 1000
+        return response, data, timing
+
+
+def _is_alive(conn: _Connection) -> bool:
+    """Whether an idle keep-alive connection is still usable.
+
+    An idle socket should never be readable; if it is, the server has either
+    closed it (EOF) or sent something unexpected, and it must be discarded.
+    """
+    sock = conn.sock
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return False
+    return not readable
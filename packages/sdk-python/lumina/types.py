@@ -1,24 +1,71 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, List, Literal, Optional, TypedDict
+from typing import Any, Dict, List, Literal, Optional, TypedDict, Union
 
 
 @dataclass
 class SdkConfig:
-    endpoint: str = "http://localhost:9411/v1/traces"
+    endpoint: Union[str, List[str]] = "http://localhost:9411/v1/traces"
+    exporter: Literal["otlp_json", "otlp_proto"] = "otlp_json"
+    max_connections: int = 2
+    max_concurrent_exports: int = 2
+    agent_socket: Optional[str] = None
+    helper_process: bool = False
+    compression: Literal["none", "gzip", "zstd"] = "none"
+    compression_level: Optional[int] = None
+    compression_dictionary: Optional[str] = None
     environment: Literal["live", "test"] = "live"
     enabled: bool = True
+    sample_ratio: float = 1.0
+    sampling_rules: Optional[List[Dict[str, Any]]] = None
+    sampling_budget_per_sec: Optional[float] = None
+    cost_sampling_threshold_usd: Optional[float] = None
+    cost_sampling_min_ratio: float = 0.01
+    tail_sampling: bool = False
+    tail_sample_ratio: float = 0.0
+    tail_min_cost_usd: Optional[float] = None
+    tail_min_duration_ms: Optional[int] = None
+    tail_max_buffered_spans: int = 10000
+    tail_trace_timeout_ms: int = 30000
     batch_size: int = 10
+    max_batch_bytes: int = 512 * 1024
+    metadata_max_keys: int = 128
+    metadata_max_depth: int = 4
+    pricing_catalog: Optional[str] = None
+    pricing_reload_interval_ms: int = 30000
+    pricing_tier: Literal["standard", "batch"] = "standard"
+    max_queue_size: int = 2048
+    queue_overflow_policy: Literal["drop_newest", "drop_oldest", "block"] = "drop_newest"
+    queue_block_timeout_ms: int = 100
     batch_interval_ms: int = 5000
     timeout_ms: int = 30000
     max_retries: int = 3
+    retry_budget_ms: Optional[int] = None
+    spool_dir: Optional[str] = None
+    spool_max_bytes: int = 256 * 1024 * 1024
     api_key: Optional[str] = None
     service_name: Optional[str] = None
     customer_id: Optional[str] = None
     flush_interval_ms: Optional[int] = None
 
 
+@dataclass
+class FlushReport:
+    """Outcome of :meth:`Lumina.flush` / :meth:`Lumina.shutdown`.
+
+    ``exported`` and ``dropped`` count spans during the flush; ``dropped``
+    includes both queue overflow and failed exports.  ``pending`` is what is
+    still queued or being exported when the flush returned, which is only
+    non-zero when it ran out of time (``completed`` is then False).
+    """
+
+    completed: bool
+    exported: int = 0
+    dropped: int = 0
+    pending: int = 0
+
+
 class Trace(TypedDict, total=False):
     trace_id: str
     span_id: str
@@ -0,0 +1,143 @@
+"""Spans, exporters and a local OTLP/JSON collector shared by the tests."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import pytest
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import Span, StatusCode, set_span_in_context
+
+SpanFactory = Callable[..., ReadableSpan]
+
+
+class RecordingExporter(SpanExporter):
+    """
+    Keeps every exported batch.  While ``gate`` is cleared, exports wait for
+    it, which stalls the processor's workers; ``delay`` slows each export.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.batches: List[List[str]] = []
+        self.started: List[List[str]] = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.delay = delay
+        self.entered = threading.Semaphore(0)
+        self.active = 0
+        self.max_active = 0
+        self.shut_down = False
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> List[str]:
+        with self._lock:
+            return [name for batch in self.batches for name in batch]
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            self.started.append([span.name for span in spans])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.entered.release()
+        try:
+            self.gate.wait(10)
+            if self.delay:
+                threading.Event().wait(self.delay)
+            with self._lock:
+                self.batches.append([span.name for span in spans])
+        finally:
+            with self._lock:
+                self.active -= 1
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        self.shut_down = True
+
+
+@pytest.fixture
+def exporter() -> RecordingExporter:
+    return RecordingExporter()
+
+
+@pytest.fixture
+def make_span() -> SpanFactory:
+    """Ended spans, optionally children of ``parent`` and with an error status."""
+    tracer = TracerProvider().get_tracer("lumina-tests")
+
+    def make(
+        name: str,
+        *,
+        parent: Optional[Span] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        error: bool = False,
+        end: bool = True,
+        duration_ns: int = 1_000_000,
+    ) -> Any:
+        context = set_span_in_context(parent) if parent is not None else None
+        span = tracer.start_span(name, context=context, attributes=attributes, start_time=1)
+        if error:
+            span.set_status(StatusCode.ERROR, "boom")
+        if end:
+            span.end(end_time=1 + duration_ns)
+        return span
+
+    return make
+
+
+class Collector(ThreadingHTTPServer):
+    """OTLP/JSON endpoint on a free local port that keeps every span it receives."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _CollectorHandler)
+        self.lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/v1/traces"
+
+    def span_names(self) -> List[str]:
+        with self.lock:
+            return [span["name"] for span in self.spans]
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: Collector
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        spans = [
+            span
+            for resource_spans in payload["resourceSpans"]
+            for scope_spans in resource_spans["scopeSpans"]
+            for span in scope_spans["spans"]
+        ]
+        with self.server.lock:
+            self.server.spans.extend(spans)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def collector() -> Iterator[Collector]:
+    server = Collector()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,66 @@
+"""Metadata encoding: native values, JSON for the rest, and the key and depth limits."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from lumina import semantic_conventions as SC
+from lumina.attributes import TRUNCATED, MetadataEncoder
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        ("u1", "u1"),
+        (True, True),
+        (3, 3),
+        (0.5, 0.5),
+        ([1, 2], (1, 2)),
+        (("a", "b"), ("a", "b")),
+        ([], ()),
+    ],
+)
+def test_native_values_pass_through(value: Any, encoded: Any) -> None:
+    result = MetadataEncoder().encode({"key": value})["key"]
+    assert type(result) is type(encoded)
+    assert result == encoded
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        ([1, "a"], '[1,"a"]'),
+        ({"a": {"b": 1}}, '{"a":{"b":1}}'),
+        (None, "null"),
+        ([[1], [2]], "[[1],[2]]"),
+    ],
+)
+def test_other_values_are_json(value: Any, encoded: str) -> None:
+    assert MetadataEncoder().encode({"key": value}) == {"key": encoded}
+
+
+def test_a_changed_dict_is_encoded_afresh() -> None:
+    encoder = MetadataEncoder()
+    metadata = {"flag": 1, "nested": {"a": {"b": 1}}}
+    assert encoder.encode(metadata) == {"flag": 1, "nested": '{"a":{"b":1}}'}
+
+    metadata["flag"] = True
+    metadata["nested"]["a"]["b"] = 2
+    encoded = encoder.encode(metadata)
+    assert encoded["flag"] is True
+    assert encoded["nested"] == '{"a":{"b":2}}'
+
+
+def test_keys_past_the_limit_are_counted() -> None:
+    encoded = MetadataEncoder(max_keys=2).encode({"a": 1, "b": 2, "c": 3, "d": 4})
+    assert encoded == {"a": 1, "b": 2, SC.LUMINA_METADATA_DROPPED_KEYS: 2}
+
+
+def test_containers_past_the_depth_limit_are_truncated() -> None:
+    encoder = MetadataEncoder(max_depth=2)
+    assert encoder.encode({"key": {"a": {"b": 1}}}) == {"key": '{"a":{"b":1}}'}
+    assert encoder.encode({"key": {"a": {"b": {"c": 1}}}}) == {
+        "key": f'{{"a":{{"b":"{TRUNCATED}"}}}}'
+    }
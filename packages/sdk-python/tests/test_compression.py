@@ -0,0 +1,167 @@
+"""Export compression: gzip and zstd round trips, with and without the dictionary."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+
+from lumina import semantic_conventions as SC
+from lumina.compression import (
+    BUILTIN_DICTIONARY,
+    MIN_COMPRESS_BYTES,
+    Compressor,
+    load_dictionary,
+)
+from lumina.exporter import OTLPJsonSpanExporter
+
+zstandard = pytest.importorskip("zstandard")
+
+
+def _body(spans: int) -> bytes:
+    """An OTLP/JSON request of LLM spans, as the exporter writes it."""
+    provider = TracerProvider(resource=Resource.create({"service.name": "chat"}))
+    tracer = provider.get_tracer("lumina-sdk", "0.1.0")
+    batch = []
+    for index in range(spans):
+        span = tracer.start_span(
+            "llm.request",
+            attributes={
+                SC.LLM_SYSTEM: "openai",
+                SC.LLM_RESPONSE_MODEL: "gpt-4o-mini",
+                SC.LLM_RESPONSE_ID: f"chatcmpl-{index}",
+                SC.LLM_USAGE_PROMPT_TOKENS: 100 + index,
+                SC.LLM_USAGE_COMPLETION_TOKENS: 20 + index,
+                SC.LLM_USAGE_TOTAL_TOKENS: 120 + 2 * index,
+                SC.LUMINA_COST_USD: 0.0001 * index,
+            },
+        )
+        span.end()
+        batch.append(span)
+    return OTLPJsonSpanExporter("http://127.0.0.1:9/v1/traces").encode(batch)
+
+
+def _decompressor(dictionary: Optional[bytes] = None) -> Any:
+    if dictionary is None:
+        return zstandard.ZstdDecompressor()
+    return zstandard.ZstdDecompressor(
+        dict_data=zstandard.ZstdCompressionDict(
+            dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+    )
+
+
+# ----------------------------------------------------------------------
+# Round trips
+# ----------------------------------------------------------------------
+
+
+def test_gzip_round_trip() -> None:
+    body = _body(20)
+    compressed = Compressor("gzip").compress(body)
+    assert compressed is not None and len(compressed) < len(body)
+    assert gzip.decompress(compressed) == body
+
+
+def test_zstd_round_trip() -> None:
+    body = _body(20)
+    compressed = Compressor("zstd").compress(body)
+    assert compressed is not None and len(compressed) < len(body)
+    assert _decompressor().decompress(compressed) == body
+
+
+def test_zstd_round_trip_with_the_builtin_dictionary() -> None:
+    body = _body(8)
+    compressed = Compressor("zstd", dictionary=BUILTIN_DICTIONARY).compress(body)
+    assert compressed is not None
+    assert _decompressor(BUILTIN_DICTIONARY).decompress(compressed) == body
+    # A small batch is where the dictionary pays off
+    plain = Compressor("zstd").compress(body)
+    assert plain is not None and len(compressed) < len(plain)
+
+
+def test_a_dictionary_body_needs_the_same_dictionary_to_decompress() -> None:
+    compressed = Compressor("zstd", dictionary=BUILTIN_DICTIONARY).compress(_body(8))
+    with pytest.raises(zstandard.ZstdError):
+        _decompressor().decompress(compressed)
+
+
+def test_dictionary_from_a_file_round_trips(tmp_path: Any) -> None:
+    path = tmp_path / "traces.dict"
+    path.write_bytes(_body(1))
+    dictionary = load_dictionary(str(path))
+    assert dictionary == path.read_bytes()
+
+    body = _body(8)
+    compressed = Compressor("zstd", level=9, dictionary=dictionary).compress(body)
+    assert compressed is not None
+    assert _decompressor(dictionary).decompress(compressed) == body
+
+
+def test_small_bodies_are_left_alone() -> None:
+    assert Compressor("zstd").compress(b"x" * (MIN_COMPRESS_BYTES - 1)) is None
+    assert Compressor("gzip").compress(b"x" * MIN_COMPRESS_BYTES) is not None
+
+
+# ----------------------------------------------------------------------
+# Settings
+# ----------------------------------------------------------------------
+
+
+def test_load_dictionary() -> None:
+    assert load_dictionary(None) is None
+    assert load_dictionary("") is None
+    assert load_dictionary("builtin") is BUILTIN_DICTIONARY
+
+
+def test_dictionary_requires_zstd() -> None:
+    with pytest.raises(ValueError):
+        Compressor("gzip", dictionary=BUILTIN_DICTIONARY)
+    with pytest.raises(ValueError):
+        Compressor("brotli")  # type: ignore[arg-type]
+
+
+# ----------------------------------------------------------------------
+# Exporter
+# ----------------------------------------------------------------------
+
+
+class _Response:
+    status = 200
+
+
+class _Transport:
+    def __init__(self) -> None:
+        self.requests: List[Tuple[bytes, Dict[str, str]]] = []
+
+    def post(self, body: bytes, headers: Dict[str, str], timeout: Optional[float] = None) -> Any:
+        self.requests.append((body, headers))
+        return _Response()
+
+    def close(self) -> None:
+        pass
+
+
+def test_exporter_sends_dictionary_compressed_bodies_with_their_encoding() -> None:
+    exporter = OTLPJsonSpanExporter(
+        "http://127.0.0.1:9/v1/traces",
+        compressor=Compressor("zstd", dictionary=BUILTIN_DICTIONARY),
+    )
+    transport = exporter._transport = _Transport()  # type: ignore[assignment]
+    body = _body(8)
+    try:
+        exporter.export_encoded(body, 8)
+        exporter.export_encoded(b"{}", 0)
+    finally:
+        exporter.shutdown()
+
+    (sent, headers), (small, small_headers) = transport.requests
+    assert headers["Content-Encoding"] == "zstd"
+    assert _decompressor(BUILTIN_DICTIONARY).decompress(sent) == body
+    # The idempotency key is taken from the uncompressed body
+    assert headers["Idempotency-Key"] == hashlib.blake2b(body, digest_size=16).hexdigest()
+    assert small == b"{}" and "Content-Encoding" not in small_headers
@@ -0,0 +1,96 @@
+"""Cost-weighted sampling: what reaches the collector still adds up to the full spend."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from conftest import Collector
+
+from lumina import Lumina
+from lumina import semantic_conventions as SC
+from lumina.sampling import CostWeightedSampler
+
+CALLS = 3000
+
+
+def _response(prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+    return {
+        "object": "chat.completion",
+        "id": "chatcmpl-1",
+        "model": "gpt-4o-mini",
+        "choices": [{"message": {"content": "ok"}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+    }
+
+
+def _attributes(span: Dict[str, Any]) -> Dict[str, Any]:
+    """OTLP/JSON ``attributes`` as a plain dict, the way ingestion reads them."""
+    return {
+        attribute["key"]: next(iter(attribute["value"].values()))
+        for attribute in span.get("attributes", ())
+    }
+
+
+@pytest.fixture
+def lumina(collector: Collector) -> Iterator[Lumina]:
+    instance = Lumina(
+        {
+            "endpoint": collector.url,
+            "service_name": "cost-sampling-test",
+            "cost_sampling_threshold_usd": 0.001,
+            "cost_sampling_min_ratio": 0.01,
+            "batch_interval_ms": 20,
+            "max_queue_size": CALLS,
+        }
+    )
+    yield instance
+    instance.shutdown_sync(timeout=5)
+
+
+def test_weighted_cost_of_kept_spans_matches_the_unsampled_total(
+    lumina: Lumina, collector: Collector
+) -> None:
+    # Span ids come from ``random``; seed it so the kept set is the same every run
+    random.seed(16)
+    rng = random.Random(16)
+    total_cost = 0.0
+    total_tokens = 0
+    for _ in range(CALLS):
+        # Mostly cheap calls (well under the threshold) and a few expensive ones
+        prompt_tokens = rng.choice([rng.randint(10, 400), rng.randint(2000, 8000)])
+        completion_tokens = rng.randint(5, 300)
+        response = _response(prompt_tokens, completion_tokens)
+        lumina.trace_llm(lambda: response, system="openai")
+        total_cost += lumina._pricing.cost("gpt-4o-mini", prompt_tokens, completion_tokens)
+        total_tokens += prompt_tokens + completion_tokens
+    assert lumina.flush_sync(timeout=10).completed
+
+    with collector.lock:
+        kept = [_attributes(span) for span in collector.spans]
+    weights: List[float] = [attributes.get(SC.LUMINA_SAMPLE_WEIGHT, 1.0) for attributes in kept]
+    # Cheap calls were thinned out, and every span that stood in for others says so
+    assert len(kept) < CALLS / 2
+    assert any(weight > 1.0 for weight in weights)
+
+    weighted_cost = sum(
+        attributes[SC.LUMINA_COST_USD] * weight for attributes, weight in zip(kept, weights)
+    )
+    weighted_tokens = sum(
+        int(attributes[SC.LLM_USAGE_TOTAL_TOKENS]) * weight
+        for attributes, weight in zip(kept, weights)
+    )
+    assert weighted_cost == pytest.approx(total_cost, rel=0.05)
+    assert weighted_tokens == pytest.approx(total_tokens, rel=0.1)
+    # Without the weights the cheap calls would simply be missing
+    assert sum(attributes[SC.LUMINA_COST_USD] for attributes in kept) < 0.9 * total_cost
+
+
+def test_weight_is_the_inverse_of_the_keep_probability() -> None:
+    sampler = CostWeightedSampler(0.01, min_ratio=0.05)
+    assert sampler.weight(2**64 - 1, 0.02) == 1.0
+    assert sampler.weight(0, 0.005) == pytest.approx(2.0)
+    assert sampler.weight(2**64 - 1, 0.005) is None
+    # Below min_ratio the weight is capped
+    assert sampler.weight(0, 0.0) == pytest.approx(20.0)
@@ -0,0 +1,283 @@
+"""Traced generators: the span lasts for the whole iteration, however it ends."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+import pytest
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode, get_current_span
+
+from lumina import Lumina
+
+
+def _make(sample_ratio: float) -> Tuple[Lumina, InMemorySpanExporter]:
+    instance = Lumina(
+        {
+            "endpoint": "http://127.0.0.1:9/v1/traces",
+            "service_name": "decorators-test",
+            "sample_ratio": sample_ratio,
+        }
+    )
+    spans = InMemorySpanExporter()
+    instance._provider.add_span_processor(SimpleSpanProcessor(spans))
+    return instance, spans
+
+
+@pytest.fixture
+def lumina() -> Iterator[Tuple[Lumina, InMemorySpanExporter]]:
+    instance, spans = _make(1.0)
+    yield instance, spans
+    instance.shutdown_sync(timeout=1)
+
+
+def _finished(spans: InMemorySpanExporter) -> Dict[str, ReadableSpan]:
+    return {span.name: span for span in spans.get_finished_spans()}
+
+
+# ----------------------------------------------------------------------
+# Generators
+# ----------------------------------------------------------------------
+
+
+def test_span_stays_open_until_the_generator_is_exhausted(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+    seen: List[Any] = []
+
+    @instance.traced(name="stream")
+    def stream() -> Iterator[int]:
+        for index in range(3):
+            seen.append(get_current_span())
+            yield index
+
+    items = stream()
+    assert next(items) == 0
+    assert next(items) == 1
+    assert spans.get_finished_spans() == ()
+    assert list(items) == [2]
+
+    (span,) = spans.get_finished_spans()
+    assert span.name == "stream"
+    assert span.status.status_code is StatusCode.OK
+    assert "duration_ms" in span.attributes
+    # The body ran in the span, every time it was resumed
+    assert all(current.get_span_context() == span.context for current in seen)
+
+
+def test_consumer_spans_are_not_parented_under_the_generator(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+
+    @instance.traced(name="stream")
+    def stream() -> Iterator[int]:
+        instance.trace("produce", lambda span: None)
+        yield 1
+
+    for _ in stream():
+        instance.trace("consume", lambda span: None)
+
+    finished = _finished(spans)
+    assert finished["produce"].parent.span_id == finished["stream"].context.span_id
+    assert finished["consume"].parent is None
+
+
+def test_send_and_return_value_pass_through(lumina: Tuple[Lumina, InMemorySpanExporter]) -> None:
+    instance, _ = lumina
+
+    @instance.traced
+    def echo() -> Any:
+        received = []
+        value = yield "ready"
+        while value is not None:
+            received.append(value)
+            value = yield value * 2
+        return received
+
+    items = echo()
+    assert next(items) == "ready"
+    assert items.send(1) == 2
+    assert items.send(5) == 10
+    with pytest.raises(StopIteration) as stop:
+        items.send(None)
+    assert stop.value.value == [1, 5]
+
+
+def test_early_close_ends_the_span_and_runs_cleanup_inside_it(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+    cleanup: List[Any] = []
+
+    @instance.traced(name="stream")
+    def stream() -> Iterator[int]:
+        try:
+            yield 1
+            yield 2
+        finally:
+            cleanup.append(get_current_span())
+
+    items = stream()
+    assert next(items) == 1
+    items.close()
+
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code is StatusCode.OK
+    assert cleanup[0].get_span_context() == span.context
+
+
+def test_exception_mid_iteration_fails_the_span(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+
+    @instance.traced(name="stream")
+    def stream() -> Iterator[int]:
+        yield 1
+        raise ValueError("boom")
+
+    items = stream()
+    assert next(items) == 1
+    with pytest.raises(ValueError, match="boom"):
+        next(items)
+
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code is StatusCode.ERROR
+    assert span.status.description == "boom"
+    assert [event.name for event in span.events] == ["exception"]
+
+
+def test_exception_thrown_in_can_be_handled_by_the_generator(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+
+    @instance.traced(name="stream")
+    def stream() -> Iterator[str]:
+        try:
+            yield "first"
+        except KeyError:
+            yield "recovered"
+
+    items = stream()
+    assert next(items) == "first"
+    assert items.throw(KeyError("retry")) == "recovered"
+    assert spans.get_finished_spans() == ()
+    assert list(items) == []
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code is StatusCode.OK
+
+
+def test_sampled_out_generator_errors_are_still_exported() -> None:
+    instance, spans = _make(0.0)
+    try:
+
+        @instance.traced(name="stream")
+        def stream() -> Iterator[int]:
+            yield 1
+            raise ValueError("boom")
+
+        items = stream()
+        assert next(items) == 1
+        assert spans.get_finished_spans() == ()
+        with pytest.raises(ValueError):
+            next(items)
+
+        (span,) = spans.get_finished_spans()
+        assert span.name == "stream"
+        assert span.status.status_code is StatusCode.ERROR
+    finally:
+        instance.shutdown_sync(timeout=1)
+
+
+def test_traced_llm_rejects_generators(lumina: Tuple[Lumina, InMemorySpanExporter]) -> None:
+    instance, _ = lumina
+
+    def stream() -> Iterator[int]:
+        yield 1
+
+    async def astream() -> AsyncIterator[int]:
+        yield 1
+
+    with pytest.raises(TypeError):
+        instance.traced_llm(stream)
+    with pytest.raises(TypeError):
+        instance.traced_llm(astream)
+
+
+# ----------------------------------------------------------------------
+# Async generators
+# ----------------------------------------------------------------------
+
+
+def test_async_generator_span_covers_the_iteration(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+
+    @instance.traced(name="astream")
+    async def astream() -> AsyncIterator[int]:
+        for index in range(3):
+            await asyncio.sleep(0)
+            yield index
+
+    async def main() -> None:
+        items = astream()
+        assert await items.__anext__() == 0
+        assert spans.get_finished_spans() == ()
+        assert [item async for item in items] == [1, 2]
+
+    asyncio.run(main())
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code is StatusCode.OK
+    assert "duration_ms" in span.attributes
+
+
+def test_async_generator_early_close(lumina: Tuple[Lumina, InMemorySpanExporter]) -> None:
+    instance, spans = lumina
+    cleanup: List[Any] = []
+
+    @instance.traced(name="astream")
+    async def astream() -> AsyncIterator[int]:
+        try:
+            yield 1
+            yield 2
+        finally:
+            cleanup.append(get_current_span())
+
+    async def main() -> None:
+        items = astream()
+        assert await items.__anext__() == 1
+        await items.aclose()
+
+    asyncio.run(main())
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code is StatusCode.OK
+    assert cleanup[0].get_span_context() == span.context
+
+
+def test_async_generator_exception_mid_iteration(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+
+    @instance.traced(name="astream")
+    async def astream() -> AsyncIterator[int]:
+        yield 1
+        raise ValueError("boom")
+
+    async def main() -> None:
+        items = astream()
+        assert await items.__anext__() == 1
+        with pytest.raises(ValueError, match="boom"):
+            await items.__anext__()
+
+    asyncio.run(main())
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code is StatusCode.ERROR
+    assert [event.name for event in span.events] == ["exception"]
@@ -0,0 +1,100 @@
+"""Disabled SDK: ``Lumina(...)`` turns into a no-op that builds no pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from opentelemetry.trace import INVALID_SPAN
+
+import lumina
+from lumina import Lumina, get_lumina
+from lumina import lumina as lumina_module
+from lumina.lumina import _DisabledLumina
+
+CONFIG = {"endpoint": "http://127.0.0.1:9/v1/traces", "service_name": "disabled-test"}
+
+
+@pytest.fixture(autouse=True)
+def singleton(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(lumina_module, "_instance", None)
+
+
+def test_disabled_config_returns_the_no_op() -> None:
+    threads = threading.active_count()
+    instance = Lumina({**CONFIG, "enabled": False})
+
+    assert type(instance) is _DisabledLumina
+    assert isinstance(instance, Lumina)
+    assert not instance.is_enabled()
+    assert get_lumina() is instance
+    # No provider, processor or worker threads
+    assert not hasattr(instance, "_provider")
+    assert threading.active_count() == threads
+
+
+@pytest.mark.parametrize("value", ["false", "0", "no", "FALSE"])
+def test_lumina_enabled_environment_variable(monkeypatch: pytest.MonkeyPatch, value: str) -> None:
+    monkeypatch.setenv("LUMINA_ENABLED", value)
+    assert type(Lumina(CONFIG)) is _DisabledLumina
+
+
+def test_subclasses_are_not_replaced() -> None:
+    class Custom(Lumina):
+        pass
+
+    instance = Custom({**CONFIG, "enabled": False})
+    try:
+        assert type(instance) is Custom
+    finally:
+        instance.shutdown_sync(timeout=1)
+
+
+def test_traced_code_runs_untouched() -> None:
+    instance = Lumina({**CONFIG, "enabled": False})
+
+    def answer() -> int:
+        return 42
+
+    spans: Any = []
+    assert instance.trace("work", lambda span: spans.append(span) or "done") == "done"
+    assert spans == [INVALID_SPAN]
+    assert instance.trace_llm(answer, system="openai") == 42
+    # The decorators hand back the function itself, with or without arguments
+    assert instance.traced(answer) is answer
+    assert instance.traced(name="answer")(answer) is answer
+    assert instance.traced_llm(answer) is answer
+    assert instance.traced_llm(system="openai")(answer) is answer
+
+
+def test_flush_and_shutdown_complete_at_once() -> None:
+    instance = Lumina({**CONFIG, "enabled": False})
+
+    assert instance.flush_sync().completed
+    assert instance.shutdown_sync().completed
+    assert asyncio.run(instance.flush()).completed
+    assert asyncio.run(instance.shutdown()).completed
+    assert instance.get_drop_counts() == {}
+
+
+def test_disabled_sdk_does_not_import_the_otel_sdk() -> None:
+    script = (
+        "import sys\n"
+        "from lumina import init_lumina\n"
+        "init_lumina({'enabled': False}).trace('work', lambda span: None)\n"
+        "loaded = [name for name in sys.modules if name.startswith('opentelemetry.sdk')]\n"
+        "assert not loaded, loaded\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(lumina.__file__).parents[1],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,186 @@
+"""Endpoint failover: weighted round-robin, ejection and re-admission after cooldown."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List, Tuple, Union
+
+import pytest
+
+from lumina import endpoints
+from lumina.endpoints import EndpointPool
+from lumina.transport import RequestTiming, TransportResponse
+
+A, B, C = "http://a/v1/traces", "http://b/v1/traces", "http://c/v1/traces"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Replicas:
+    """
+    Stands in for :class:`~lumina.transport.HttpTransport`: each URL answers
+    with its configured status (or raises its error) after a fixed latency.
+    """
+
+    def __init__(self) -> None:
+        self.answers: Dict[str, Tuple[Union[int, BaseException], float]] = {}
+        self.calls: List[str] = []
+
+    def transport(self, url: str, **kwargs: Any) -> Any:
+        replicas = self
+
+        class Transport:
+            endpoint = url
+
+            def post(self, body: bytes, headers: Any = None, *, timeout: float) -> Any:
+                replicas.calls.append(url)
+                answer, latency_ms = replicas.answers[url]
+                if isinstance(answer, BaseException):
+                    raise answer
+                return TransportResponse(answer, b"", {}, RequestTiming(total_ms=latency_ms))
+
+            def warm_up(self) -> None:
+                pass
+
+            def close(self) -> None:
+                pass
+
+        return Transport()
+
+
+@pytest.fixture
+def replicas(monkeypatch: Any) -> _Replicas:
+    replicas = _Replicas()
+    monkeypatch.setattr(endpoints, "HttpTransport", replicas.transport)
+    return replicas
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+def _pool(clock: _Clock, *urls: str) -> EndpointPool:
+    return EndpointPool(list(urls), cooldown_ms=1000, max_cooldown_ms=4000, clock=clock)
+
+
+def _first_choices(pool: EndpointPool, replicas: _Replicas, count: int) -> List[str]:
+    chosen = []
+    for _ in range(count):
+        del replicas.calls[:]
+        assert pool.post(b"batch").status == 200
+        chosen.append(replicas.calls[0])
+    return chosen
+
+
+def _healthy(pool: EndpointPool) -> Dict[str, bool]:
+    return {entry["endpoint"]: entry["healthy"] for entry in pool.stats()}
+
+
+# ----------------------------------------------------------------------
+# Weighted round-robin
+# ----------------------------------------------------------------------
+
+
+def test_requests_are_spread_in_inverse_proportion_to_latency(
+    replicas: _Replicas, clock: _Clock
+) -> None:
+    replicas.answers = {A: (200, 10.0), B: (200, 20.0), C: (200, 40.0)}
+    pool = _pool(clock, A, B, C)
+    # Every endpoint is probed while its latency is unknown
+    assert set(_first_choices(pool, replicas, 3)) == {A, B, C}
+
+    counts = Counter(_first_choices(pool, replicas, 70))
+    assert counts[A] == pytest.approx(40, abs=1)
+    assert counts[B] == pytest.approx(20, abs=1)
+    assert counts[C] == pytest.approx(10, abs=1)
+
+
+def test_round_robin_is_smooth(replicas: _Replicas, clock: _Clock) -> None:
+    replicas.answers = {A: (200, 10.0), B: (200, 10.0)}
+    pool = _pool(clock, A, B)
+    chosen = _first_choices(pool, replicas, 10)
+    # Equal latencies alternate instead of sending runs to one endpoint
+    assert all(first != second for first, second in zip(chosen, chosen[1:]))
+
+
+# ----------------------------------------------------------------------
+# Ejection and re-admission
+# ----------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "failure", [503, 429, ConnectionRefusedError("refused"), TimeoutError("timed out")]
+)
+def test_failing_endpoint_is_ejected_and_the_request_fails_over(
+    replicas: _Replicas, clock: _Clock, failure: Union[int, BaseException]
+) -> None:
+    replicas.answers = {A: (failure, 1.0), B: (200, 10.0)}
+    pool = _pool(clock, A, B)
+
+    del replicas.calls[:]
+    assert pool.post(b"batch").status == 200
+    assert replicas.calls == [A, B]
+    assert _healthy(pool) == {A: False, B: True}
+
+    # While A cools down, only B is tried
+    clock.now += 0.9
+    assert _first_choices(pool, replicas, 5) == [B] * 5
+
+
+def test_endpoint_is_readmitted_after_its_cooldown(replicas: _Replicas, clock: _Clock) -> None:
+    replicas.answers = {A: (503, 1.0), B: (200, 10.0)}
+    pool = _pool(clock, A, B)
+    pool.post(b"batch")
+
+    replicas.answers[A] = (200, 10.0)
+    clock.now += 1.0
+    assert _healthy(pool) == {A: True, B: True}
+    assert A in _first_choices(pool, replicas, 2)
+    assert [entry["failures"] for entry in pool.stats()] == [0, 0]
+
+
+def test_cooldown_doubles_up_to_its_maximum(replicas: _Replicas, clock: _Clock) -> None:
+    replicas.answers = {A: (503, 1.0)}
+    pool = _pool(clock, A)
+
+    for cooldown in (1.0, 2.0, 4.0, 4.0):
+        pool.post(b"batch")
+        clock.now += cooldown - 0.01
+        assert not _healthy(pool)[A]
+        clock.now += 0.01
+        assert _healthy(pool)[A]
+
+
+def test_nonretryable_status_is_returned_without_failover(
+    replicas: _Replicas, clock: _Clock
+) -> None:
+    replicas.answers = {A: (400, 1.0), B: (200, 10.0)}
+    pool = _pool(clock, A, B)
+    del replicas.calls[:]
+    assert pool.post(b"batch").status == 400
+    assert replicas.calls == [A]
+    assert _healthy(pool) == {A: True, B: True}
+
+
+def test_endpoints_in_cooldown_are_tried_when_all_are_down(
+    replicas: _Replicas, clock: _Clock
+) -> None:
+    replicas.answers = {A: (503, 1.0), B: (ConnectionRefusedError("refused"), 1.0)}
+    pool = _pool(clock, A, B)
+    # The last response is returned when every endpoint failed
+    assert pool.post(b"batch").status == 503
+    assert _healthy(pool) == {A: False, B: False}
+
+    # Both cooling down: the one back soonest is tried first
+    replicas.answers[A] = (200, 10.0)
+    del replicas.calls[:]
+    clock.now += 0.5
+    assert pool.post(b"batch").status == 200
+    assert replicas.calls == [A]
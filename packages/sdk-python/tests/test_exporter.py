@@ -0,0 +1,226 @@
+"""OTLP/JSON encoding: the request shape the ingestion service's parser reads."""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+from typing import Any, Dict, List, Sequence
+
+import pytest
+from conftest import Collector
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.trace import SpanKind, StatusCode, set_span_in_context
+
+from lumina.exporter import OTLPJsonEncoder, OTLPJsonSpanExporter, encode_span
+
+
+def _parse_value(value: Dict[str, Any]) -> Any:
+    """``parseAnyValue`` from services/ingestion/src/parsers/otlp-parser.ts."""
+    if "stringValue" in value:
+        return value["stringValue"]
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "intValue" in value:
+        return int(value["intValue"], 10)
+    if "doubleValue" in value:
+        return value["doubleValue"]
+    if "arrayValue" in value:
+        return [_parse_value(item) for item in value["arrayValue"]["values"]]
+    if "bytesValue" in value:
+        return value["bytesValue"]
+    return None
+
+
+def _parse_attributes(attributes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {attribute["key"]: _parse_value(attribute["value"]) for attribute in attributes}
+
+
+def _parse(body: bytes) -> List[Dict[str, Any]]:
+    """``parseOTLPTraces``: spans with resource and span attributes merged."""
+    spans = []
+    for resource_spans in json.loads(body)["resourceSpans"]:
+        resource = _parse_attributes(resource_spans.get("resource", {}).get("attributes", []))
+        for scope_spans in resource_spans["scopeSpans"]:
+            for span in scope_spans["spans"]:
+                attributes = {**resource, **_parse_attributes(span.get("attributes", []))}
+                spans.append({**span, "attributes": attributes, "scope": scope_spans["scope"]})
+    return spans
+
+
+def _encode(spans: Sequence[ReadableSpan]) -> bytes:
+    buf = bytearray()
+    OTLPJsonEncoder().encode(spans, buf)
+    return bytes(buf)
+
+
+@pytest.fixture
+def provider() -> TracerProvider:
+    return TracerProvider(resource=Resource.create({"service.name": "chat", "deployment": "eu"}))
+
+
+# ----------------------------------------------------------------------
+# Span shape
+# ----------------------------------------------------------------------
+
+
+def test_span_fields_round_trip_through_the_parser(provider: TracerProvider) -> None:
+    tracer = provider.get_tracer("lumina", "1.2.3")
+    root = tracer.start_span("request", kind=SpanKind.SERVER, start_time=1_000)
+    child = tracer.start_span(
+        "llm.request",
+        context=set_span_in_context(root),
+        kind=SpanKind.CLIENT,
+        start_time=2_000,
+        attributes={
+            "gen_ai.system": "openai",
+            "gen_ai.usage.total_tokens": 2**40,
+            "lumina.cost_usd": 0.0125,
+            "lumina.cached": False,
+            "tags": ("a", "b"),
+            "ids": [1, 2],
+            "service.name": "override",
+        },
+    )
+    expected = {
+        "service.name": "override",
+        "gen_ai.system": "openai",
+        "gen_ai.usage.total_tokens": 2**40,
+        "lumina.cost_usd": 0.0125,
+        "lumina.cached": False,
+        "tags": ["a", "b"],
+        "ids": [1, 2],
+    }
+    child.add_event("retry", {"attempt": 2}, timestamp=2_500)
+    child.set_status(StatusCode.ERROR, "rate limited")
+    child.end(end_time=3_000)
+    root.end(end_time=4_000)
+
+    parsed = {span["name"]: span for span in _parse(_encode([child, root]))}
+    llm, request = parsed["llm.request"], parsed["request"]
+
+    assert re.fullmatch("[0-9a-f]{32}", llm["traceId"])
+    assert re.fullmatch("[0-9a-f]{16}", llm["spanId"])
+    assert llm["traceId"] == request["traceId"]
+    assert llm["parentSpanId"] == request["spanId"]
+    assert "parentSpanId" not in request
+    # OTLP enums: CLIENT is 3 and SERVER 2, ERROR is 2 and UNSET 0
+    assert (llm["kind"], request["kind"]) == (3, 2)
+    assert llm["status"] == {"code": 2, "message": "rate limited"}
+    assert request["status"] == {"code": 0}
+    # int64 fields are strings
+    assert (llm["startTimeUnixNano"], llm["endTimeUnixNano"]) == ("2000", "3000")
+    assert llm["events"] == [
+        {
+            "timeUnixNano": "2500",
+            "name": "retry",
+            "attributes": [{"key": "attempt", "value": {"intValue": "2"}}],
+        }
+    ]
+    assert llm["scope"] == {"name": "lumina", "version": "1.2.3"}
+
+    # Span attributes win over the resource's, as in the parser
+    assert {key: llm["attributes"][key] for key in expected} == expected
+    assert llm["attributes"]["deployment"] == "eu"
+    assert request["attributes"]["service.name"] == "chat"
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        ("text", {"stringValue": "text"}),
+        (True, {"boolValue": True}),
+        (7, {"intValue": "7"}),
+        (-(2**63), {"intValue": str(-(2**63))}),
+        (0.5, {"doubleValue": 0.5}),
+        ((1.5, 2.5), {"arrayValue": {"values": [{"doubleValue": 1.5}, {"doubleValue": 2.5}]}}),
+        (b"\x00\xff", {"bytesValue": base64.b64encode(b"\x00\xff").decode()}),
+    ],
+)
+def test_attribute_values(value: Any, encoded: Dict[str, Any]) -> None:
+    span = TracerProvider().get_tracer("t").start_span("s", attributes={"v": value})
+    span.end()
+    assert encode_span(span)["attributes"] == [{"key": "v", "value": encoded}]
+
+
+# ----------------------------------------------------------------------
+# Request layout
+# ----------------------------------------------------------------------
+
+
+def test_spans_are_grouped_by_resource_and_scope(provider: TracerProvider) -> None:
+    other = TracerProvider(resource=Resource.create({"service.name": "billing"}))
+    spans = []
+    for tracer_provider, scope, name in [
+        (provider, "lumina", "a"),
+        (other, "lumina", "b"),
+        (provider, "httpx", "c"),
+        (provider, "lumina", "d"),
+    ]:
+        span = tracer_provider.get_tracer(scope).start_span(name)
+        span.end()
+        spans.append(span)
+
+    request = json.loads(_encode(spans))
+    layout = [
+        (
+            _parse_attributes(resource_spans["resource"]["attributes"])["service.name"],
+            [
+                (scope_spans["scope"]["name"], [span["name"] for span in scope_spans["spans"]])
+                for scope_spans in resource_spans["scopeSpans"]
+            ],
+        )
+        for resource_spans in request["resourceSpans"]
+    ]
+    assert layout == [
+        ("chat", [("lumina", ["a", "d"]), ("httpx", ["c"])]),
+        ("billing", [("lumina", ["b"])]),
+    ]
+    # The scope has no version key when the tracer has none
+    assert request["resourceSpans"][0]["scopeSpans"][0]["scope"] == {"name": "lumina"}
+
+
+def test_streamed_request_matches_the_plain_encoding(provider: TracerProvider) -> None:
+    tracer = provider.get_tracer("lumina")
+    spans = []
+    for index in range(3):
+        span = tracer.start_span(f"span-{index}", attributes={"index": index, "text": 'é\n"'})
+        span.end()
+        spans.append(span)
+
+    assert json.loads(_encode(spans)) == {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": key, "value": {"stringValue": value}}
+                        for key, value in provider.resource.attributes.items()
+                    ]
+                },
+                "scopeSpans": [
+                    {"scope": {"name": "lumina"}, "spans": [encode_span(span) for span in spans]}
+                ],
+            }
+        ]
+    }
+
+
+def test_export_reaches_a_collector_and_reuses_its_buffer(
+    provider: TracerProvider, collector: Collector
+) -> None:
+    tracer = provider.get_tracer("lumina")
+    first, second = tracer.start_span("first"), tracer.start_span("second")
+    first.end()
+    second.end()
+    exporter = OTLPJsonSpanExporter(collector.url)
+    try:
+        # The thread's buffer is emptied between batches
+        assert _parse(exporter.encode([first]))[0]["name"] == "first"
+        assert [span["name"] for span in _parse(exporter.encode([second]))] == ["second"]
+
+        assert exporter.export([first, second]) is SpanExportResult.SUCCESS
+        assert collector.span_names() == ["first", "second"]
+    finally:
+        exporter.shutdown()
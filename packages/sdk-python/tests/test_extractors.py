@@ -0,0 +1,251 @@
+"""Response extractors: the built-in providers, registration, precedence and fallbacks."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace as NS
+from typing import Any, Dict
+
+import pytest
+
+from lumina import LlmResponse, register_extractor
+from lumina import extractors
+from lumina.extractors import extract_response
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every test starts from the stock registry and leaves it as it was."""
+    monkeypatch.setattr(extractors, "_REGISTERED", {})
+    monkeypatch.setattr(extractors, "_BY_TYPE", {})
+    monkeypatch.setattr(extractors, "_DICT_EXTRACTORS", dict(extractors._DICT_EXTRACTORS))
+
+
+def _provider_class(module: str, name: str) -> type:
+    """A stand-in for a provider SDK class, matched by ``module.QualName``."""
+
+    class Stub:
+        def __init__(self, **fields: Any) -> None:
+            self.__dict__.update(fields)
+
+    Stub.__module__ = module
+    Stub.__qualname__ = Stub.__name__ = name
+    return Stub
+
+
+ChatCompletion = _provider_class("openai.types.chat.chat_completion", "ChatCompletion")
+Response = _provider_class("openai.types.responses.response", "Response")
+Message = _provider_class("anthropic.types.message", "Message")
+BetaMessage = _provider_class("anthropic.types.beta.beta_message", "BetaMessage")
+
+
+def _fixed(model: str) -> Any:
+    return lambda result: LlmResponse(model, "", "", 1, 2, 3)
+
+
+# ----------------------------------------------------------------------
+# Built-in providers
+# ----------------------------------------------------------------------
+
+
+def test_openai_chat_completion() -> None:
+    result = ChatCompletion(
+        model="gpt-4o",
+        id="chatcmpl-1",
+        choices=[NS(message=NS(content="hi"))],
+        usage=NS(
+            prompt_tokens=120,
+            completion_tokens=30,
+            total_tokens=150,
+            prompt_tokens_details=NS(cached_tokens=100),
+        ),
+    )
+    assert extract_response(result) == LlmResponse(
+        "gpt-4o", "chatcmpl-1", "hi", 120, 30, 150, cache_read_tokens=100
+    )
+
+
+def test_openai_chat_completion_without_usage_or_choices() -> None:
+    result = ChatCompletion(model="gpt-4o", id="chatcmpl-1", choices=[], usage=None)
+    assert extract_response(result) == LlmResponse("gpt-4o", "chatcmpl-1", "", None, None, None)
+
+
+def test_openai_responses_api() -> None:
+    result = Response(
+        model="gpt-4.1",
+        id="resp-1",
+        output_text="done",
+        usage=NS(
+            input_tokens=50,
+            output_tokens=10,
+            total_tokens=0,
+            input_tokens_details=NS(cached_tokens=20),
+        ),
+    )
+    # A missing total is the sum of the two
+    assert extract_response(result) == LlmResponse(
+        "gpt-4.1", "resp-1", "done", 50, 10, 60, cache_read_tokens=20
+    )
+
+
+@pytest.mark.parametrize("cls", [Message, BetaMessage])
+def test_anthropic_message_adds_cache_tokens_to_the_prompt(cls: type) -> None:
+    result = cls(
+        model="claude-sonnet-4",
+        id="msg-1",
+        content=[NS(type="tool_use"), NS(type="text", text="answer")],
+        usage=NS(
+            input_tokens=10,
+            output_tokens=5,
+            cache_read_input_tokens=200,
+            cache_creation_input_tokens=40,
+        ),
+    )
+    assert extract_response(result) == LlmResponse(
+        "claude-sonnet-4", "msg-1", "answer", 250, 5, 255, 200, 40
+    )
+
+
+def test_dict_responses_are_picked_by_their_object_or_type_field() -> None:
+    chat = {
+        "object": "chat.completion",
+        "id": "chatcmpl-1",
+        "model": "gpt-4o-mini",
+        "choices": [{"message": {"content": "hi"}}],
+        "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10},
+    }
+    response = {
+        "object": "response",
+        "model": "gpt-4.1",
+        "output": [
+            {"type": "reasoning"},
+            {"type": "message", "content": [{"type": "output_text", "text": "a"}]},
+            {"type": "message", "content": [{"type": "output_text", "text": "b"}]},
+        ],
+        "usage": {"input_tokens": 4, "output_tokens": 2},
+    }
+    message = {
+        "type": "message",
+        "model": "claude-haiku",
+        "content": [{"type": "text", "text": "yo"}],
+        "usage": {"input_tokens": 5, "output_tokens": 1, "cache_read_input_tokens": 10},
+    }
+    assert extract_response(chat) == LlmResponse("gpt-4o-mini", "chatcmpl-1", "hi", 7, 3, 10)
+    assert extract_response(response) == LlmResponse("gpt-4.1", "", "ab", 4, 2, 6)
+    assert extract_response(message) == LlmResponse(
+        "claude-haiku", "", "yo", 15, 1, 16, cache_read_tokens=10
+    )
+
+
+# ----------------------------------------------------------------------
+# Registration and precedence
+# ----------------------------------------------------------------------
+
+
+def test_registered_class_and_its_subclasses_use_the_extractor() -> None:
+    class Reply:
+        pass
+
+    class StreamedReply(Reply):
+        pass
+
+    register_extractor(Reply, _fixed("custom"))
+    assert extract_response(Reply()).model == "custom"
+    assert extract_response(StreamedReply()).model == "custom"
+
+
+def test_registration_overrides_a_built_in_provider() -> None:
+    result = ChatCompletion(model="gpt-4o", id="", choices=[], usage=None)
+    assert extract_response(result).model == "gpt-4o"
+
+    # The choice made for the type above is dropped on registration
+    register_extractor(ChatCompletion, _fixed("override"))
+    assert extract_response(result).model == "override"
+
+
+def test_the_closest_class_in_the_mro_wins() -> None:
+    class Wrapped(ChatCompletion):  # type: ignore[misc, valid-type]
+        pass
+
+    class Special(Wrapped):
+        pass
+
+    result = Special(model="gpt-4o", id="", choices=[], usage=None)
+    # A subclass of a provider class falls back to the provider's extractor
+    assert extract_response(result).model == "gpt-4o"
+    register_extractor(Wrapped, _fixed("wrapped"))
+    assert extract_response(result).model == "wrapped"
+    register_extractor(Special, _fixed("special"))
+    assert extract_response(result).model == "special"
+
+
+def test_registered_dict_type() -> None:
+    register_extractor(
+        "completion.custom", lambda result: LlmResponse(result["m"], "", "", 1, 1, 2)
+    )
+    assert extract_response({"object": "completion.custom", "m": "mine"}).model == "mine"
+    assert extract_response({"type": "completion.custom", "m": "also"}).model == "also"
+
+
+def test_registered_dict_type_replaces_a_built_in_one() -> None:
+    register_extractor("message", _fixed("replaced"))
+    assert extract_response({"type": "message", "content": "x"}).model == "replaced"
+
+
+def test_the_extractor_is_resolved_once_per_type(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: Dict[type, int] = {}
+    resolve = extractors._resolve
+
+    def counting(cls: type) -> Any:
+        calls[cls] = calls.get(cls, 0) + 1
+        return resolve(cls)
+
+    monkeypatch.setattr(extractors, "_resolve", counting)
+    for _ in range(3):
+        extract_response(ChatCompletion(model="m", id="", choices=[], usage=None))
+        extract_response({"object": "chat.completion"})
+    assert calls == {ChatCompletion: 1, dict: 1}
+
+
+# ----------------------------------------------------------------------
+# Unknown shapes
+# ----------------------------------------------------------------------
+
+
+def test_none_is_empty() -> None:
+    assert extract_response(None) == LlmResponse("", "", "", None, None, None)
+
+
+def test_unknown_objects_are_probed_for_openai_names() -> None:
+    result = NS(
+        model="local-llm",
+        id="r-1",
+        choices=[NS(message=NS(content="probe"))],
+        usage=NS(prompt_tokens=3, completion_tokens=4, total_tokens=None),
+    )
+    assert extract_response(result) == LlmResponse("local-llm", "r-1", "probe", 3, 4, 7)
+
+
+def test_unknown_objects_are_probed_for_anthropic_names() -> None:
+    result = NS(
+        model="proxy",
+        content=[NS(type="text", text="probe")],
+        usage=NS(input_tokens=3, output_tokens=4, cache_creation_input_tokens=5),
+    )
+    assert extract_response(result) == LlmResponse(
+        "proxy", "", "probe", 8, 4, 12, cache_write_tokens=5
+    )
+
+
+def test_unknown_objects_without_usage_or_text() -> None:
+    assert extract_response("plain text") == LlmResponse("", "", "", None, None, None)
+    assert extract_response(NS(content="text only")) == LlmResponse(
+        "", "", "text only", None, None, None
+    )
+
+
+def test_untyped_dicts_fall_back_on_their_shape() -> None:
+    chat = {"choices": [{"message": {"content": "c"}}], "usage": {"prompt_tokens": 2}}
+    message = {"content": [{"type": "text", "text": "m"}], "usage": {"output_tokens": 2}}
+    assert extract_response(chat) == LlmResponse("", "", "c", 2, 0, 2)
+    assert extract_response(message) == LlmResponse("", "", "m", 0, 2, 2)
+    assert extract_response({"object": "unheard.of"}) == LlmResponse("", "", "", None, None, None)
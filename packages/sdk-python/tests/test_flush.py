@@ -0,0 +1,161 @@
+"""Flush and shutdown: off the event loop, with concurrent calls merged into one."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Callable, Iterator, List, Optional
+
+import pytest
+from conftest import Collector
+
+from lumina import FlushReport, Lumina
+
+
+class _GatedFlush:
+    """Stands in for the provider's ``force_flush``; each call waits for ``gate``."""
+
+    def __init__(self, original: Callable[[int], bool]) -> None:
+        self.original = original
+        self.calls = 0
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.error: Optional[Exception] = None
+
+    def __call__(self, timeout_millis: int = 30000) -> bool:
+        self.calls += 1
+        self.entered.set()
+        assert self.gate.wait(10)
+        if self.error is not None:
+            raise self.error
+        return self.original(timeout_millis)
+
+
+@pytest.fixture
+def lumina(collector: Collector) -> Iterator[Lumina]:
+    instance = Lumina(
+        {"endpoint": collector.url, "service_name": "flush-test", "batch_interval_ms": 60_000}
+    )
+    yield instance
+    instance.shutdown_sync(timeout=5)
+
+
+@pytest.fixture
+def gated(lumina: Lumina, monkeypatch: pytest.MonkeyPatch) -> _GatedFlush:
+    flush = _GatedFlush(lumina._provider.force_flush)
+    monkeypatch.setattr(lumina._provider, "force_flush", flush)
+    return flush
+
+
+def _from_threads(count: int, target: Callable[[], Any]) -> List[Any]:
+    """Call ``target`` once on each of ``count`` threads and collect the results."""
+    results: List[Any] = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+# ----------------------------------------------------------------------
+# Merging
+# ----------------------------------------------------------------------
+
+
+def test_concurrent_flushes_share_one_flush(lumina: Lumina, gated: _GatedFlush) -> None:
+    # Every call made while the first flush is running joins it
+    futures = _from_threads(8, lambda: lumina._start_flush(None))
+    assert len(futures) == 8
+    assert all(future is futures[0] for future in futures)
+    gated.gate.set()
+
+    reports = [future.result(5) for future in futures]
+    assert gated.calls == 1
+    assert all(report is reports[0] for report in reports)
+
+
+def test_a_flush_after_the_last_one_finished_starts_anew(
+    lumina: Lumina, gated: _GatedFlush
+) -> None:
+    gated.gate.set()
+    first = lumina.flush_sync()
+    second = lumina.flush_sync()
+    assert gated.calls == 2
+    assert first is not second
+
+
+def test_async_flushes_are_merged_without_blocking_the_loop(
+    lumina: Lumina, gated: _GatedFlush
+) -> None:
+    async def main() -> List[FlushReport]:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while not gated.entered.is_set() or ticks < 3:
+                ticks += 1
+                await asyncio.sleep(0.01)
+            gated.gate.set()
+
+        *reports, _ = await asyncio.gather(lumina.flush(), lumina.flush(), lumina.flush(), tick())
+        assert ticks >= 3
+        return reports
+
+    reports = asyncio.run(main())
+    assert gated.calls == 1
+    assert reports[0] is reports[1] is reports[2]
+
+
+def test_a_failed_flush_reaches_every_caller_and_is_not_reused(
+    lumina: Lumina, gated: _GatedFlush
+) -> None:
+    gated.error = RuntimeError("exporter broke")
+    first = lumina._start_flush(None)
+    assert gated.entered.wait(5)
+    second = lumina._start_flush(None)
+    assert second is first
+    gated.gate.set()
+
+    for future in (first, second):
+        with pytest.raises(RuntimeError, match="exporter broke"):
+            future.result(5)
+
+    gated.error = None
+    assert lumina.flush_sync().completed
+    assert gated.calls == 2
+
+
+def test_flush_during_shutdown_joins_the_shutdown(
+    lumina: Lumina, gated: _GatedFlush, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    shutdowns: List[bool] = []
+    original = lumina._provider.shutdown
+    monkeypatch.setattr(lumina._provider, "shutdown", lambda: shutdowns.append(True) or original())
+
+    futures = _from_threads(3, lambda: lumina._start_shutdown(None))
+    assert gated.entered.wait(5)
+    flush = lumina._start_flush(None)
+    gated.gate.set()
+
+    assert flush is futures[0]
+    assert all(future is futures[0] for future in futures)
+    assert flush.result(5).completed
+    assert gated.calls == 1
+    assert shutdowns == [True]
+
+
+# ----------------------------------------------------------------------
+# Reports
+# ----------------------------------------------------------------------
+
+
+def test_report_counts_the_spans_exported_by_the_flush(
+    lumina: Lumina, collector: Collector
+) -> None:
+    for index in range(3):
+        lumina.trace(f"work-{index}", lambda span: None)
+
+    report = lumina.flush_sync(timeout=5)
+    assert report == FlushReport(completed=True, exported=3, dropped=0, pending=0)
+    assert sorted(collector.span_names()) == ["work-0", "work-1", "work-2"]
@@ -0,0 +1,136 @@
+"""Fork-safety regression test: pre-fork servers call init_lumina in the master."""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import pytest
+from conftest import Collector
+
+from lumina import Lumina
+
+pytestmark = [
+    pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork"),
+    # Forking a multi-threaded process is exactly the case under test
+    pytest.mark.filterwarnings("ignore::DeprecationWarning"),
+]
+
+WORKERS = 16
+SPANS_PER_WORKER = 50
+
+
+def _span_pid(span: Dict[str, Any]) -> int:
+    for attribute in span["attributes"]:
+        if attribute["key"] == "test.pid":
+            return int(attribute["value"]["intValue"])
+    raise AssertionError(f"span without test.pid: {span}")
+
+
+def _wait_all(pids: List[int], timeout: float) -> Dict[int, int]:
+    """Reap the children, killing any that are still running after ``timeout``."""
+    deadline = time.monotonic() + timeout
+    statuses: Dict[int, int] = {}
+    while len(statuses) < len(pids) and time.monotonic() < deadline:
+        for pid in pids:
+            if pid not in statuses:
+                reaped, status = os.waitpid(pid, os.WNOHANG)
+                if reaped:
+                    statuses[pid] = os.waitstatus_to_exitcode(status)
+        time.sleep(0.01)
+    for pid in pids:
+        if pid not in statuses:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            statuses[pid] = -signal.SIGKILL
+    return statuses
+
+
+def test_forked_workers_export_their_own_spans(collector: Collector, tmp_path: Any) -> None:
+    lumina = Lumina(
+        {
+            "endpoint": collector.url,
+            "service_name": "fork-test",
+            "batch_size": 10,
+            "batch_interval_ms": 20,
+            "max_queue_size": 100_000,
+            "spool_dir": str(tmp_path / "spool"),
+        }
+    )
+    metadata = {"test.pid": os.getpid()}
+
+    # Keep the parent's processor busy so forks land while its locks are held
+    stop = threading.Event()
+
+    def parent_load() -> None:
+        while not stop.is_set():
+            lumina.trace("parent", lambda span: None, metadata=metadata)
+
+    load = threading.Thread(target=parent_load, daemon=True)
+    load.start()
+
+    pids: List[int] = []
+    try:
+        for _ in range(WORKERS):
+            time.sleep(0.005)
+            pid = os.fork()
+            if pid == 0:
+                code = 1
+                try:
+                    child_metadata = {"test.pid": os.getpid()}
+                    for _ in range(SPANS_PER_WORKER):
+                        lumina.trace("child", lambda span: None, metadata=child_metadata)
+                    if lumina.flush_sync(timeout=10).completed:
+                        code = 0
+                finally:
+                    os._exit(code)
+            pids.append(pid)
+    finally:
+        stop.set()
+        load.join()
+
+    statuses = _wait_all(pids, timeout=30)
+    lumina.flush_sync()
+
+    assert statuses == {pid: 0 for pid in pids}, "a forked worker failed or deadlocked"
+    with collector.lock:
+        spans = list(collector.spans)
+    per_pid = Counter(_span_pid(span) for span in spans)
+    for pid in pids:
+        assert per_pid[pid] == SPANS_PER_WORKER
+    # Spans queued in the parent at fork time must not be re-exported by children
+    span_ids = Counter(span["spanId"] for span in spans)
+    assert [span_id for span_id, count in span_ids.items() if count > 1] == []
+
+
+def test_locks_held_at_fork_are_replaced_in_child(tmp_path: Any) -> None:
+    lumina = Lumina(
+        {
+            "endpoint": "http://127.0.0.1:9/v1/traces",
+            "service_name": "fork-test",
+            "sampling_budget_per_sec": 1000,
+            "pricing_catalog": str(tmp_path / "prices.json"),
+        }
+    )
+    metadata = {"test.pid": os.getpid()}
+    locks = [lumina._adaptive_sampler._lock]  # type: ignore[union-attr]
+    for lock in locks:
+        lock.acquire()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                lumina.trace("child", lambda span: None, metadata=metadata)
+                lumina.trace("child", lambda span: None, metadata=metadata)
+            finally:
+                os._exit(0)
+    finally:
+        for lock in locks:
+            lock.release()
+
+    assert _wait_all([pid], timeout=10) == {pid: 0}, "child deadlocked on an inherited lock"
+    lumina.shutdown_sync(timeout=1)
@@ -0,0 +1,103 @@
+"""The export helper process: lazy start, restart after a crash, and fork."""
+
+from __future__ import annotations
+
+import os
+import signal
+import time
+from typing import Any, Iterator
+
+import pytest
+from conftest import Collector, SpanFactory
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from lumina import Lumina
+from lumina.config import load_sdk_config
+from lumina.helper import HelperSpanExporter
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+@pytest.fixture
+def helper(collector: Collector) -> Iterator[HelperSpanExporter]:
+    config = load_sdk_config(
+        {"endpoint": collector.url, "service_name": "helper-test", "batch_interval_ms": 20}
+    )
+    exporter = HelperSpanExporter(config, ring_bytes=1024 * 1024, timeout_ms=10_000)
+    yield exporter
+    exporter.shutdown()
+
+
+def test_helper_starts_on_the_first_export(
+    helper: HelperSpanExporter, collector: Collector, make_span: SpanFactory
+) -> None:
+    assert helper._process is None
+    # Nothing was handed over, so there is nothing to flush
+    assert helper.force_flush(1000)
+
+    assert helper.export([make_span("first")]) is SpanExportResult.SUCCESS
+    assert helper._process is not None
+    assert helper.force_flush(10_000)
+    assert collector.span_names() == ["first"]
+
+
+def test_killed_helper_is_restarted(
+    helper: HelperSpanExporter, collector: Collector, make_span: SpanFactory
+) -> None:
+    helper.export([make_span("before")])
+    assert helper.force_flush(10_000)
+    assert helper._process is not None
+    crashed = helper._process
+    crashed.send_signal(signal.SIGKILL)
+    crashed.wait()
+
+    assert not helper.force_flush(1000)
+    assert helper.export([make_span("after")]) is SpanExportResult.SUCCESS
+    assert helper._process is not None and helper._process.pid != crashed.pid
+    assert helper.force_flush(10_000)
+    assert collector.span_names() == ["before", "after"]
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_forked_child_starts_its_own_helper(collector: Collector) -> None:
+    lumina = Lumina(
+        {
+            "endpoint": collector.url,
+            "service_name": "helper-test",
+            "helper_process": True,
+            "batch_interval_ms": 20,
+        }
+    )
+    try:
+        lumina.trace("parent", lambda span: None)
+        assert lumina.flush_sync(timeout=10).completed
+        parent_helper = lumina._processor._exporter._process  # type: ignore[attr-defined]
+        assert parent_helper is not None
+
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                exporter: Any = lumina._processor._exporter
+                # The fork hook built the exporter but left the helper to the first export
+                if exporter._process is None:
+                    lumina.trace("child", lambda span: None)
+                    flushed = lumina.flush_sync(timeout=10).completed
+                    if flushed and exporter._process.pid != parent_helper.pid:
+                        code = 0
+            finally:
+                os._exit(code)
+
+        deadline = time.monotonic() + 30
+        while not (reaped := os.waitpid(pid, os.WNOHANG))[0]:
+            if time.monotonic() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                pytest.fail("forked child did not finish")
+            time.sleep(0.01)
+        assert os.waitstatus_to_exitcode(reaped[1]) == 0
+        assert sorted(collector.span_names()) == ["child", "parent"]
+        # The parent's helper is untouched by the child
+        assert parent_helper.poll() is None
+    finally:
+        lumina.shutdown_sync(timeout=5)
@@ -0,0 +1,225 @@
+"""Export pipeline shapes (direct, spool, helper, agent) and their rebuild after fork."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from lumina import Lumina
+from lumina.agent import AgentSpanExporter, LuminaAgent, _pack_frame, _unpack_frame
+from lumina.config import load_sdk_config
+from lumina.exporter import OTLPJsonSpanExporter
+from lumina.helper import HelperSpanExporter
+from lumina.pipeline import build_exporter, build_processor
+from lumina.processor import LuminaSpanProcessor
+
+ENDPOINT = "http://127.0.0.1:9/v1/traces"
+
+
+def _shape(lumina: Lumina) -> Dict[str, Any]:
+    processor = lumina._processor
+    exporter = processor._exporter
+    spool = getattr(exporter, "spool", None)
+    return {
+        "processor": type(processor).__name__,
+        "exporter": type(exporter).__name__,
+        "workers": sum(worker.is_alive() for worker in processor._workers),
+        "batch_size": processor._max_export_batch_size,
+        "overflow_policy": processor._overflow_policy,
+        "spool": spool is not None,
+        "spool_slot": os.path.basename(spool.directory) if spool is not None else None,
+    }
+
+
+def _shape_after_fork(lumina: Lumina) -> Dict[str, Any]:
+    """The pipeline shape as seen in a forked child."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.close(read_fd)
+            with os.fdopen(write_fd, "w") as out:
+                json.dump(_shape(lumina), out)
+            code = 0
+        finally:
+            os._exit(code)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as result:
+        shape = json.load(result)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    return shape
+
+
+@pytest.fixture
+def make_lumina() -> Iterator[Any]:
+    created: List[Lumina] = []
+
+    def make(**config: Any) -> Lumina:
+        lumina = Lumina({"endpoint": ENDPOINT, "service_name": "pipeline-test", **config})
+        created.append(lumina)
+        return lumina
+
+    yield make
+    for lumina in created:
+        lumina.shutdown_sync(timeout=2)
+
+
+# ----------------------------------------------------------------------
+# build_exporter / build_processor
+# ----------------------------------------------------------------------
+
+
+def test_build_processor_takes_its_settings_from_the_config() -> None:
+    config = load_sdk_config(
+        {
+            "endpoint": ENDPOINT,
+            "batch_size": 50,
+            "max_queue_size": 20,
+            "max_batch_bytes": 4096,
+            "max_concurrent_exports": 3,
+            "queue_overflow_policy": "drop_oldest",
+        }
+    )
+    processor = build_processor(config, SpanExporter())
+    try:
+        # The queue always holds at least one batch
+        assert processor._max_queue_size == 50
+        assert processor._max_export_batch_size == 50
+        assert processor._max_export_batch_bytes == 4096
+        assert processor._overflow_policy == "drop_oldest"
+        assert len(processor._workers) == 3
+    finally:
+        processor.shutdown()
+
+    processor = build_processor(
+        config, SpanExporter(), overflow_policy="block", block_timeout_millis=250
+    )
+    try:
+        assert processor._overflow_policy == "block"
+        assert processor._block_timeout == 0.25
+    finally:
+        processor.shutdown()
+
+
+def test_build_exporter_opens_the_configured_spool(tmp_path: Any) -> None:
+    exporter = build_exporter(load_sdk_config({"endpoint": ENDPOINT}))
+    try:
+        assert exporter.spool is None
+    finally:
+        exporter.shutdown()
+
+    exporter = build_exporter(load_sdk_config({"endpoint": ENDPOINT, "spool_dir": str(tmp_path)}))
+    try:
+        assert exporter.spool is not None
+        assert exporter.spool.directory == str(tmp_path)
+    finally:
+        exporter.shutdown()
+
+
+# ----------------------------------------------------------------------
+# Lumina pipelines, before and after fork
+# ----------------------------------------------------------------------
+
+fork_only = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+@fork_only
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_direct_pipeline_with_spool(make_lumina: Any, tmp_path: Any) -> None:
+    lumina = make_lumina(spool_dir=str(tmp_path), max_concurrent_exports=2)
+    shape = _shape(lumina)
+    assert isinstance(lumina._processor, LuminaSpanProcessor)
+    assert isinstance(lumina._processor._exporter, OTLPJsonSpanExporter)
+    assert shape["workers"] == 2
+    assert shape["spool_slot"] == os.path.basename(tmp_path)
+
+    # The child spools into a slot of its own
+    assert _shape_after_fork(lumina) == {**shape, "spool_slot": "worker-1"}
+
+
+@fork_only
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_helper_pipeline(make_lumina: Any) -> None:
+    lumina = make_lumina(helper_process=True)
+    shape = _shape(lumina)
+    assert isinstance(lumina._processor._exporter, HelperSpanExporter)
+    assert shape["spool"] is False
+    assert _shape_after_fork(lumina) == shape
+
+
+@fork_only
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_agent_pipeline(make_lumina: Any, tmp_path: Any) -> None:
+    lumina = make_lumina(agent_socket=str(tmp_path / "agent.sock"))
+    shape = _shape(lumina)
+    assert isinstance(lumina._processor._exporter, AgentSpanExporter)
+    assert shape["spool"] is False
+    assert _shape_after_fork(lumina) == shape
+
+
+# ----------------------------------------------------------------------
+# Agent wire format
+# ----------------------------------------------------------------------
+
+
+def test_agent_frame_round_trip() -> None:
+    spans = [b'{"name":"a"}', b"", b'{"name":"b"}' * 1000]
+    frame = _pack_frame(b'{"resource":1}', b'{"scope":2}', spans)
+    assert int.from_bytes(frame[:4], "big") == len(frame) - 4
+    assert _unpack_frame(frame[4:]) == (b'{"resource":1}', b'{"scope":2}', spans)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"\x02" + _pack_frame(b"r", b"s", [])[5:], id="unknown-version"),
+        pytest.param(_pack_frame(b"r", b"s", [b"span"])[4:-2], id="truncated"),
+    ],
+)
+def test_malformed_agent_frames_are_rejected(payload: bytes) -> None:
+    with pytest.raises(ValueError):
+        _unpack_frame(payload)
+
+
+class _EncodedSink(OTLPJsonSpanExporter):
+    def __init__(self) -> None:
+        super().__init__(ENDPOINT)
+        self.requests: List[Dict[str, Any]] = []
+        self.exported = threading.Event()
+
+    def export_encoded(self, body: bytes, span_count: int) -> SpanExportResult:
+        self.requests.append(json.loads(body))
+        self.exported.set()
+        return SpanExportResult.SUCCESS
+
+
+def test_agent_merges_worker_spans_into_otlp_requests(tmp_path: Any, make_span: Any) -> None:
+    sink = _EncodedSink()
+    socket_path = str(tmp_path / "agent.sock")
+    agent = LuminaAgent(sink, socket_path, batch_interval_ms=20)
+    server = threading.Thread(target=agent.serve_forever, daemon=True)
+    server.start()
+    client = AgentSpanExporter(socket_path, timeout_ms=5000)
+    try:
+        spans = [make_span(f"span-{index}", attributes={"index": index}) for index in range(3)]
+        assert client.export(spans) is SpanExportResult.SUCCESS
+        assert sink.exported.wait(5)
+    finally:
+        client.shutdown()
+        agent.stop()
+        server.join(5)
+
+    (request,) = sink.requests
+    (resource_spans,) = request["resourceSpans"]
+    (scope_spans,) = resource_spans["scopeSpans"]
+    assert scope_spans["scope"]["name"] == "lumina-tests"
+    assert [span["name"] for span in scope_spans["spans"]] == ["span-0", "span-1", "span-2"]
+    assert agent.stats()["spans_received"] == 3
@@ -0,0 +1,140 @@
+"""Model-price lookup: longest-prefix matching and unknown-model reporting."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Any
+
+import pytest
+
+from lumina.pricing import FALLBACK_PRICE, PricingCatalog, PricingIndex, model_price
+
+PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "claude-3-haiku": (0.25, 1.25),
+}
+
+
+@pytest.fixture
+def index() -> PricingIndex:
+    return PricingIndex(PRICES)
+
+
+@pytest.mark.parametrize(
+    "model, key",
+    [
+        ("gpt-4", "gpt-4"),
+        ("gpt-4-0613", "gpt-4"),
+        ("gpt-4o", "gpt-4o"),
+        ("gpt-4o-2024-08-06", "gpt-4o"),
+        ("gpt-4o-mini", "gpt-4o-mini"),
+        ("gpt-4o-mini-2024-07-18", "gpt-4o-mini"),
+        ("gpt-4-turbo", "gpt-4-turbo"),
+        ("gpt-4-turbo-2024-04-09", "gpt-4-turbo"),
+        ("gpt-4-turbo@2024-04-09", "gpt-4-turbo"),
+        ("GPT-4-Turbo", "gpt-4-turbo"),
+        ("claude-3-haiku:beta", "claude-3-haiku"),
+    ],
+)
+def test_longest_key_ending_at_a_boundary_wins(index: PricingIndex, model: str, key: str) -> None:
+    assert index.lookup(model) == model_price(*PRICES[key])
+
+
+@pytest.mark.parametrize(
+    "model, key",
+    [
+        ("openai/gpt-4", "gpt-4"),
+        ("openai/gpt-4o-mini", "gpt-4o-mini"),
+        ("azure/openai/gpt-4-turbo-2024-04-09", "gpt-4-turbo"),
+        ("us.anthropic.claude-3-haiku-20240307-v1:0", "claude-3-haiku"),
+        ("anthropic.claude-3-haiku-20240307-v1:0", "claude-3-haiku"),
+    ],
+)
+def test_provider_prefixes_are_skipped(index: PricingIndex, model: str, key: str) -> None:
+    assert index.lookup(model) == model_price(*PRICES[key])
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        "gpt-4x",  # No boundary after the key
+        "gpt-40",
+        "gpt",  # Shorter than every key
+        "my-gpt-4",  # Key not at the start, and "-" is no provider separator
+        "",
+    ],
+)
+def test_names_without_a_boundary_match_fall_back(index: PricingIndex, model: str) -> None:
+    assert index.lookup(model) == FALLBACK_PRICE
+
+
+def test_unknown_model_is_warned_about_once(
+    index: PricingIndex, caplog: pytest.LogCaptureFixture
+) -> None:
+    with caplog.at_level(logging.WARNING, logger="lumina.pricing"):
+        for _ in range(3):
+            index.lookup("my-finetune-v2")
+        index.lookup("other-model")
+        index.lookup("gpt-4")
+
+    warnings = [record.getMessage() for record in caplog.records]
+    assert len(warnings) == 2
+    assert "'my-finetune-v2'" in warnings[0]
+    assert "'other-model'" in warnings[1]
+    assert index.unknown_models() == ["my-finetune-v2", "other-model"]
+
+
+def test_unknown_model_is_warned_about_once_past_the_cache(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    index = PricingIndex(PRICES, cache_size=1)
+    with caplog.at_level(logging.WARNING, logger="lumina.pricing"):
+        for _ in range(3):
+            index.lookup("my-finetune-v2")
+            index.lookup("gpt-4")  # Evicts the unknown name from the LRU cache
+
+    assert len(caplog.records) == 1
+
+
+def test_custom_fallback() -> None:
+    fallback = model_price(5.0, 5.0)
+    assert PricingIndex(PRICES, fallback=fallback).lookup("unknown") == fallback
+
+
+def test_catalog_reloads_in_the_background(tmp_path: Any) -> None:
+    path = tmp_path / "prices.json"
+    path.write_text(
+        json.dumps({"version": "v1", "models": {"my-model": {"input": 1, "output": 2}}})
+    )
+    catalog = PricingCatalog(str(path), reload_interval_ms=20)
+    try:
+        assert (catalog.version, catalog.lookup("my-model").input) == ("v1", 1.0)
+
+        path.write_text(
+            json.dumps({"version": "v2", "models": {"my-model": {"input": 3, "output": 4}}})
+        )
+        deadline = time.monotonic() + 5
+        while catalog.version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert catalog.lookup("my-model").input == 3.0
+    finally:
+        catalog.close()
+
+
+def test_lookup_never_reads_the_catalog_file(tmp_path: Any, monkeypatch: Any) -> None:
+    path = tmp_path / "prices.json"
+    path.write_text(json.dumps({"models": {}}))
+    catalog = PricingCatalog(str(path), reload_interval_ms=60_000)
+    catalog.close()
+
+    def no_stat(*args: Any) -> None:
+        raise AssertionError("lookup touched the file system")
+
+    monkeypatch.setattr(os, "stat", no_stat)
+    assert catalog.cost("claude-3-haiku", 1000, 0, cache_read_tokens=1000) == pytest.approx(3e-5)
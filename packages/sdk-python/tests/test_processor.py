@@ -0,0 +1,265 @@
+"""The batching span processor: overflow policies, batching and concurrent exports."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Iterator, List
+
+import pytest
+from conftest import RecordingExporter, SpanFactory
+
+from lumina.processor import LuminaSpanProcessor
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def processors() -> Iterator[List[LuminaSpanProcessor]]:
+    created: List[LuminaSpanProcessor] = []
+    yield created
+    for processor in created:
+        processor._exporter.gate.set()  # type: ignore[attr-defined]
+        processor.shutdown()
+
+
+@pytest.fixture
+def stalled(
+    exporter: RecordingExporter, processors: List[LuminaSpanProcessor], make_span: SpanFactory
+) -> Callable[..., LuminaSpanProcessor]:
+    """
+    A processor with room for three spans whose only worker is stuck exporting
+    span 0, so the next three spans fill the queue.
+    """
+
+    def build(overflow_policy: str, **kwargs: Any) -> LuminaSpanProcessor:
+        exporter.gate.clear()
+        processor = LuminaSpanProcessor(
+            exporter,
+            max_queue_size=3,
+            max_export_batch_size=1,
+            schedule_delay_millis=10,
+            overflow_policy=overflow_policy,  # type: ignore[arg-type]
+            **kwargs,
+        )
+        processors.append(processor)
+        processor.on_end(make_span("span-0"))
+        _wait_for(lambda: processor.in_flight() == 1)
+        for index in range(1, 4):
+            processor.on_end(make_span(f"span-{index}"))
+        assert processor.queue_size() == 3
+        return processor
+
+    return build
+
+
+# ----------------------------------------------------------------------
+# Overflow policies
+# ----------------------------------------------------------------------
+
+
+def test_drop_newest_keeps_the_queued_spans(
+    stalled: Callable[..., LuminaSpanProcessor],
+    exporter: RecordingExporter,
+    make_span: SpanFactory,
+) -> None:
+    processor = stalled("drop_newest")
+    processor.on_end(make_span("span-4"))
+    processor.on_end(make_span("span-5"))
+
+    assert processor.drop_counts()["drop_newest"] == 2
+    exporter.gate.set()
+    assert processor.force_flush(5000)
+    assert exporter.names == ["span-0", "span-1", "span-2", "span-3"]
+
+
+def test_drop_oldest_keeps_the_newest_spans(
+    stalled: Callable[..., LuminaSpanProcessor],
+    exporter: RecordingExporter,
+    make_span: SpanFactory,
+) -> None:
+    processor = stalled("drop_oldest")
+    processor.on_end(make_span("span-4"))
+    processor.on_end(make_span("span-5"))
+
+    assert processor.drop_counts()["drop_oldest"] == 2
+    assert processor.queue_size() == 3
+    exporter.gate.set()
+    assert processor.force_flush(5000)
+    assert exporter.names == ["span-0", "span-3", "span-4", "span-5"]
+
+
+def test_block_gives_up_after_its_timeout(
+    stalled: Callable[..., LuminaSpanProcessor],
+    exporter: RecordingExporter,
+    make_span: SpanFactory,
+) -> None:
+    processor = stalled("block", block_timeout_millis=50)
+    started = time.monotonic()
+    processor.on_end(make_span("span-4"))
+
+    assert time.monotonic() - started >= 0.05
+    assert processor.drop_counts()["block"] == 1
+    exporter.gate.set()
+    assert processor.force_flush(5000)
+    assert exporter.names == ["span-0", "span-1", "span-2", "span-3"]
+
+
+def test_block_admits_the_span_once_the_queue_drains(
+    stalled: Callable[..., LuminaSpanProcessor],
+    exporter: RecordingExporter,
+    make_span: SpanFactory,
+) -> None:
+    processor = stalled("block", block_timeout_millis=5000)
+    threading.Timer(0.05, exporter.gate.set).start()
+    processor.on_end(make_span("span-4"))
+
+    assert processor.drop_counts()["block"] == 0
+    assert processor.force_flush(5000)
+    assert exporter.names == ["span-0", "span-1", "span-2", "span-3", "span-4"]
+
+
+def test_stats_count_exported_dropped_and_queued_spans(
+    stalled: Callable[..., LuminaSpanProcessor],
+    exporter: RecordingExporter,
+    make_span: SpanFactory,
+) -> None:
+    processor = stalled("drop_newest")
+    processor.on_end(make_span("span-4"))
+    assert processor.stats() == {
+        "exported": 0,
+        "failed": 0,
+        "dropped": 1,
+        "queued": 3,
+        "in_flight": 1,
+    }
+
+    exporter.gate.set()
+    assert processor.force_flush(5000)
+    processor.shutdown()
+    processor.on_end(make_span("span-5"))
+    assert processor.stats() == {
+        "exported": 4,
+        "failed": 0,
+        "dropped": 2,
+        "queued": 0,
+        "in_flight": 0,
+    }
+    assert processor.drop_counts() == {
+        "drop_newest": 1,
+        "drop_oldest": 0,
+        "block": 0,
+        "shutdown": 1,
+    }
+
+
+# ----------------------------------------------------------------------
+# Batching
+# ----------------------------------------------------------------------
+
+
+def _size_attribute(span: Any) -> int:
+    return span.attributes["size"]
+
+
+def test_batch_closes_before_crossing_the_byte_limit(
+    exporter: RecordingExporter, processors: List[LuminaSpanProcessor], make_span: SpanFactory
+) -> None:
+    processor = LuminaSpanProcessor(
+        exporter,
+        max_export_batch_size=10,
+        max_export_batch_bytes=100,
+        schedule_delay_millis=60_000,
+        size_estimator=_size_attribute,
+    )
+    processors.append(processor)
+    for name in ("a", "b"):
+        processor.on_end(make_span(name, attributes={"size": 40}))
+    assert processor.queued_bytes() == 80
+    assert exporter.batches == []
+
+    # Reaching the limit wakes a worker without waiting for the schedule delay
+    processor.on_end(make_span("c", attributes={"size": 40}))
+    processor.on_end(make_span("oversized", attributes={"size": 500}))
+    processor.on_end(make_span("d", attributes={"size": 10}))
+    _wait_for(lambda: len(exporter.batches) == 3)
+    assert processor.queued_bytes() == 10
+
+    assert processor.force_flush(5000)
+    assert exporter.batches == [["a", "b"], ["c"], ["oversized"], ["d"]]
+
+
+# ----------------------------------------------------------------------
+# Concurrent exports
+# ----------------------------------------------------------------------
+
+
+def _concurrent(
+    exporter: RecordingExporter, processors: List[LuminaSpanProcessor], workers: int
+) -> LuminaSpanProcessor:
+    processor = LuminaSpanProcessor(
+        exporter,
+        max_export_batch_size=1,
+        schedule_delay_millis=60_000,
+        max_concurrent_exports=workers,
+    )
+    processors.append(processor)
+    return processor
+
+
+def test_workers_export_batches_concurrently_in_queue_order(
+    exporter: RecordingExporter, processors: List[LuminaSpanProcessor], make_span: SpanFactory
+) -> None:
+    exporter.gate.clear()
+    processor = _concurrent(exporter, processors, workers=3)
+    for index in range(3):
+        processor.on_end(make_span(f"span-{index}"))
+    for _ in range(3):
+        assert exporter.entered.acquire(timeout=5)
+
+    assert exporter.max_active == 3
+    assert processor.in_flight() == 3
+    # Workers take batches off the head of the queue, so exports start in order
+    assert exporter.started == [["span-0"], ["span-1"], ["span-2"]]
+
+
+def test_force_flush_waits_for_every_worker(
+    exporter: RecordingExporter, processors: List[LuminaSpanProcessor], make_span: SpanFactory
+) -> None:
+    exporter.gate.clear()
+    processor = _concurrent(exporter, processors, workers=2)
+    for index in range(4):
+        processor.on_end(make_span(f"span-{index}"))
+    for _ in range(2):
+        assert exporter.entered.acquire(timeout=5)
+
+    results: List[bool] = []
+    flusher = threading.Thread(target=lambda: results.append(processor.force_flush(5000)))
+    flusher.start()
+    flusher.join(0.1)
+    assert flusher.is_alive()
+
+    exporter.gate.set()
+    flusher.join(5)
+    assert results == [True]
+    assert sorted(exporter.names) == ["span-0", "span-1", "span-2", "span-3"]
+    assert processor.stats()["in_flight"] == 0
+
+
+def test_shutdown_joins_every_worker(
+    processors: List[LuminaSpanProcessor], make_span: SpanFactory
+) -> None:
+    exporter = RecordingExporter(delay=0.05)
+    processor = _concurrent(exporter, processors, workers=3)
+    for index in range(6):
+        processor.on_end(make_span(f"span-{index}"))
+
+    processor.shutdown()
+    assert not any(worker.is_alive() for worker in processor._workers)
+    assert sorted(exporter.names) == [f"span-{index}" for index in range(6)]
+    assert exporter.shut_down
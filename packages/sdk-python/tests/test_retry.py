@@ -0,0 +1,167 @@
+"""Export retries: full-jitter backoff, Retry-After and the retryable statuses."""
+
+from __future__ import annotations
+
+import email.utils
+import random
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from lumina.retry import RETRYABLE_STATUSES, RetryPolicy, parse_retry_after
+from lumina.transport import TransportResponse
+
+NOW = 1_700_000_000.0
+
+
+class _Responses:
+    """``attempt_fn`` returning the given statuses (or raising errors) in turn."""
+
+    def __init__(self, *outcomes: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        self._outcomes = list(outcomes)
+        self._headers = headers or {}
+        self.timeouts: List[float] = []
+
+    def __call__(self, timeout: float) -> TransportResponse:
+        self.timeouts.append(timeout)
+        outcome = self._outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return TransportResponse(outcome, b"", dict(self._headers))
+
+
+class _RecordedWaits(threading.Event):
+    """A cancel event whose waits return at once and are recorded in ``delays``."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.delays: List[float] = []
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self.delays.append(timeout)  # type: ignore[arg-type]
+        return self.is_set()
+
+
+def _policy(*args: Any, **kwargs: Any) -> Tuple[RetryPolicy, List[float]]:
+    policy = RetryPolicy(*args, **kwargs)
+    waits = _RecordedWaits()
+    policy._cancelled = waits
+    return policy, waits.delays
+
+
+# ----------------------------------------------------------------------
+# Backoff
+# ----------------------------------------------------------------------
+
+
+def test_backoff_is_full_jitter_below_the_exponential_cap() -> None:
+    policy = RetryPolicy(base_delay_ms=100, max_delay_ms=1000)
+    random.seed(7)
+    for attempt, cap in enumerate([0.1, 0.2, 0.4, 0.8, 1.0, 1.0]):
+        delays = [policy.backoff(attempt) for _ in range(500)]
+        assert all(0 <= delay <= cap for delay in delays)
+        # Spread over the whole range rather than clustered near the cap
+        assert min(delays) < cap * 0.1
+        assert max(delays) > cap * 0.9
+
+
+def test_backoff_bounds_are_passed_to_the_jitter(monkeypatch: Any) -> None:
+    bounds: List[Any] = []
+    monkeypatch.setattr(random, "uniform", lambda low, high: bounds.append((low, high)) or high)
+    policy = RetryPolicy(base_delay_ms=100, max_delay_ms=300)
+    assert [policy.backoff(attempt) for attempt in range(3)] == pytest.approx([0.1, 0.2, 0.3])
+    assert bounds == pytest.approx([(0, 0.1), (0, 0.2), (0, 0.3)])
+
+
+# ----------------------------------------------------------------------
+# Retry-After
+# ----------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("120", 120.0),
+        (" 5 ", 5.0),
+        ("0", 0.0),
+        (email.utils.formatdate(NOW + 30, usegmt=True), 30.0),
+        (email.utils.formatdate(NOW - 30, usegmt=True), 0.0),  # Already passed
+        ("soon", None),
+        ("-5", None),
+        ("", None),
+    ],
+)
+def test_retry_after_in_seconds_and_http_date_forms(value: str, expected: Optional[float]) -> None:
+    assert parse_retry_after({"retry-after": value}, now=NOW) == expected
+
+
+def test_missing_retry_after() -> None:
+    assert parse_retry_after({}, now=NOW) is None
+
+
+def test_retry_after_replaces_the_backoff() -> None:
+    attempts = _Responses(503, 200, headers={"retry-after": "2"})
+    policy, waits = _policy(3, budget_ms=10_000)
+    response = policy.call(attempts)
+    assert response.status == 200
+    assert waits == [2.0]
+
+
+def test_retry_after_past_the_budget_gives_up() -> None:
+    attempts = _Responses(429, 200, headers={"retry-after": "60"})
+    policy, waits = _policy(3, budget_ms=10_000)
+    response = policy.call(attempts)
+    assert response.status == 429
+    assert waits == []
+
+
+# ----------------------------------------------------------------------
+# Retryable statuses and errors
+# ----------------------------------------------------------------------
+
+
+def test_retryable_statuses() -> None:
+    assert RETRYABLE_STATUSES == {408, 429, 500, 502, 503, 504}
+
+
+@pytest.mark.parametrize("status", sorted(RETRYABLE_STATUSES))
+def test_retryable_status_is_retried(status: int) -> None:
+    policy, _ = _policy(3)
+    attempts = _Responses(status, 200)
+    assert policy.call(attempts).status == 200
+    assert len(attempts.timeouts) == 2
+
+
+@pytest.mark.parametrize("status", [200, 204, 400, 401, 403, 404, 413, 501])
+def test_other_statuses_are_returned_at_once(status: int) -> None:
+    policy, waits = _policy(3)
+    attempts = _Responses(status, 200)
+    assert policy.call(attempts).status == status
+    assert len(attempts.timeouts) == 1
+    assert waits == []
+
+
+def test_network_errors_are_retried_then_reraised() -> None:
+    attempts = _Responses(ConnectionResetError(), OSError(), ConnectionRefusedError())
+    policy, waits = _policy(2)
+    with pytest.raises(ConnectionRefusedError):
+        policy.call(attempts)
+    assert len(attempts.timeouts) == 3
+    assert len(waits) == 2
+
+
+def test_retries_stop_at_max_retries() -> None:
+    policy, waits = _policy(2)
+    attempts = _Responses(500, 500, 500, 200)
+    assert policy.call(attempts).status == 500
+    assert len(waits) == 2
+    assert len(attempts.timeouts) == 3
+
+
+def test_cancel_stops_waiting() -> None:
+    policy, _ = _policy(3)
+    policy.cancel()
+    attempts = _Responses(503, 200)
+    assert policy.call(attempts).status == 503
+    assert len(attempts.timeouts) == 1
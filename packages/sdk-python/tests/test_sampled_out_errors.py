@@ -0,0 +1,79 @@
+"""Errors in calls the head sampler dropped are still exported, in their own trace."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Tuple
+
+import pytest
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from lumina import Lumina
+
+
+@pytest.fixture
+def lumina() -> Iterator[Tuple[Lumina, InMemorySpanExporter]]:
+    instance = Lumina(
+        {
+            "endpoint": "http://127.0.0.1:9/v1/traces",
+            "service_name": "sampling-test",
+            "sample_ratio": 0.0,
+        }
+    )
+    spans = InMemorySpanExporter()
+    instance._provider.add_span_processor(SimpleSpanProcessor(spans))
+    yield instance, spans
+    instance.shutdown_sync(timeout=1)
+
+
+def _fail(span: Any) -> None:
+    raise ValueError("boom")
+
+
+def test_nested_errors_stay_in_one_trace(lumina: Tuple[Lumina, InMemorySpanExporter]) -> None:
+    instance, spans = lumina
+
+    def outer(span: Any) -> None:
+        instance.trace("inner", _fail)
+
+    with pytest.raises(ValueError):
+        instance.trace("outer", outer)
+
+    by_name = {span.name: span for span in spans.get_finished_spans()}
+    assert set(by_name) == {"inner", "outer"}
+    inner, outer_span = by_name["inner"], by_name["outer"]
+    assert inner.context.trace_id == outer_span.context.trace_id
+    assert inner.parent is not None
+    assert inner.parent.span_id == outer_span.context.span_id
+    assert outer_span.parent is None
+    assert all(span.status.description == "boom" for span in by_name.values())
+
+
+def test_decorated_error_keeps_the_ids_its_children_saw(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+    seen: Dict[str, int] = {}
+
+    @instance.traced(name="step")
+    def step() -> None:
+        context = instance._tracer.start_span("probe").get_span_context()
+        seen["trace_id"] = context.trace_id
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        step()
+    with pytest.raises(ValueError):
+        step()
+
+    first, second = spans.get_finished_spans()
+    assert first.context.trace_id != second.context.trace_id
+    assert second.context.trace_id == seen["trace_id"]
+
+
+def test_successful_sampled_out_calls_export_nothing(
+    lumina: Tuple[Lumina, InMemorySpanExporter],
+) -> None:
+    instance, spans = lumina
+    instance.trace("outer", lambda span: instance.trace("inner", lambda inner: None))
+    assert spans.get_finished_spans() == ()
@@ -0,0 +1,189 @@
+"""Head sampling: per-trace-id ratio decisions, parent-based children, rules and rates."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Optional
+
+import pytest
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.sampling import Decision
+from opentelemetry.trace import (
+    NonRecordingSpan,
+    SpanContext,
+    TraceFlags,
+    TraceState,
+    set_span_in_context,
+)
+
+from lumina import semantic_conventions as SC
+from lumina.sampling import FORCE_SAMPLE_ATTRIBUTE, AdaptiveSampler, LuminaSampler
+
+HALF = 1 << 63
+MAX_LOW_BITS = (1 << 64) - 1
+
+
+def _parent(
+    sampled: bool, *, remote: bool = False, trace_state: Optional[TraceState] = None
+) -> Context:
+    context = SpanContext(
+        trace_id=0xABC,
+        span_id=0xDEF,
+        is_remote=remote,
+        trace_flags=TraceFlags(TraceFlags.SAMPLED if sampled else TraceFlags.DEFAULT),
+        trace_state=trace_state,
+    )
+    return set_span_in_context(NonRecordingSpan(context))
+
+
+def _kept(
+    sampler: LuminaSampler,
+    trace_id: int,
+    name: str = "root",
+    parent: Optional[Context] = None,
+    attributes: Any = None,
+) -> bool:
+    result = sampler.should_sample(parent, trace_id, name, attributes=attributes)
+    return result.decision is Decision.RECORD_AND_SAMPLE
+
+
+# ----------------------------------------------------------------------
+# Root decisions
+# ----------------------------------------------------------------------
+
+
+def test_decision_is_a_function_of_the_trace_id() -> None:
+    rng = random.Random(3)
+    trace_ids = [rng.getrandbits(128) for _ in range(2000)]
+    first = [_kept(LuminaSampler(0.25), trace_id) for trace_id in trace_ids]
+    # The same ids get the same decisions, from any sampler with the same ratio
+    assert [_kept(LuminaSampler(0.25), trace_id) for trace_id in trace_ids] == first
+    assert sum(first) / len(first) == pytest.approx(0.25, abs=0.03)
+
+
+def test_low_64_bits_are_compared_with_the_ratio() -> None:
+    sampler = LuminaSampler(0.5)
+    assert _kept(sampler, HALF - 1)
+    assert not _kept(sampler, HALF)
+    # The high bits do not take part
+    assert _kept(sampler, (MAX_LOW_BITS << 64) | (HALF - 1))
+    assert not _kept(sampler, (1 << 64) | HALF)
+
+
+def test_ratio_zero_keeps_nothing() -> None:
+    sampler = LuminaSampler(0.0)
+    assert not any(_kept(sampler, trace_id) for trace_id in (0, 1, HALF, MAX_LOW_BITS))
+
+
+def test_ratio_one_keeps_everything() -> None:
+    sampler = LuminaSampler(1.0)
+    assert all(_kept(sampler, trace_id) for trace_id in (0, 1, HALF, MAX_LOW_BITS))
+
+
+@pytest.mark.parametrize("ratio", [-0.1, 1.5])
+def test_ratio_out_of_range_is_rejected(ratio: float) -> None:
+    with pytest.raises(ValueError):
+        LuminaSampler(ratio)
+
+
+def test_forced_spans_are_kept_without_the_marker_attribute() -> None:
+    result = LuminaSampler(0.0).should_sample(
+        None, HALF, "root", attributes={FORCE_SAMPLE_ATTRIBUTE: True, "other": 1}
+    )
+    assert result.decision is Decision.RECORD_AND_SAMPLE
+    assert dict(result.attributes) == {"other": 1}
+
+
+# ----------------------------------------------------------------------
+# Children
+# ----------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("remote", [False, True])
+def test_children_follow_a_sampled_parent(remote: bool) -> None:
+    parent = _parent(True, remote=remote)
+    assert _kept(LuminaSampler(0.0), MAX_LOW_BITS, parent=parent)
+
+
+@pytest.mark.parametrize("remote", [False, True])
+def test_children_follow_a_dropped_parent(remote: bool) -> None:
+    parent = _parent(False, remote=remote)
+    assert not _kept(LuminaSampler(1.0), 0, parent=parent)
+
+
+def test_rules_do_not_apply_to_children() -> None:
+    sampler = LuminaSampler(1.0, [{"name": "child", "ratio": 0}])
+    assert _kept(sampler, 0, "child", parent=_parent(True))
+    assert not _kept(sampler, 0, "child")
+
+
+# ----------------------------------------------------------------------
+# Rules
+# ----------------------------------------------------------------------
+
+
+def test_first_matching_rule_wins() -> None:
+    sampler = LuminaSampler(
+        1.0,
+        [
+            {"endpoint": "/health*", "ratio": 0},
+            {"name": "llm.*", "ratio": 0.5},
+            {"name": "llm.chat", "ratio": 0},
+        ],
+    )
+    assert not _kept(sampler, 0, "/healthz")
+    assert _kept(sampler, HALF - 1, "llm.chat")
+    assert not _kept(sampler, HALF, "llm.chat")
+    assert _kept(sampler, MAX_LOW_BITS, "/api/users")
+
+
+def test_rule_without_pattern_or_ratio_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        LuminaSampler(1.0, [{"ratio": 0.5}])
+    with pytest.raises(ValueError):
+        LuminaSampler(1.0, [{"name": "llm.*"}])
+
+
+# ----------------------------------------------------------------------
+# Sample rates
+# ----------------------------------------------------------------------
+
+
+def test_kept_roots_record_their_rate_in_attributes_and_tracestate() -> None:
+    result = AdaptiveSampler(1000, ratio=0.25).should_sample(None, 0, "root")
+    assert result.decision is Decision.RECORD_AND_SAMPLE
+    assert result.attributes[SC.LUMINA_SAMPLE_RATE] == 0.25
+    assert result.trace_state.get("lumina") == "r:0.25"
+
+
+@pytest.mark.parametrize("remote", [False, True])
+def test_children_record_the_rate_from_the_tracestate(remote: bool) -> None:
+    state = TraceState([("vendor", "x"), ("lumina", "r:0.125")])
+    result = LuminaSampler(1.0).should_sample(
+        _parent(True, remote=remote, trace_state=state), 0, "child", attributes={"a": 1}
+    )
+    assert dict(result.attributes) == {"a": 1, SC.LUMINA_SAMPLE_RATE: 0.125}
+    assert result.trace_state == state
+
+
+@pytest.mark.parametrize("value", ["r:nope", "r:0", "r:1.5", "0.5"])
+def test_malformed_rates_in_the_tracestate_are_ignored(value: str) -> None:
+    parent = _parent(True, trace_state=TraceState([("lumina", value)]))
+    result = LuminaSampler(1.0).should_sample(parent, 0, "child")
+    assert not result.attributes
+
+
+def test_every_span_of_an_adaptively_sampled_trace_carries_the_rate() -> None:
+    provider = TracerProvider(sampler=AdaptiveSampler(1000, ratio=0.5))
+    tracer = provider.get_tracer("lumina-tests")
+    # Half the trace ids are kept; the first kept trace is checked
+    for _ in range(20):
+        with tracer.start_as_current_span("root") as root:
+            if not root.is_recording():
+                continue
+            with tracer.start_as_current_span("llm") as child:
+                assert child.attributes[SC.LUMINA_SAMPLE_RATE] == 0.5
+            assert root.attributes[SC.LUMINA_SAMPLE_RATE] == 0.5
+            return
+    pytest.fail("no trace was kept")
@@ -0,0 +1,84 @@
+"""Shared-memory ring between the app and the export helper process."""
+
+from __future__ import annotations
+
+import os
+from typing import Iterator, Tuple
+
+import pytest
+
+from lumina.helper import _LENGTH, ShmRing
+
+
+@pytest.fixture
+def ring() -> Iterator[Tuple[ShmRing, ShmRing]]:
+    """A producer and a consumer mapping of the same 64-byte ring."""
+    producer, fd = ShmRing.create(64)
+    consumer = ShmRing(fd, 64)
+    yield producer, consumer
+    producer.close()
+    consumer.close()
+    os.close(fd)
+
+
+def test_records_come_back_in_order(ring: Tuple[ShmRing, ShmRing]) -> None:
+    producer, consumer = ring
+    assert consumer.get() is None
+    for payload in (b"a", b"bb", b"ccc"):
+        assert producer.put(payload)
+
+    assert [consumer.get(), consumer.get(), consumer.get()] == [b"a", b"bb", b"ccc"]
+    assert consumer.get() is None
+
+
+@pytest.mark.parametrize(
+    "size",
+    [
+        pytest.param(12, id="exact-fit"),
+        pytest.param(27, id="tail-too-short-for-marker"),
+        pytest.param(10, id="wrap-marker"),
+        pytest.param(1, id="small"),
+    ],
+)
+def test_wraparound_keeps_records_whole(ring: Tuple[ShmRing, ShmRing], size: int) -> None:
+    producer, consumer = ring
+    for i in range(200):
+        payload = bytes([i % 256]) * size
+        assert producer.put(payload)
+        assert consumer.get() == payload
+    assert consumer.get() is None
+
+
+def test_put_fails_when_full_until_the_consumer_catches_up(
+    ring: Tuple[ShmRing, ShmRing],
+) -> None:
+    producer, consumer = ring
+    written = []
+    for i in range(100):
+        payload = b"%02d" % i + b"x" * 10
+        if not producer.put(payload):
+            break
+        written.append(payload)
+    assert 0 < len(written) < 100
+
+    assert consumer.get() == written[0]
+    assert producer.put(b"late")
+    assert [consumer.get() for _ in written[1:]] == written[1:]
+    assert consumer.get() == b"late"
+
+
+def test_unpublished_record_is_not_read(ring: Tuple[ShmRing, ShmRing]) -> None:
+    producer, consumer = ring
+    assert producer.put(b"done")
+    # A record written but not yet published by advancing the write position
+    _LENGTH.pack_into(producer._data, _LENGTH.size + 4, 5)
+    producer._data[2 * _LENGTH.size + 4 : 2 * _LENGTH.size + 9] = b"torn!"
+
+    assert consumer.get() == b"done"
+    assert consumer.get() is None
+
+
+def test_oversized_record_is_rejected(ring: Tuple[ShmRing, ShmRing]) -> None:
+    producer, _ = ring
+    with pytest.raises(ValueError):
+        producer.put(b"x" * 32)
@@ -0,0 +1,206 @@
+"""On-disk spool: recovery from torn writes and corruption, cursor restarts, caps and slots."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, List
+
+import pytest
+
+from lumina.spool import SpanSpool, SpoolLockedError, open_spool
+
+
+def _open(directory: Any, **kwargs: Any) -> SpanSpool:
+    return SpanSpool(str(directory), fsync=False, **kwargs)
+
+
+def _drain(spool: SpanSpool) -> List[bytes]:
+    payloads = []
+    while (payload := spool.peek()) is not None:
+        payloads.append(payload)
+        spool.commit()
+    return payloads
+
+
+def _segments(directory: Any) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if name.endswith(".seg"))
+
+
+def test_batches_come_back_in_order(tmp_path: Any) -> None:
+    spool = _open(tmp_path)
+    for i in range(5):
+        spool.append(b"batch-%d" % i)
+
+    assert spool.has_pending()
+    assert spool.peek() == spool.peek() == b"batch-0"
+    assert _drain(spool) == [b"batch-%d" % i for i in range(5)]
+    assert not spool.has_pending()
+    spool.close()
+
+
+@pytest.mark.parametrize(
+    "tail",
+    [
+        pytest.param(b"\x00\x00", id="partial-header"),
+        pytest.param(b"\x00\x00\x00\x10\x00\x00\x00\x00abc", id="partial-payload"),
+        pytest.param(b"\x00\x00\x00\x03\xde\xad\xbe\xefabc", id="bad-crc"),
+    ],
+)
+def test_torn_record_is_cut_off_on_reopen(tmp_path: Any, tail: bytes) -> None:
+    spool = _open(tmp_path)
+    spool.append(b"first")
+    spool.append(b"second")
+    spool.close()
+    (segment,) = _segments(tmp_path)
+    size = os.path.getsize(tmp_path / segment)
+    with open(tmp_path / segment, "ab") as fh:
+        fh.write(tail)
+
+    spool = _open(tmp_path)
+
+    assert os.path.getsize(tmp_path / segment) == size
+    spool.append(b"third")
+    assert _drain(spool) == [b"first", b"second", b"third"]
+    spool.close()
+
+
+def test_reopen_resumes_after_committed_batches(tmp_path: Any) -> None:
+    spool = _open(tmp_path)
+    for i in range(4):
+        spool.append(b"batch-%d" % i)
+    assert spool.peek() == b"batch-0"
+    spool.commit()
+    # Peeked but not committed: must be delivered again after a restart
+    assert spool.peek() == b"batch-1"
+    spool.close()
+
+    spool = _open(tmp_path)
+    assert _drain(spool) == [b"batch-1", b"batch-2", b"batch-3"]
+    spool.close()
+
+
+def test_unreadable_cursor_restarts_from_oldest_segment(tmp_path: Any) -> None:
+    spool = _open(tmp_path)
+    spool.append(b"first")
+    spool.append(b"second")
+    assert spool.peek() == b"first"
+    spool.commit()
+    spool.close()
+    (tmp_path / "cursor").write_text("garbage")
+
+    spool = _open(tmp_path)
+    assert _drain(spool) == [b"first", b"second"]
+    spool.close()
+
+
+def test_delivered_segments_are_deleted(tmp_path: Any) -> None:
+    spool = _open(tmp_path, segment_bytes=64, max_bytes=1 << 20)
+    payloads = [bytes([i]) * 40 for i in range(6)]
+    for payload in payloads:
+        spool.append(payload)
+    # Two 48-byte records per segment: it rotates once past segment_bytes
+    assert len(_segments(tmp_path)) == 3
+
+    assert _drain(spool) == payloads
+    assert len(_segments(tmp_path)) == 1
+    spool.close()
+
+    spool = _open(tmp_path)
+    assert spool.peek() is None
+    spool.close()
+
+
+def test_size_cap_drops_oldest_segments(tmp_path: Any) -> None:
+    spool = _open(tmp_path, segment_bytes=64, max_bytes=200)
+    payloads = [bytes([i]) * 40 for i in range(8)]
+    for payload in payloads:
+        spool.append(payload)
+
+    assert spool.size_bytes() <= 200
+    assert spool.dropped_batches == 4
+    assert _drain(spool) == payloads[4:]
+    spool.close()
+
+
+def test_directory_is_locked_while_open(tmp_path: Any) -> None:
+    spool = _open(tmp_path)
+    with pytest.raises(SpoolLockedError):
+        _open(tmp_path)
+    spool.close()
+    _open(tmp_path).close()
+
+
+def test_open_spool_falls_back_to_a_free_worker_slot(tmp_path: Any) -> None:
+    first = open_spool(str(tmp_path))
+    second = open_spool(str(tmp_path))
+    third = open_spool(str(tmp_path))
+    assert [first.directory, second.directory, third.directory] == [
+        str(tmp_path),
+        str(tmp_path / "worker-1"),
+        str(tmp_path / "worker-2"),
+    ]
+    second.append(b"left behind")
+    second.close()
+
+    # A restarted process takes the freed slot and the batches in it
+    reopened = open_spool(str(tmp_path))
+    assert reopened.directory == str(tmp_path / "worker-1")
+    assert _drain(reopened) == [b"left behind"]
+    for spool in (first, third, reopened):
+        spool.close()
+
+
+def test_corrupt_record_mid_segment_is_skipped(tmp_path: Any) -> None:
+    spool = _open(tmp_path)
+    for payload in (b"first", b"second", b"third"):
+        spool.append(payload)
+    spool.close()
+    (segment,) = _segments(tmp_path)
+    with open(tmp_path / segment, "r+b") as fh:
+        fh.seek(8 + len(b"first") + 8)  # First byte of the second payload
+        fh.write(b"X")
+
+    # Reopening keeps the records after the damaged one
+    spool = _open(tmp_path)
+    spool.append(b"fourth")
+    assert _drain(spool) == [b"first", b"third", b"fourth"]
+    assert spool.dropped_batches == 1
+    spool.close()
+
+
+def test_unframed_data_ends_its_segment(tmp_path: Any) -> None:
+    spool = _open(tmp_path, segment_bytes=64, max_bytes=1 << 20)
+    payloads = [bytes([i]) * 40 for i in range(4)]
+    for payload in payloads:
+        spool.append(payload)
+    spool.close()
+    first = _segments(tmp_path)[0]
+    with open(tmp_path / first, "r+b") as fh:
+        fh.seek(48)  # Header of the second record: a length past the end of the file
+        fh.write(b"\x7f\xff\xff\xff")
+
+    spool = _open(tmp_path)
+    assert _drain(spool) == payloads[:1] + payloads[2:]
+    assert spool.dropped_batches == 1
+    spool.close()
+
+
+def test_base_slot_adopts_batches_of_unused_worker_slots(tmp_path: Any) -> None:
+    base = open_spool(str(tmp_path))
+    exited = open_spool(str(tmp_path))
+    running = open_spool(str(tmp_path))
+    base.append(b"base")
+    exited.append(b"exited-1")
+    exited.append(b"exited-2")
+    running.append(b"running")
+    exited.close()
+
+    assert base.adopt_orphans() == 2
+    assert _drain(base) == [b"base", b"exited-1", b"exited-2"]
+    # Adopted batches are gone from the slot, which is free again
+    reopened = open_spool(str(tmp_path))
+    assert reopened.directory == str(tmp_path / "worker-1")
+    assert reopened.peek() is None
+    assert _drain(running) == [b"running"]
+    for spool in (base, running, reopened):
+        spool.close()
@@ -0,0 +1,201 @@
+"""Tail sampling: whole-trace decisions, timeouts, the buffer cap and the idle sweep."""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Iterator, List, Optional
+
+import pytest
+from conftest import SpanFactory
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+
+from lumina import semantic_conventions as SC
+from lumina.tail_sampling import TailSamplingProcessor
+
+
+class _Downstream(SpanProcessor):
+    def __init__(self) -> None:
+        self.ended: List[str] = []
+        self.shut_down = False
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        self.ended.append(span.name)
+
+    def shutdown(self) -> None:
+        self.shut_down = True
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+@pytest.fixture
+def downstream() -> _Downstream:
+    return _Downstream()
+
+
+@pytest.fixture
+def tail(downstream: _Downstream) -> Iterator[Any]:
+    created: List[TailSamplingProcessor] = []
+
+    def make(**kwargs: Any) -> TailSamplingProcessor:
+        kwargs.setdefault("sweep_interval_millis", 60_000)
+        processor = TailSamplingProcessor(downstream, **kwargs)
+        created.append(processor)
+        return processor
+
+    yield make
+    for processor in created:
+        processor.shutdown()
+
+
+def _wait_for(condition: Any, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def _trace(
+    processor: TailSamplingProcessor,
+    make_span: SpanFactory,
+    name: str,
+    *,
+    error: bool = False,
+    end_root: bool = True,
+    duration_ns: int = 1_000_000,
+) -> None:
+    """A root span ``name`` with one child ``name.child``, ended child first."""
+    root: Any = make_span(name, end=False)
+    processor.on_end(make_span(f"{name}.child", parent=root, error=error))
+    if end_root:
+        root.end(end_time=1 + duration_ns)
+        processor.on_end(root)
+
+
+# ----------------------------------------------------------------------
+# Decisions
+# ----------------------------------------------------------------------
+
+
+def test_errored_traces_are_kept_whole(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail()
+    _trace(processor, make_span, "ok")
+    _trace(processor, make_span, "failed", error=True)
+
+    assert downstream.ended == ["failed.child", "failed"]
+    assert processor.stats() == {"kept": 1, "dropped": 1, "evicted": 0, "buffered_spans": 0}
+
+
+def test_spans_are_held_until_the_root_ends(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail()
+    root: Any = make_span("root", end=False)
+    processor.on_end(make_span("child", parent=root, error=True))
+    assert downstream.ended == []
+    assert processor.stats()["buffered_spans"] == 1
+
+    root.end()
+    processor.on_end(root)
+    assert downstream.ended == ["child", "root"]
+    # A straggler follows its trace's decision
+    processor.on_end(make_span("late", parent=root))
+    assert downstream.ended == ["child", "root", "late"]
+
+
+def test_cost_and_duration_rules(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail(min_cost_usd=0.5, min_duration_ms=100)
+    root: Any = make_span("costly", end=False)
+    processor.on_end(make_span("llm", parent=root, attributes={SC.LUMINA_COST_USD: 0.3}))
+    processor.on_end(make_span("llm", parent=root, attributes={SC.LUMINA_COST_USD: 0.3}))
+    root.end(end_time=2)
+    processor.on_end(root)
+    _trace(processor, make_span, "slow", duration_ns=200_000_000)
+    _trace(processor, make_span, "fast", duration_ns=1_000_000)
+
+    assert downstream.ended == ["llm", "llm", "costly", "slow.child", "slow"]
+
+
+# ----------------------------------------------------------------------
+# Timeout, cap and sweep
+# ----------------------------------------------------------------------
+
+
+def test_timed_out_traces_are_decided_on_flush(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail(trace_timeout_millis=50)
+    _trace(processor, make_span, "failed", error=True, end_root=False)
+    _trace(processor, make_span, "ok", end_root=False)
+    assert processor.force_flush()
+    assert downstream.ended == []
+
+    time.sleep(0.06)
+    assert processor.force_flush()
+    assert downstream.ended == ["failed.child"]
+    assert processor.stats() == {"kept": 1, "dropped": 1, "evicted": 2, "buffered_spans": 0}
+
+
+def test_oldest_traces_are_decided_past_the_buffer_cap(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail(max_buffered_spans=3)
+    for index in range(4):
+        _trace(processor, make_span, f"trace-{index}", error=True, end_root=False)
+
+    assert downstream.ended == ["trace-0.child"]
+    assert processor.stats()["evicted"] == 1
+    assert processor.stats()["buffered_spans"] == 3
+
+
+def test_idle_traces_are_swept_without_further_spans(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail(trace_timeout_millis=20, sweep_interval_millis=10)
+    _trace(processor, make_span, "failed", error=True, end_root=False)
+
+    _wait_for(lambda: downstream.ended == ["failed.child"])
+    assert processor.stats()["evicted"] == 1
+
+
+def test_shutdown_decides_everything_and_stops_the_sweep(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail(trace_timeout_millis=60_000, sweep_interval_millis=10)
+    _trace(processor, make_span, "failed", error=True, end_root=False)
+    processor.shutdown()
+
+    assert downstream.ended == ["failed.child"]
+    assert downstream.shut_down
+    assert processor._stop.is_set()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_forked_child_gets_its_own_sweep(
+    tail: Any, downstream: _Downstream, make_span: SpanFactory
+) -> None:
+    processor = tail(trace_timeout_millis=20, sweep_interval_millis=10)
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            processor.reset_after_fork()
+            _trace(processor, make_span, "failed", error=True, end_root=False)
+            deadline = time.monotonic() + 5
+            while downstream.ended != ["failed.child"] and time.monotonic() < deadline:
+                time.sleep(0.005)
+            code = 0 if downstream.ended == ["failed.child"] else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
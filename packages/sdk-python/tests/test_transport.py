@@ -0,0 +1,242 @@
+"""Keep-alive transport: connection reuse, the pool bound and dropped connections."""
+
+from __future__ import annotations
+
+import http.client
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, List, Tuple
+
+import pytest
+
+from lumina.transport import HttpTransport, _is_alive
+
+
+class _Server(ThreadingHTTPServer):
+    """
+    Local endpoint that records each request's client port and body.  Requests
+    are answered according to ``script``, one entry per request, then "ok":
+
+    - "ok": 200, connection kept open
+    - "close": 200 with ``Connection: close``
+    - "hangup": 200, then the socket is closed without saying so
+    - "drop": the socket is closed without a response
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests: List[Tuple[int, bytes]] = []
+        self.script: List[str] = []
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/v1/traces"
+
+    @property
+    def ports(self) -> List[int]:
+        with self.lock:
+            return [port for port, _ in self.requests]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.requests.append((self.client_address[1], body))
+            action = self.server.script.pop(0) if self.server.script else "ok"
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        try:
+            if self.server.delay:
+                time.sleep(self.server.delay)
+            if action == "drop":
+                self.close_connection = True
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            if action == "close":
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(b"ok")
+            if action == "hangup":
+                self.close_connection = True
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[_Server]:
+    server = _Server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport(server: _Server) -> Iterator[HttpTransport]:
+    transport = HttpTransport(server.url, timeout_ms=5000)
+    yield transport
+    transport.close()
+
+
+def _wait_for_hangup(transport: HttpTransport) -> None:
+    """Wait until the server's close of the pooled connection reaches the client."""
+    (conn,) = transport._idle
+    deadline = time.monotonic() + 5
+    while _is_alive(conn):
+        assert time.monotonic() < deadline, "the server did not close the connection"
+        time.sleep(0.005)
+
+
+# ----------------------------------------------------------------------
+# Reuse
+# ----------------------------------------------------------------------
+
+
+def test_connection_is_reused_across_requests(server: _Server, transport: HttpTransport) -> None:
+    responses = [transport.post(b"batch-%d" % index) for index in range(5)]
+
+    assert [response.status for response in responses] == [200] * 5
+    assert [response.body for response in responses] == [b"ok"] * 5
+    assert [response.timing.reused_connection for response in responses] == [False] + [True] * 4
+    assert len(set(server.ports)) == 1
+    assert responses[1].timing.connect_ms == 0.0
+    assert transport.last_timing is responses[-1].timing
+
+
+def test_concurrent_requests_are_bounded_by_max_connections(server: _Server) -> None:
+    server.delay = 0.05
+    transport = HttpTransport(server.url, max_connections=2)
+    try:
+        threads = [threading.Thread(target=transport.post, args=(b"batch",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        transport.close()
+
+    assert len(server.requests) == 6
+    assert server.max_active <= 2
+    # Waiting requests take over the connections of the ones before them
+    assert len(set(server.ports)) <= 2
+
+
+def test_warm_up_parks_a_connection_for_the_first_request(
+    server: _Server, transport: HttpTransport
+) -> None:
+    transport.warm_up().join()
+    response = transport.post(b"batch")
+    assert response.timing.reused_connection
+    assert response.timing.connect_ms == 0.0
+
+
+def test_warm_up_failure_is_quiet() -> None:
+    transport = HttpTransport("http://127.0.0.1:9/v1/traces", timeout_ms=500)
+    transport.warm_up().join()
+    assert transport._idle == []
+    transport.close()
+
+
+def test_connection_close_response_is_not_pooled(server: _Server, transport: HttpTransport) -> None:
+    server.script = ["close"]
+    transport.post(b"first")
+    second = transport.post(b"second")
+
+    assert not second.timing.reused_connection
+    assert len(set(server.ports)) == 2
+
+
+# ----------------------------------------------------------------------
+# Dropped connections
+# ----------------------------------------------------------------------
+
+
+def test_idle_connection_closed_by_the_server_is_replaced(
+    server: _Server, transport: HttpTransport
+) -> None:
+    server.script = ["hangup"]
+    transport.post(b"first")
+    _wait_for_hangup(transport)
+    second = transport.post(b"second")
+
+    assert second.status == 200
+    assert not second.timing.reused_connection
+    assert [body for _, body in server.requests] == [b"first", b"second"]
+    assert len(set(server.ports)) == 2
+
+
+def test_request_dropped_on_a_reused_connection_is_resent_once(
+    server: _Server, transport: HttpTransport
+) -> None:
+    transport.post(b"first")
+    # The idle connection still looks alive; the server drops it on the next request
+    server.script = ["drop"]
+    second = transport.post(b"second")
+
+    assert second.status == 200
+    assert not second.timing.reused_connection
+    assert [body for _, body in server.requests] == [b"first", b"second", b"second"]
+    assert server.ports[1] == server.ports[0] != server.ports[2]
+
+
+def test_request_dropped_on_a_new_connection_is_not_resent(
+    server: _Server, transport: HttpTransport
+) -> None:
+    server.script = ["drop"]
+    with pytest.raises(http.client.RemoteDisconnected):
+        transport.post(b"first")
+    assert len(server.requests) == 1
+    assert transport._idle == []
+
+    # The failed connection was discarded; the next request opens another
+    response = transport.post(b"second")
+    assert response.status == 200
+    assert not response.timing.reused_connection
+
+
+def test_unreachable_endpoint_raises() -> None:
+    transport = HttpTransport("http://127.0.0.1:9/v1/traces", timeout_ms=500)
+    with pytest.raises(OSError):
+        transport.post(b"batch")
+    transport.close()
+
+
+# ----------------------------------------------------------------------
+# Close
+# ----------------------------------------------------------------------
+
+
+def test_close_drops_idle_connections_and_refuses_requests(
+    server: _Server, transport: HttpTransport
+) -> None:
+    transport.post(b"batch")
+    (conn,) = transport._idle
+    transport.close()
+
+    assert transport._idle == []
+    assert conn.sock is None
+    with pytest.raises(RuntimeError):
+        transport.post(b"batch")
+
+
+@pytest.mark.parametrize("endpoint", ["ftp://example.com/v1/traces", "example.com"])
+def test_unsupported_endpoint_is_rejected(endpoint: str) -> None:
+    with pytest.raises(ValueError):
+        HttpTransport(endpoint)
@@ -5,6 +5,9 @@ import { requireAuth } from '../middleware/auth';
 
 const app = new Hono();
 
+// Calls each row stands for after SDK cost and head sampling
+const callWeight = sql`${traces.sampleWeight} / COALESCE(${traces.sampleRate}, 1)`;
+
 /**
  * GET /traces
  * List traces with filters
@@ -75,6 +78,8 @@ app.get('/', requireAuth, async (c) => {
         status: traces.status,
         latencyMs: traces.latencyMs,
         costUsd: traces.costUsd,
+        sampleWeight: traces.sampleWeight,
+        sampleRate: traces.sampleRate,
         promptTokens: traces.promptTokens,
         completionTokens: traces.completionTokens,
         timestamp: traces.timestamp,
@@ -105,6 +110,8 @@ app.get('/', requireAuth, async (c) => {
       status: trace.status,
       latency_ms: trace.latencyMs,
       cost_usd: trace.costUsd,
+      sample_weight: trace.sampleWeight,
+      sample_rate: trace.sampleRate,
       prompt_tokens: trace.promptTokens,
       completion_tokens: trace.completionTokens,
       timestamp: trace.timestamp,
@@ -167,7 +174,7 @@ app.get('/trends', requireAuth, async (c) => {
       .select({
         totalRequests: sql<number>`COUNT(*)::int`,
         avgLatency: sql<number>`AVG(${traces.latencyMs})::float`,
-        totalCost: sql<number>`SUM(${traces.costUsd})::float`,
+        totalCost: sql<number>`SUM(${traces.costUsd} * ${callWeight})::float`,
         errorCount: sql<number>`COUNT(*) FILTER (WHERE ${traces.status} = 'error')::int`,
       })
       .from(traces)
@@ -178,7 +185,7 @@ app.get('/trends', requireAuth, async (c) => {
       .select({
         totalRequests: sql<number>`COUNT(*)::int`,
         avgLatency: sql<number>`AVG(${traces.latencyMs})::float`,
-        totalCost: sql<number>`SUM(${traces.costUsd})::float`,
+        totalCost: sql<number>`SUM(${traces.costUsd} * ${callWeight})::float`,
         errorCount: sql<number>`COUNT(*) FILTER (WHERE ${traces.status} = 'error')::int`,
       })
       .from(traces)
@@ -266,6 +273,8 @@ interface SpanNode {
   status: string;
   latencyMs: number;
   costUsd?: number | null;
+  sampleWeight?: number | null;
+  sampleRate?: number | null;
   promptTokens?: number | null;
   completionTokens?: number | null;
   timestamp: Date;
@@ -291,6 +300,8 @@ function convertSpanToSnakeCase(span: SpanNode): any {
     status: span.status,
     latency_ms: span.latencyMs,
     cost_usd: span.costUsd,
+    sample_weight: span.sampleWeight,
+    sample_rate: span.sampleRate,
     prompt_tokens: span.promptTokens,
     completion_tokens: span.completionTokens,
     timestamp: span.timestamp,
@@ -320,6 +331,8 @@ function buildSpanTree(spans: any[]): SpanNode[] {
       status: span.status,
       latencyMs: span.latencyMs,
       costUsd: span.costUsd,
+      sampleWeight: span.sampleWeight,
+      sampleRate: span.sampleRate,
       promptTokens: span.promptTokens,
       completionTokens: span.completionTokens,
       timestamp: span.timestamp,
@@ -0,0 +1,74 @@
+/**
+ * Idempotency-Key handling for trace ingestion
+ *
+ * SDK exporters send the same Idempotency-Key when they retry a batch or
+ * replay it from their on-disk spool. Keys of ingested batches are remembered
+ * per customer so a resent batch is acknowledged without being stored or
+ * counted against the rate limit again.
+ */
+
+import type { Context, Next } from 'hono';
+import { getCache, setCache } from '@lumina/core';
+
+const IDEMPOTENCY_KEY_PREFIX = 'idempotency:';
+// Long enough to cover a spool replay after a day-long collector outage
+const IDEMPOTENCY_TTL_SECONDS = 25 * 60 * 60;
+const MAX_KEY_LENGTH = 128;
+
+function getCacheKey(customerId: string, idempotencyKey: string): string {
+  return `${IDEMPOTENCY_KEY_PREFIX}${customerId}:${idempotencyKey}`;
+}
+
+function isValidKey(idempotencyKey: string | undefined): idempotencyKey is string {
+  return !!idempotencyKey && idempotencyKey.length <= MAX_KEY_LENGTH;
+}
+
+/**
+ * Whether a batch with this key was already ingested for the customer
+ */
+export async function isDuplicateBatch(
+  customerId: string,
+  idempotencyKey: string | undefined
+): Promise<boolean> {
+  if (!isValidKey(idempotencyKey)) {
+    return false;
+  }
+  return (await getCache(getCacheKey(customerId, idempotencyKey))) !== null;
+}
+
+/**
+ * Remember that the batch with this key was ingested for the customer
+ */
+export async function markBatchIngested(
+  customerId: string,
+  idempotencyKey: string | undefined
+): Promise<void> {
+  if (!isValidKey(idempotencyKey)) {
+    return;
+  }
+  await setCache(getCacheKey(customerId, idempotencyKey), 1, IDEMPOTENCY_TTL_SECONDS);
+}
+
+/**
+ * Middleware that acknowledges an already ingested batch before any other
+ * work, in particular before the rate limiter reads or counts it
+ */
+export async function idempotencyMiddleware(c: Context, next: Next) {
+  if (c.req.method !== 'POST') {
+    return await next();
+  }
+
+  const customerId = c.get('customerId') as string | undefined;
+  const idempotencyKey = c.req.header('Idempotency-Key');
+  if (customerId && (await isDuplicateBatch(customerId, idempotencyKey))) {
+    return c.json(
+      {
+        message: 'Batch already ingested',
+        count: 0,
+      },
+      200
+    );
+  }
+
+  return await next();
+}
@@ -45,6 +45,8 @@ export async function rateLimitMiddleware(c: Context, next: Next) {
 
     // Check if limit exceeded
     if (count >= DAILY_TRACE_LIMIT) {
+      // Let SDK exporters back off until the window resets instead of retrying
+      c.header('Retry-After', String(getSecondsUntilReset()));
       return c.json(
         {
           error: 'Rate limit exceeded',
@@ -114,6 +116,13 @@ function getNextResetTime(): string {
   return tomorrow.toISOString();
 }
 
+/**
+ * Seconds until the next reset (midnight UTC), for the Retry-After header
+ */
+function getSecondsUntilReset(): number {
+  return Math.max(1, Math.ceil((Date.parse(getNextResetTime()) - Date.now()) / 1000));
+}
+
 /**
  * Get current usage statistics
  */
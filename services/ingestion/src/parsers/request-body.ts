@@ -0,0 +1,57 @@
+import * as zlib from 'node:zlib';
+
+/**
+ * Raised when a request body cannot be decoded; `status` is the HTTP status to return
+ */
+export class RequestBodyError extends Error {
+  constructor(
+    message: string,
+    readonly status: 400 | 415
+  ) {
+    super(message);
+    this.name = 'RequestBodyError';
+  }
+}
+
+type Decompress = (body: Buffer) => Buffer;
+
+// zstd is only present on runtimes whose node:zlib ships it (Bun 1.2+, Node 22.15+)
+const zstdDecompressSync = (zlib as unknown as { zstdDecompressSync?: Decompress })
+  .zstdDecompressSync;
+
+const DECOMPRESSORS: Record<string, Decompress | undefined> = {
+  gzip: zlib.gunzipSync,
+  'x-gzip': zlib.gunzipSync,
+  deflate: zlib.inflateSync,
+  zstd: zstdDecompressSync,
+};
+
+/**
+ * Parse a JSON request body, decompressing it first according to its
+ * Content-Encoding header (gzip, deflate or, where the runtime supports it, zstd).
+ *
+ * zstd bodies compressed with a dictionary cannot be read here; SDKs must not
+ * set a compression dictionary when exporting to this service.
+ */
+export async function readJsonBody(request: Request): Promise<unknown> {
+  const encoding = (request.headers.get('content-encoding') || 'identity').trim().toLowerCase();
+  if (encoding === 'identity') {
+    return request.json();
+  }
+
+  const decompress = DECOMPRESSORS[encoding];
+  if (!decompress) {
+    throw new RequestBodyError(`Unsupported Content-Encoding: ${encoding}`, 415);
+  }
+
+  let body: Buffer;
+  try {
+    body = decompress(Buffer.from(await request.arrayBuffer()));
+  } catch (error) {
+    throw new RequestBodyError(
+      `Could not decompress ${encoding} body: ${error instanceof Error ? error.message : error}`,
+      400
+    );
+  }
+  return JSON.parse(body.toString('utf8'));
+}
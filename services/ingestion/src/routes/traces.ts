@@ -1,7 +1,8 @@
 import { Hono } from 'hono';
 import type { OTLPTraceRequest } from '@lumina/schema';
 import { parseOTLPTraces } from '../parsers/otlp-parser';
-import { transformOTLPBatch } from '../transformers/otlp-transformer';
+import { readJsonBody, RequestBodyError } from '../parsers/request-body';
+import { transformOTLPBatch, toTraceRow } from '../transformers/otlp-transformer';
 import {
   getDatabase,
   insertTracesBatch,
@@ -10,10 +11,13 @@ import {
 } from '../database/client';
 import { publishTraces, isNATSConnected } from '../queue/nats-client';
 import { rateLimitMiddleware, incrementTraceCount } from '../middleware/rate-limit';
+import { idempotencyMiddleware, markBatchIngested } from '../middleware/idempotency';
 import type { AppVariables } from '../types/hono';
 
 const traces = new Hono<{ Variables: AppVariables }>();
 
+// Acknowledge resent batches first, so they are never rate limited
+traces.use('/v1/traces', idempotencyMiddleware);
 // Apply rate limiting to all trace endpoints
 traces.use('/v1/traces', rateLimitMiddleware);
 
@@ -30,8 +34,11 @@ traces.post('/v1/traces', async (c) => {
       return c.json({ error: 'Unauthorized' }, 401);
     }
 
-    // Parse request body as OTLP trace request
-    const otlpData: OTLPTraceRequest = await c.req.json();
+    // Retried and spool-replayed batches were acknowledged by idempotencyMiddleware
+    const idempotencyKey = c.req.header('Idempotency-Key');
+
+    // Parse request body as OTLP trace request (gzip/zstd per Content-Encoding)
+    const otlpData = (await readJsonBody(c.req.raw)) as OTLPTraceRequest;
 
     // Validate request structure
     if (!otlpData.resourceSpans || !Array.isArray(otlpData.resourceSpans)) {
@@ -62,7 +69,8 @@ traces.post('/v1/traces', async (c) => {
 
     // Store in PostgreSQL (synchronous for immediate query availability)
     const db = getDatabase();
-    await insertTracesBatch(db, traces);
+    await insertTracesBatch(db, traces.map(toTraceRow));
+    await markBatchIngested(customerId, idempotencyKey);
 
     // Increment rate limit counter after successful ingestion
     const rateLimitKey = c.get('rateLimitKey') as string | undefined;
@@ -99,6 +107,16 @@ traces.post('/v1/traces', async (c) => {
     console.error('Error ingesting traces:', error);
 
     // Check for specific error types
+    if (error instanceof RequestBodyError) {
+      return c.json(
+        {
+          error: 'Invalid request body',
+          message: error.message,
+        },
+        error.status
+      );
+    }
+
     if (error instanceof SyntaxError) {
       return c.json(
         {
@@ -0,0 +1,160 @@
+/**
+ * OTLP transformer tests
+ * Run with: bun test otlp-transformer.test.ts
+ */
+
+import { describe, test, expect } from 'bun:test';
+import type { OTLPAttribute, OTLPTraceRequest } from '@lumina/schema';
+import { parseOTLPTraces } from '../parsers/otlp-parser';
+import { transformOTLPBatch, toTraceRow } from './otlp-transformer';
+
+interface Call {
+  costUsd: number;
+  tokens: number;
+  sampleWeight?: number;
+  sampleRate?: number;
+}
+
+/**
+ * An OTLP/JSON request shaped like the Python SDK's exporter output
+ */
+function otlpRequest(calls: Call[]): OTLPTraceRequest {
+  const spans = calls.map((call, i) => {
+    const attributes: OTLPAttribute[] = [
+      { key: 'gen_ai.system', value: { stringValue: 'openai' } },
+      { key: 'gen_ai.response.model', value: { stringValue: 'gpt-4o-mini' } },
+      { key: 'gen_ai.usage.total_tokens', value: { intValue: String(call.tokens) } },
+      { key: 'lumina.cost_usd', value: { doubleValue: call.costUsd } },
+    ];
+    if (call.sampleWeight !== undefined) {
+      attributes.push({ key: 'lumina.sample_weight', value: { doubleValue: call.sampleWeight } });
+    }
+    if (call.sampleRate !== undefined) {
+      attributes.push({ key: 'lumina.sample_rate', value: { doubleValue: call.sampleRate } });
+    }
+    return {
+      traceId: `trace-${i}`,
+      spanId: `span-${i}`,
+      name: 'llm.request',
+      kind: 3,
+      startTimeUnixNano: '1700000000000000000',
+      endTimeUnixNano: '1700000000500000000',
+      attributes,
+      status: { code: 1 },
+    };
+  });
+
+  return {
+    resourceSpans: [
+      {
+        resource: { attributes: [{ key: 'service.name', value: { stringValue: 'chat' } }] },
+        scopeSpans: [{ scope: { name: 'lumina' }, spans }],
+      },
+    ],
+  } as OTLPTraceRequest;
+}
+
+describe('Sample weight', () => {
+  test('is carried from the span attribute to the trace row', () => {
+    const [weighted, unweighted] = transformOTLPBatch(
+      parseOTLPTraces(
+        otlpRequest([
+          { costUsd: 0.001, tokens: 10, sampleWeight: 4 },
+          { costUsd: 0.5, tokens: 10 },
+        ])
+      ),
+      'customer-1'
+    );
+
+    expect(weighted.sample_weight).toBe(4);
+    expect(weighted.metadata).toBeUndefined();
+    expect(toTraceRow(weighted).sampleWeight).toBe(4);
+
+    expect(unweighted.sample_weight).toBeUndefined();
+    expect(toTraceRow(unweighted).sampleWeight).toBe(1);
+  });
+
+  test('ignores invalid weights', () => {
+    const traces = transformOTLPBatch(
+      parseOTLPTraces(
+        otlpRequest([
+          { costUsd: 0.001, tokens: 10, sampleWeight: 0 },
+          { costUsd: 0.001, tokens: 10, sampleWeight: -3 },
+          { costUsd: 0.001, tokens: 10, sampleWeight: 0.5 },
+        ])
+      ),
+      'customer-1'
+    );
+
+    expect(traces.map((trace) => toTraceRow(trace).sampleWeight)).toEqual([1, 1, 1]);
+  });
+
+  test('weighted cost of the kept calls sums to the unsampled total', () => {
+    // 1000 calls; every cheap one is kept with probability cost / threshold
+    const threshold = 0.01;
+    const population: Call[] = Array.from({ length: 1000 }, (_, i) => ({
+      costUsd: i % 10 === 0 ? 0.05 : 0.001 * ((i % 5) + 1),
+      tokens: 100 + (i % 7) * 50,
+    }));
+    const totalCost = population.reduce((sum, call) => sum + call.costUsd, 0);
+    const totalTokens = population.reduce((sum, call) => sum + call.tokens, 0);
+
+    // Deterministic stand-in for the SDK's span-id draw: keep a stratified share of each cost
+    const credit = new Map<number, number>();
+    const kept = population.flatMap((call) => {
+      const probability = Math.min(call.costUsd / threshold, 1);
+      const next = (credit.get(call.costUsd) ?? 0) + probability;
+      credit.set(call.costUsd, next % 1);
+      if (next < 1) return [];
+      return [probability < 1 ? { ...call, sampleWeight: 1 / probability } : call];
+    });
+    expect(kept.length).toBeLessThan(population.length / 2);
+
+    const traces = transformOTLPBatch(parseOTLPTraces(otlpRequest(kept)), 'customer-1');
+    const rows = traces.map(toTraceRow);
+    const weightedCost = rows.reduce(
+      (sum, row) => sum + (row.costUsd ?? 0) * (row.sampleWeight ?? 1),
+      0
+    );
+    const weightedTokens = rows.reduce((sum, row) => sum + row.tokens * (row.sampleWeight ?? 1), 0);
+
+    expect(Math.abs(weightedCost - totalCost) / totalCost).toBeLessThan(0.02);
+    expect(Math.abs(weightedTokens - totalTokens) / totalTokens).toBeLessThan(0.05);
+  });
+});
+
+describe('Sample rate', () => {
+  test('is carried from the span attribute to the trace row', () => {
+    const [sampled, unsampled] = transformOTLPBatch(
+      parseOTLPTraces(
+        otlpRequest([
+          { costUsd: 0.01, tokens: 10, sampleRate: 0.25, sampleWeight: 2 },
+          { costUsd: 0.01, tokens: 10 },
+        ])
+      ),
+      'customer-1'
+    );
+
+    expect(sampled.sample_rate).toBe(0.25);
+    expect(sampled.metadata).toBeUndefined();
+    expect(toTraceRow(sampled)).toMatchObject({ sampleRate: 0.25, sampleWeight: 2 });
+
+    expect(unsampled.sample_rate).toBeUndefined();
+    expect(toTraceRow(unsampled).sampleRate).toBeUndefined();
+  });
+
+  test('ignores rates outside (0, 1)', () => {
+    const traces = transformOTLPBatch(
+      parseOTLPTraces(
+        otlpRequest([
+          { costUsd: 0.01, tokens: 10, sampleRate: 0 },
+          { costUsd: 0.01, tokens: 10, sampleRate: 1 },
+          { costUsd: 0.01, tokens: 10, sampleRate: 2 },
+        ])
+      ),
+      'customer-1'
+    );
+
+    expect(traces.map((trace) => trace.sample_rate)).toEqual([undefined, undefined, undefined]);
+  });
+});
@@ -1,4 +1,5 @@
 import type { ParsedOTLPSpan, Trace, OTLPStatusCode } from '@lumina/schema';
+import type { NewTrace } from '@lumina/database';
 import { getStringAttribute, getNumberAttribute } from '../parsers/otlp-parser';
 import { calculateCost } from '@lumina/core';
 
@@ -43,6 +44,9 @@ export function transformOTLPToTrace(span: ParsedOTLPSpan, customerId: string):
           totalTokens,
         });
 
+  const sampleWeight = parseSampleWeight(span);
+  const sampleRate = parseSampleRate(span);
+
   const tags = parseTagsAttribute(span);
 
   // Extract service information from resource attributes
@@ -88,6 +92,8 @@ export function transformOTLPToTrace(span: ParsedOTLPSpan, customerId: string):
     completion_tokens: completionTokens || undefined,
     latency_ms: latencyMs,
     cost_usd: costUsd,
+    sample_weight: sampleWeight,
+    sample_rate: sampleRate,
 
     // Metadata
     metadata,
@@ -131,6 +137,23 @@ function mapLLMSystemToProvider(
   return 'other';
 }
 
+/**
+ * Parse the cost-sampling weight (1 / keep-probability) set by the SDK
+ * Absent or invalid weights count the span once
+ */
+function parseSampleWeight(span: ParsedOTLPSpan): number | undefined {
+  const weight = getNumberAttribute(span, 'lumina.sample_weight', 1);
+  return Number.isFinite(weight) && weight > 1 ? weight : undefined;
+}
+
+/**
+ * Parse the head-sampling rate (keep probability of the trace) set by the SDK
+ */
+function parseSampleRate(span: ParsedOTLPSpan): number | undefined {
+  const rate = getNumberAttribute(span, 'lumina.sample_rate', 1);
+  return rate > 0 && rate < 1 ? rate : undefined;
+}
+
 /**
  * Parse tags attribute (stored as JSON string)
  */
@@ -207,3 +230,34 @@ export function transformOTLPBatch(spans: ParsedOTLPSpan[], customerId: string):
 
   return llmSpans.map((span) => transformOTLPToTrace(span, customerId));
 }
+
+/**
+ * Map a Lumina trace to its database row
+ */
+export function toTraceRow(trace: Trace): NewTrace {
+  return {
+    traceId: trace.trace_id,
+    spanId: trace.span_id,
+    parentSpanId: trace.parent_span_id,
+    customerId: trace.customer_id,
+    timestamp: trace.timestamp,
+    serviceName: trace.service_name,
+    endpoint: trace.endpoint,
+    environment: trace.environment,
+    model: trace.model,
+    provider: trace.provider,
+    prompt: trace.prompt,
+    response: trace.response,
+    tokens: trace.tokens,
+    promptTokens: trace.prompt_tokens,
+    completionTokens: trace.completion_tokens,
+    latencyMs: trace.latency_ms,
+    costUsd: trace.cost_usd,
+    sampleWeight: trace.sample_weight ?? 1,
+    sampleRate: trace.sample_rate,
+    metadata: trace.metadata,
+    tags: trace.tags,
+    status: trace.status,
+    errorMessage: trace.error_message,
+  };
+}